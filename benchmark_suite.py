@@ -0,0 +1,245 @@
+"""
+Общий набор замеров горячих операций всех лабораторных с проверкой на регрессию.
+
+Каждый замер выполняется для нескольких размеров данных и даёт время одной операции в наносекундах
+(лучшее из нескольких повторов). Результаты сравниваются с базовыми из JSON-файла: если операция
+стала медленнее базовой больше, чем на порог, программа завершается с кодом 1. Если базовых
+результатов нет, программа завершается с кодом 2, не выполняя замеров, а если в них нет части
+текущих метрик (например, замер выполнен для другого размера данных) - с кодом 2 после замеров.
+Базовые значения зависят от машины, поэтому их нужно записать на ней же:
+
+    python benchmark_suite.py --update
+    python benchmark_suite.py --threshold 0.2
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+from typing import Callable, Dict, List, Tuple
+
+from labs import ROOT, lab_modules
+
+DEFAULT_BASELINE = os.path.join(ROOT, "benchmark_baseline.json")
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+
+
+# Каждый замер по размеру данных готовит всё нужное и возвращает (число операций, функция замера).
+# Подготовка в замер не входит.
+
+def bench_assortment_sale(size: int) -> Tuple[int, Callable[[], None]]:
+    with lab_modules(1) as load:
+        Assortment = load("main").Assortment
+
+    def run() -> None:
+        product = Assortment("Крупы", "Гречка", size, "шт")
+        sale = product.sale
+        for _ in range(size):
+            sale(1, "шт")
+    return size, run
+
+
+def bench_assortment_sale_converted(size: int) -> Tuple[int, Callable[[], None]]:
+    with lab_modules(1) as load:
+        Assortment = load("main").Assortment
+
+    def run() -> None:
+        product = Assortment("Овощи", "Помидоры", size, "тонна")
+        sale = product.sale
+        for _ in range(size):
+            sale(1, "кг")
+    return size, run
+
+
+def bench_assortment_shipment(size: int) -> Tuple[int, Callable[[], None]]:
+    with lab_modules(1) as load:
+        Assortment = load("main").Assortment
+
+    def run() -> None:
+        product = Assortment("Молочка", "Кефир", 0, "упаковка 1л")
+        shipment = product.shipment
+        for _ in range(size):
+            shipment(1, "упаковка 1л")
+    return size, run
+
+
+def bench_library_lookup(size: int) -> Tuple[int, Callable[[], None]]:
+    with lab_modules(2) as load:
+        main_library = load("main_Library")
+    library = main_library.Library([main_library.Book(book_id, f"book_{book_id}", 100 + book_id % 900)
+                                    for book_id in range(1, size + 1)])
+    ids = random.Random(size).choices(range(1, size + 1), k=size)
+
+    def run() -> None:
+        lookup = library.get_index_by_book_id
+        for book_id in ids:
+            lookup(book_id)
+    return size, run
+
+
+def bench_paper_book_construction(size: int) -> Tuple[int, Callable[[], None]]:
+    with lab_modules(3) as load:
+        PaperBook = load("main").PaperBook
+    rows = [(f"Книга {number}", f"Автор {number % 1000}", 100 + number % 900) for number in range(size)]
+
+    def run() -> None:
+        for row in rows:
+            PaperBook(*row)
+    return size, run
+
+
+def bench_audio_book_construction(size: int) -> Tuple[int, Callable[[], None]]:
+    with lab_modules(3) as load:
+        AudioBook = load("main").AudioBook
+    rows = [(f"Книга {number}", f"Автор {number % 1000}", 60.0 + number % 600) for number in range(size)]
+
+    def run() -> None:
+        for row in rows:
+            AudioBook(*row)
+    return size, run
+
+
+def bench_body_index(size: int) -> Tuple[int, Callable[[], None]]:
+    with lab_modules(4) as load:
+        pinnipeds = load("main")
+    rng = random.Random(size)
+    animals = []
+    for number in range(size):
+        species = (pinnipeds.NavySeals, pinnipeds.SeaElephants, pinnipeds.Walruses)[number % 3]
+        animals.append(species("Ластоногое", 20, "короткая", "густая",
+                               rng.uniform(species.MIN_LENGTH, species.MAX_LENGTH),
+                               rng.uniform(species.MIN_WEIGHT, species.MAX_WEIGHT), 1))
+
+    def run() -> None:
+        for animal in animals:
+            animal.body_index()
+    return size, run
+
+
+BENCHMARKS = {
+    "lab1.assortment_sale": bench_assortment_sale,
+    "lab1.assortment_sale_converted": bench_assortment_sale_converted,
+    "lab1.assortment_shipment": bench_assortment_shipment,
+    "lab2.library_get_index_by_book_id": bench_library_lookup,
+    "lab3.paper_book_construction": bench_paper_book_construction,
+    "lab3.audio_book_construction": bench_audio_book_construction,
+    "lab4.pinnipeds_body_index": bench_body_index,
+}
+
+
+def measure(benchmark: Callable, size: int, repeat: int) -> float:
+    """
+    Выполняет замер repeat раз и возвращает лучшее время одной операции.
+    :param benchmark: Функция замера из BENCHMARKS
+    :param size: Размер данных
+    :param repeat: Количество повторов
+    :return: Наносекунды на операцию
+    """
+    operations, run = benchmark(size)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best / operations * 1e9
+
+
+def run_suite(sizes: List[int], repeat: int, selected: List[str] = None) -> Dict[str, float]:
+    """
+    Выполняет все (или выбранные) замеры для всех размеров.
+    :param sizes: Размеры данных
+    :param repeat: Количество повторов каждого замера
+    :param selected: Имена замеров; по умолчанию все
+    :return: Имя метрики вида "lab1.assortment_sale[1000]" -> наносекунды на операцию
+    """
+    results = {}
+    for name, benchmark in BENCHMARKS.items():
+        if selected and name not in selected:
+            continue
+        for size in sizes:
+            metric = f"{name}[{size}]"
+            results[metric] = measure(benchmark, size, repeat)
+            print(f"{metric:>48}: {results[metric]:12.1f} нс/оп")
+    return results
+
+
+def compare(results: Dict[str, float], baseline: Dict[str, float], threshold: float) -> List[str]:
+    """
+    Сравнивает результаты с базовыми значениями.
+    :param results: Текущие метрики
+    :param baseline: Базовые метрики
+    :param threshold: Допустимое относительное замедление, например 0.2 - на 20%
+    :return: Описания регрессий
+    Примеры:
+    >>> compare({'a[10]': 130.0, 'b[10]': 90.0, 'c[10]': 1.0}, {'a[10]': 100.0, 'b[10]': 100.0}, 0.2)
+    ['a[10]: 130.0 нс/оп против 100.0 нс/оп базовых (+30%)']
+    """
+    regressions = []
+    for metric, value in results.items():
+        base = baseline.get(metric)
+        if base is not None and value > base * (1 + threshold):
+            regressions.append(f"{metric}: {value:.1f} нс/оп против {base:.1f} нс/оп базовых "
+                               f"({value / base - 1:+.0%})")
+    return regressions
+
+
+def missing_in_baseline(results: Dict[str, float], baseline: Dict[str, float]) -> List[str]:
+    """
+    Находит текущие метрики, для которых нет базовых значений и сравнивать не с чем.
+    :param results: Текущие метрики
+    :param baseline: Базовые метрики
+    :return: Имена метрик
+    Примеры:
+    >>> missing_in_baseline({'a[50]': 130.0, 'a[1000]': 90.0}, {'a[1000]': 100.0})
+    ['a[50]']
+    """
+    return [metric for metric in results if metric not in baseline]
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Замеры горячих операций лабораторных с проверкой на регрессию")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="размеры данных")
+    parser.add_argument("--repeat", type=int, default=5, help="количество повторов каждого замера")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="допустимое относительное замедление, по умолчанию 0.25 (25%%)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="JSON-файл с базовыми результатами")
+    parser.add_argument("--update", action="store_true", help="записать текущие результаты как базовые")
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), help="выполнить только эти замеры")
+    args = parser.parse_args(argv)
+
+    if not args.update and not os.path.exists(args.baseline):
+        print(f"Нет базовых результатов {args.baseline}, запишите их флагом --update", file=sys.stderr)
+        return 2
+    results = run_suite(args.sizes, args.repeat, args.only)
+    if args.update:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding="utf-8") as file:
+                baseline = json.load(file)["metrics"]
+        baseline.update(results)
+        with open(args.baseline, "w", encoding="utf-8") as file:
+            json.dump({"python": platform.python_version(), "machine": platform.machine(), "metrics": baseline},
+                      file, ensure_ascii=False, indent=2, sort_keys=True)
+            file.write("\n")
+        print(f"Базовые результаты записаны в {args.baseline}")
+        return 0
+    with open(args.baseline, encoding="utf-8") as file:
+        baseline = json.load(file)["metrics"]
+    regressions = compare(results, baseline, args.threshold)
+    for regression in regressions:
+        print(f"РЕГРЕССИЯ {regression}")
+    missing = missing_in_baseline(results, baseline)
+    if missing:
+        print(f"Нет базовых результатов для {', '.join(missing)}, запишите их флагом --update", file=sys.stderr)
+    if regressions:
+        return 1
+    if missing:
+        return 2
+    print(f"Регрессий больше {args.threshold:.0%} нет")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
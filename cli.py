@@ -0,0 +1,227 @@
+"""
+Командная строка для подсистем лабораторных. Модули лабораторной импортируются только
+при вызове её команды, поэтому запуск любой команды не платит за остальные:
+
+    python cli.py library books.jsonl --id 42
+    python cli.py library library.snap --similar "мастер и маргорита"
+    python cli.py serve books.jsonl --port 8765
+    python cli.py inventory convert 500 кг тонна
+    python cli.py inventory sale 1.5 тонна 500 кг
+    python cli.py census walrus 2.6 1000
+    python cli.py startup
+
+Доктесты (python -m doctest cli.py) проверяют, что импорт cli не загружает модули лабораторных
+и что модули укладываются в бюджеты времени импорта; то же самое проверяет команда startup.
+"""
+import argparse
+import re
+import subprocess
+import sys
+import time
+from typing import List
+
+from labs import LAB_DIRECTORIES, ROOT, lab_modules
+
+# Бюджеты времени импорта относительно запуска пустого интерпретатора (python -c pass): (каталог, модуль) ->
+# во сколько раз импорт модуля (по python -X importtime, лучший из нескольких запусков) может быть дольше.
+# Отношение почти не зависит от скорости машины; бюджеты примерно вдвое больше замеренного: этого хватает,
+# чтобы ловить новые тяжёлые импорты (doctest, numpy, sqlite3) в модулях, а не шум
+STARTUP_BUDGET = {
+    (ROOT, "cli"): 3.0,
+    (LAB_DIRECTORIES[1], "main"): 4.0,
+    (LAB_DIRECTORIES[2], "main_Library"): 3.0,
+    (LAB_DIRECTORIES[3], "main"): 2.0,
+    (LAB_DIRECTORIES[4], "main"): 2.0,
+}
+
+# Модули, которые импорт cli загружать не должен: модули лабораторных и тяжёлые библиотеки
+LAZY_MODULES = ("main", "main_Library", "main_Book", "units", "fields", "numpy", "sqlite3", "doctest", "asyncio")
+
+# Вид ластоногого в командной строке -> класс Лабораторной 4
+SPECIES = {"navy-seal": "NavySeals", "sea-elephant": "SeaElephants", "walrus": "Walruses"}
+
+
+def import_time_us(module: str, directory: str = ROOT, runs: int = 3) -> int:
+    """
+    Замеряет время импорта модуля в новом интерпретаторе через python -X importtime.
+    :param module: Имя модуля
+    :param directory: Каталог, из которого импортируется модуль
+    :param runs: Количество запусков; берётся лучший
+    :return: Время импорта модуля вместе с его зависимостями, в микросекундах
+    """
+    best = None
+    for _ in range(runs):
+        stderr = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=directory,
+                                capture_output=True, text=True, check=True).stderr
+        # Строка модуля верхнего уровня: "import time: <self> | <cumulative> | <module>"
+        match = re.search(rf"^import time:\s+\d+ \|\s+(\d+) \| {re.escape(module)}$", stderr, re.MULTILINE)
+        cumulative = int(match.group(1))
+        best = cumulative if best is None else min(best, cumulative)
+    return best
+
+
+def bare_startup_us(runs: int = 5) -> int:
+    """
+    Замеряет запуск пустого интерпретатора: python -c pass.
+    :param runs: Количество запусков; берётся лучший
+    :return: Время запуска в микросекундах
+    """
+    best = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"], check=True)
+        elapsed = int((time.perf_counter() - start) * 1e6)
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def check_lazy_imports() -> List[str]:
+    """
+    Проверяет, что импорт cli не загружает модули лабораторных и тяжёлые библиотеки.
+    :return: Описания нарушений
+    Примеры:
+    >>> check_lazy_imports()
+    []
+    """
+    loaded = subprocess.run([sys.executable, "-c", "import sys, cli; print(' '.join(sorted(sys.modules)))"],
+                            cwd=ROOT, capture_output=True, text=True, check=True).stdout.split()
+    return [f"импорт cli загружает {name}" for name in LAZY_MODULES if name in loaded]
+
+
+def check_startup_budget() -> List[str]:
+    """
+    Проверяет, что модули укладываются в бюджеты времени импорта относительно запуска пустого интерпретатора.
+    :return: Описания нарушений
+    Примеры:
+    >>> check_startup_budget()
+    []
+    """
+    bare = bare_startup_us()
+    problems = []
+    for (directory, module), budget in STARTUP_BUDGET.items():
+        spent = import_time_us(module, directory)
+        if spent > budget * bare:
+            problems.append(f"{module} из {directory}: {spent} мкс, это {spent / bare:.1f} запуска "
+                            f"пустого интерпретатора ({bare} мкс) при бюджете {budget}")
+    return problems
+
+
+def run_startup(args: argparse.Namespace) -> int:
+    problems = check_lazy_imports() + check_startup_budget()
+    for problem in problems:
+        print(problem)
+    if problems:
+        return 1
+    print("Бюджеты времени импорта соблюдены")
+    return 0
+
+
+def run_library(args: argparse.Namespace) -> None:
+    with lab_modules(2) as load:
+        if args.path.endswith(".snap"):
+            library = load("library_snapshot").SnapshotLibrary(args.path)
+            # Снимок отвечает только на запросы по id, для поиска по названиям книги декодируются
+            if args.prefix is not None or args.similar is not None:
+                library = library.to_library()
+        else:
+            library = load("library_loader").load_library(args.path)
+    if args.id is not None:
+        print(library.get_book_by_id(args.id))
+    if args.prefix is not None:
+        for book in library.find_by_name_prefix(args.prefix):
+            print(book)
+    if args.similar is not None:
+        for book in library.find_similar_names(args.similar, args.k):
+            print(book)
+    if args.id is None and args.prefix is None and args.similar is None:
+        print(f"Книг: {len(library.books)}, следующий id: {library.get_next_book_id()}")
+
+
+def run_serve(args: argparse.Namespace) -> None:
+    import asyncio
+
+    with lab_modules(2) as load:
+        library = load("library_loader").load_library(args.path)
+        indexes = load("library_indexes")
+        service = load("library_service")
+    library.add_index(indexes.NamePrefixIndex())
+    library.add_index(indexes.PagesRangeIndex())
+    print(f"Книг: {len(library.books)}, сервис слушает {args.host}:{args.port}")
+    try:
+        asyncio.run(service.serve(library, args.host, args.port, window=args.window))
+    except KeyboardInterrupt:
+        pass
+
+
+def run_inventory(args: argparse.Namespace) -> None:
+    with lab_modules(1) as load:
+        main = load("main")
+    if args.action == "convert":
+        print(main.convert(args.quantity, args.measurement, args.target))
+    else:
+        product = main.Assortment("Товар", "Товар", args.quantity, args.measurement)
+        product.sale(args.sold, args.sold_measurement)
+        print(f"Осталось {product.quantity} {product.measurement}")
+
+
+def run_census(args: argparse.Namespace) -> None:
+    with lab_modules(4) as load:
+        species = getattr(load("main"), SPECIES[args.species])
+    animal = species(args.species, 0, "", "", args.length, args.weight, 0)
+    print(animal.body_index())
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Подсистемы лабораторных работ")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    library = commands.add_parser("library", help="запросы к библиотеке из JSON Lines, CSV или снимка .snap")
+    library.add_argument("path", help="файл библиотеки")
+    library.add_argument("--id", type=int, help="показать книгу с этим id")
+    library.add_argument("--prefix", help="книги, название которых начинается с префикса")
+    library.add_argument("--similar", help="книги с похожими названиями")
+    library.add_argument("--k", type=int, default=10, help="сколько похожих книг показать")
+    library.set_defaults(run=run_library)
+
+    serve = commands.add_parser("serve", help="сервис запросов к библиотеке по JSON Lines через TCP")
+    serve.add_argument("path", help="файл библиотеки в JSON Lines или CSV")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8765)
+    serve.add_argument("--window", type=float, default=0, help="окно пакета запросов, с")
+    serve.set_defaults(run=run_serve)
+
+    inventory = commands.add_parser("inventory", help="пересчёт единиц и продажа товара")
+    actions = inventory.add_subparsers(dest="action", required=True)
+    convert = actions.add_parser("convert", help="пересчитать количество в другую единицу")
+    convert.add_argument("quantity", type=float)
+    convert.add_argument("measurement")
+    convert.add_argument("target")
+    sale = actions.add_parser("sale", help="остаток товара после продажи")
+    sale.add_argument("quantity", type=float, help="количество в наличии")
+    sale.add_argument("measurement")
+    sale.add_argument("sold", type=float, help="проданное количество")
+    sale.add_argument("sold_measurement")
+    inventory.set_defaults(run=run_inventory)
+
+    census = commands.add_parser("census", help="индекс массы тела ластоногого")
+    census.add_argument("species", choices=sorted(SPECIES))
+    census.add_argument("length", type=float, help="длина тела, м")
+    census.add_argument("weight", type=float, help="масса тела, кг")
+    census.set_defaults(run=run_census)
+
+    startup = commands.add_parser("startup", help="проверить бюджеты времени импорта")
+    startup.set_defaults(run=run_startup)
+    return parser
+
+
+def main(argv: List[str] = None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        return args.run(args) or 0
+    except (TypeError, ValueError, OSError) as error:
+        print(f"Ошибка: {error}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
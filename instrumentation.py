@@ -0,0 +1,245 @@
+"""
+Включаемые во время работы замеры методов и сеттеров классов лабораторных.
+
+enable(cls) подменяет методы класса (включая __init__), сеттеры его свойств и __set__ дескрипторов
+данных, например TypedField из Лабораторной 3, на обёртки, которые считают вызовы, время вызова
+и исключения по типам. disable() возвращает исходные функции и классы дескрипторов, поэтому
+выключенные замеры ничего не стоят: в классах нет ни обёрток, ни проверок флага.
+
+    import instrumentation
+    instrumentation.enable(Assortment, Staff)
+    ...
+    print(instrumentation.to_prometheus())
+    instrumentation.disable()
+"""
+import threading
+import time
+import types
+from bisect import bisect_left
+from collections import Counter
+from functools import wraps
+from typing import Callable, Dict, Iterable, List, Tuple
+
+# Верхние границы корзин гистограммы времени вызова, в секундах
+BUCKETS = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 1e-2, 1e-1, 1.0, float("inf"))
+
+
+class MethodMetrics:
+    """Метрики одного метода: количество вызовов, гистограмма времени и исключения по типам."""
+    __slots__ = ("calls", "seconds", "buckets", "failures")
+
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+        self.buckets = [0] * len(BUCKETS)
+        self.failures = Counter()
+
+    def record(self, seconds: float, exception: BaseException = None) -> None:
+        self.calls += 1
+        self.seconds += seconds
+        self.buckets[bisect_left(BUCKETS, seconds)] += 1
+        if exception is not None:
+            self.failures[type(exception).__name__] += 1
+
+    def snapshot(self) -> dict:
+        return {"calls": self.calls, "seconds": self.seconds,
+                "histogram": dict(zip(BUCKETS, self.buckets)), "failures": dict(self.failures)}
+
+
+class Instrumentation:
+    """
+    Реестр замеров. Обычно используется общий экземпляр модуля через функции enable, disable,
+    snapshot, to_prometheus и reset.
+    """
+    def __init__(self):
+        """
+        Создание и подготовка к работе объекта "Замеры"
+        Примеры:
+        >>> class Glass:
+        ...     def __init__(self, volume):
+        ...         self.volume = volume
+        ...     @property
+        ...     def volume(self):
+        ...         return self._volume
+        ...     @volume.setter
+        ...     def volume(self, value):
+        ...         if value <= 0:
+        ...             raise ValueError('Объем стакана должен быть положительным числом')
+        ...         self._volume = value
+        >>> metrics = Instrumentation()
+        >>> metrics.enable(Glass)
+        >>> glass = Glass(500)
+        >>> glass.volume = -1
+        Traceback (most recent call last):
+        ...
+        ValueError: Объем стакана должен быть положительным числом
+        >>> snapshot = metrics.snapshot()
+        >>> snapshot['Glass.__init__']['calls'], snapshot['Glass.volume.setter']['calls']
+        (1, 2)
+        >>> snapshot['Glass.volume.setter']['failures']
+        {'ValueError': 1}
+        >>> print(metrics.to_prometheus().splitlines()[3])
+        lab_calls_total{method="Glass.volume.setter"} 2
+        >>> metrics.disable()
+        >>> type(vars(Glass)['__init__']).__name__, metrics.snapshot()['Glass.__init__']['calls']
+        ('function', 1)
+        """
+        self._metrics: Dict[str, MethodMetrics] = {}
+        # (класс, имя атрибута, вид подмены: "property", "descriptor" или "method", исходный объект)
+        self._patched: List[Tuple[type, str, str, object]] = []
+        self._lock = threading.Lock()
+
+    def _wrap(self, function: Callable, name: str) -> Callable:
+        metrics = self._metrics.setdefault(name, MethodMetrics())
+        lock = self._lock
+        clock = time.perf_counter
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                result = function(*args, **kwargs)
+            except Exception as exception:
+                elapsed = clock() - start
+                with lock:
+                    metrics.record(elapsed, exception)
+                raise
+            elapsed = clock() - start
+            with lock:
+                metrics.record(elapsed)
+            return result
+        return wrapper
+
+    def enable(self, *classes: type, methods: Iterable[str] = None) -> None:
+        """
+        Подменяет методы и сеттеры свойств классов обёртками с замерами. Учитываются атрибуты,
+        объявленные в самом классе: обычные методы, __init__, свойства с сеттером и дескрипторы данных.
+        Метод __set__ ищется по типу дескриптора, поэтому дескриптору на время замеров назначается
+        подкласс его класса с обёрнутым __set__; сам объект дескриптора остаётся прежним.
+        :param classes: Классы
+        :param methods: Имена методов и свойств; по умолчанию все подходящие
+        Примеры:
+        >>> from labs import lab_modules
+        >>> with lab_modules(3) as load:
+        ...     PaperBook = load('main').PaperBook
+        >>> metrics = Instrumentation()
+        >>> metrics.enable(PaperBook, methods=['pages'])
+        >>> book = PaperBook('Война и мир', 'Толстой', 1225)
+        >>> book.pages = -5
+        Traceback (most recent call last):
+        ...
+        ValueError: Количество страниц в книге должно быть строго положительным числом.
+        >>> pages = metrics.snapshot()['PaperBook.pages.setter']
+        >>> pages['calls'], pages['failures']
+        (2, {'ValueError': 1})
+        >>> metrics.disable()
+        >>> book.pages = 300
+        >>> type(PaperBook.__dict__['pages']).__name__, metrics.snapshot()['PaperBook.pages.setter']['calls']
+        ('TypedField', 2)
+        """
+        selected = set(methods) if methods is not None else None
+        for cls in classes:
+            if not isinstance(cls, type):
+                raise TypeError("Замеры включаются для классов")
+            for name, attribute in list(vars(cls).items()):
+                if selected is not None and name not in selected:
+                    continue
+                if any(owner is cls and patched == name for owner, patched, _, _ in self._patched):
+                    continue
+                qualified = f"{cls.__qualname__}.{name}"
+                if isinstance(attribute, property):
+                    if attribute.fset is None:
+                        continue
+                    # Свойство неизменяемо, но property.__init__ можно вызвать повторно:
+                    # так объект свойства (и isinstance-проверки по нему) остаётся прежним
+                    original = attribute.fset
+                    property.__init__(attribute, attribute.fget, self._wrap(original, qualified + ".setter"),
+                                      attribute.fdel, attribute.__doc__)
+                    self._patched.append((cls, name, "property", original))
+                elif hasattr(type(attribute), "__set__") and \
+                        not isinstance(attribute, (types.MemberDescriptorType, types.GetSetDescriptorType)):
+                    # Дескрипторы слотов и встроенных атрибутов только хранят значения, их не замеряем
+                    original = type(attribute)
+                    instrumented = type(original.__name__, (original,),
+                                        {"__set__": self._wrap(original.__set__, qualified + ".setter")})
+                    attribute.__class__ = instrumented
+                    self._patched.append((cls, name, "descriptor", original))
+                elif callable(attribute) and not isinstance(attribute, type) and \
+                        (name == "__init__" or not name.startswith("__")):
+                    if isinstance(attribute, (classmethod, staticmethod)):
+                        wrapped = type(attribute)(self._wrap(attribute.__func__, qualified))
+                    else:
+                        wrapped = self._wrap(attribute, qualified)
+                    setattr(cls, name, wrapped)
+                    self._patched.append((cls, name, "method", attribute))
+
+    def disable(self) -> None:
+        """
+        Возвращает исходные методы и сеттеры всем классам. Собранные метрики сохраняются.
+        """
+        for cls, name, kind, original in reversed(self._patched):
+            if kind == "property":
+                attribute = vars(cls)[name]
+                property.__init__(attribute, attribute.fget, original, attribute.fdel, attribute.__doc__)
+            elif kind == "descriptor":
+                vars(cls)[name].__class__ = original
+            else:
+                setattr(cls, name, original)
+        self._patched.clear()
+
+    def reset(self) -> None:
+        """
+        Обнуляет собранные метрики, не выключая замеры.
+        """
+        with self._lock:
+            for metrics in self._metrics.values():
+                metrics.__init__()
+
+    def snapshot(self) -> Dict[str, dict]:
+        """
+        Возвращает копию метрик: имя метода -> calls, seconds, histogram (верхняя граница корзины
+        в секундах -> количество вызовов), failures (тип исключения -> количество).
+        :return: Словарь метрик
+        """
+        with self._lock:
+            return {name: metrics.snapshot() for name, metrics in self._metrics.items()}
+
+    def to_prometheus(self) -> str:
+        """
+        Возвращает метрики в текстовом формате Prometheus.
+        :return: Текст
+        """
+        snapshot = self.snapshot()
+        lines = ["# HELP lab_calls_total Количество вызовов метода", "# TYPE lab_calls_total counter"]
+        lines += [f'lab_calls_total{{method="{name}"}} {metrics["calls"]}' for name, metrics in snapshot.items()]
+        lines += ["# HELP lab_call_duration_seconds Время вызова метода",
+                  "# TYPE lab_call_duration_seconds histogram"]
+        for name, metrics in snapshot.items():
+            cumulative = 0
+            for bound, count in metrics["histogram"].items():
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'lab_call_duration_seconds_bucket{{method="{name}",le="{le}"}} {cumulative}')
+            lines.append(f'lab_call_duration_seconds_sum{{method="{name}"}} {metrics["seconds"]!r}')
+            lines.append(f'lab_call_duration_seconds_count{{method="{name}"}} {metrics["calls"]}')
+        lines += ["# HELP lab_validation_failures_total Исключения, выброшенные методом, по типам",
+                  "# TYPE lab_validation_failures_total counter"]
+        for name, metrics in snapshot.items():
+            for exception, count in metrics["failures"].items():
+                lines.append(f'lab_validation_failures_total{{method="{name}",exception="{exception}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+
+# Общий экземпляр, которым пользуются функции модуля
+instrumentation = Instrumentation()
+enable = instrumentation.enable
+disable = instrumentation.disable
+reset = instrumentation.reset
+snapshot = instrumentation.snapshot
+to_prometheus = instrumentation.to_prometheus
+
+
+if __name__ == "__main__":
+    import doctest
+
+    doctest.testmod()
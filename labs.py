@@ -0,0 +1,37 @@
+"""
+Каталоги лабораторных и загрузка их модулей из общих инструментов в корне репозитория.
+"""
+import importlib
+import os
+import sys
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+LAB_DIRECTORIES = {
+    1: os.path.join(ROOT, "Лабораторная 1", "Лабораторная работа 1 OOP"),
+    2: os.path.join(ROOT, "Лабораторная 2", "Лабораторная работа 2 OOP"),
+    3: os.path.join(ROOT, "Лабораторная 3", "Лабораторная работа 3 OOP"),
+    4: os.path.join(ROOT, "Лабораторная 4", "Лабораторная работа 4 OOP"),
+}
+
+
+@contextmanager
+def lab_modules(lab: int) -> Iterator[Callable[[str], object]]:
+    """
+    Даёт функцию импорта модулей лабораторной по имени. Модули лабораторных импортируют соседей
+    по простому имени (main, fields, ...), и имена в разных лабораторных совпадают, поэтому
+    на время блока каталог лабораторной ставится первым в sys.path, а после блока все
+    загруженные из него модули убираются из sys.modules. Сами объекты модулей остаются рабочими.
+    :param lab: Номер лабораторной
+    """
+    directory = LAB_DIRECTORIES[lab]
+    before = set(sys.modules)
+    sys.path.insert(0, directory)
+    try:
+        yield importlib.import_module
+    finally:
+        sys.path.remove(directory)
+        for name in set(sys.modules) - before:
+            if os.path.dirname(getattr(sys.modules[name], "__file__", None) or "") == directory:
+                del sys.modules[name]
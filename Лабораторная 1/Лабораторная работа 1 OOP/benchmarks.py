@@ -0,0 +1,241 @@
+import os
+import random
+import sys
+import threading
+import time
+from itertools import accumulate
+
+import numpy as np
+
+from concurrent_inventory import ConcurrentInventory
+from main import AccountsDepartment, Assortment
+from projections import project_profit
+from reconciliation import reconcile
+from stock_tracker import StockTracker
+from transactions import apply_batch
+
+
+def make_stock(sku_count: int) -> dict:
+    """
+    Создаёт склад с sku_count артикулами и большим начальным остатком.
+    :param sku_count: Количество артикулов
+    :return: Склад: артикул -> Assortment
+    """
+    return {f"SKU{number}": Assortment("Крупы", f"Товар {number}", 10 ** 9, "шт") for number in range(sku_count)}
+
+
+def bench_batch_transactions(events: int, sku_count: int = 1000) -> None:
+    """
+    Сравнивает поштучные вызовы sale/shipment с пакетным apply_batch.
+    :param events: Количество событий
+    :param sku_count: Количество артикулов
+    """
+    rng = random.Random(events)
+    skus = [f"SKU{rng.randrange(sku_count)}" for _ in range(events)]
+    quantities = [rng.randint(1, 5) for _ in range(events)]
+    kinds = [rng.choice(("sale", "shipment")) for _ in range(events)]
+    measurements = ["шт"] * events
+
+    stock = make_stock(sku_count)
+    start = time.perf_counter()
+    for sku, quantity, measurement, kind in zip(skus, quantities, measurements, kinds):
+        item = stock[sku]
+        if kind == "sale":
+            item.sale(quantity, measurement)
+        else:
+            item.shipment(quantity, measurement)
+    loop_time = time.perf_counter() - start
+    expected = {sku: item.quantity for sku, item in stock.items()}
+
+    # Пакет приходит из фида уже в виде массивов, поэтому их построение не входит в замер.
+    # Закодированный пакет: артикулы - номера в каталоге, виды операций - коды 0/1
+    catalog = list(make_stock(sku_count))
+    code_of = {sku: code for code, sku in enumerate(catalog)}
+    batches = {
+        "apply_batch, строки": ((np.array(skus), np.array(quantities), np.array(measurements), np.array(kinds)), None),
+        "apply_batch, коды": ((np.array([code_of[sku] for sku in skus]), np.array(quantities), np.array(measurements),
+                               np.array([0 if kind == "sale" else 1 for kind in kinds])), catalog),
+    }
+
+    print(f"{events} событий по {sku_count} артикулам")
+    print(f"  sale/shipment по одному: {events / loop_time:12.0f} событий/с")
+    for label, (arrays, batch_catalog) in batches.items():
+        stock = make_stock(sku_count)
+        start = time.perf_counter()
+        apply_batch(stock, *arrays, catalog=batch_catalog)
+        batch_time = time.perf_counter() - start
+        assert {sku: item.quantity for sku, item in stock.items()} == expected
+        print(f"  {label + ':':<24}{events / batch_time:12.0f} событий/с")
+
+
+def bench_concurrent_inventory(operations_per_thread: int, sku_count: int = 1000) -> None:
+    """
+    Нагрузочный тест ConcurrentInventory: потоки продают и завозят случайные артикулы,
+    после чего итоговые остатки сверяются с ожидаемыми, чтобы убедиться в отсутствии потерянных обновлений.
+    :param operations_per_thread: Количество операций на поток
+    :param sku_count: Количество артикулов
+    """
+    print(f"ConcurrentInventory, {operations_per_thread} операций на поток, {sku_count} артикулов")
+    for thread_count in (1, 2, 4, 8):
+        inventory = ConcurrentInventory()
+        initial = 10 ** 9
+        for number in range(sku_count):
+            inventory.add_item(f"SKU{number}", Assortment("Крупы", f"Товар {number}", initial, "шт"))
+        plans = []
+        expected = {f"SKU{number}": initial for number in range(sku_count)}
+        for thread_number in range(thread_count):
+            rng = random.Random(thread_number)
+            plan = [(f"SKU{rng.randrange(sku_count)}", rng.randint(1, 5), rng.random() < 0.5)
+                    for _ in range(operations_per_thread)]
+            for sku, quantity, is_sale in plan:
+                expected[sku] += -quantity if is_sale else quantity
+            plans.append(plan)
+
+        def worker(plan: list) -> None:
+            for sku, quantity, is_sale in plan:
+                if is_sale:
+                    inventory.sale(sku, quantity, "шт")
+                else:
+                    inventory.shipment(sku, quantity, "шт")
+
+        threads = [threading.Thread(target=worker, args=(plan,)) for plan in plans]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        lost = sum(inventory.quantity(sku) != quantity for sku, quantity in expected.items())
+        print(f"  {thread_count} потоков: {thread_count * operations_per_thread / elapsed:12.0f} операций/с, "
+              f"расхождений остатков: {lost}")
+
+
+def project_profit_naive(departments: list, months: int) -> list:
+    """
+    Прогноз прибыли циклом Python по магазинам и месяцам, для сравнения с project_profit.
+    :param departments: Бухгалтерии магазинов
+    :param months: Количество месяцев прогноза
+    :return: Список строк прибыли по месяцам
+    """
+    matrix = []
+    for department in departments:
+        revenue = department.revenue
+        row = []
+        for _ in range(months):
+            row.append(revenue - department.expenses)
+            revenue *= 1 + department.growth
+        matrix.append(row)
+    return matrix
+
+
+def bench_profit_projection(shops: int = 20_000, months: int = 120) -> None:
+    """
+    Сравнивает векторный прогноз прибыли с наивным циклом.
+    :param shops: Количество магазинов
+    :param months: Количество месяцев
+    """
+    rng = random.Random(shops)
+    departments = [AccountsDepartment(rng.uniform(50_000, 500_000), rng.uniform(40_000, 400_000),
+                                      rng.uniform(-0.02, 0.05)) for _ in range(shops)]
+    start = time.perf_counter()
+    naive = project_profit_naive(departments, months)
+    naive_time = time.perf_counter() - start
+    start = time.perf_counter()
+    vectorized = project_profit([department.revenue for department in departments],
+                                [department.expenses for department in departments],
+                                [department.growth for department in departments], months)
+    vectorized_time = time.perf_counter() - start
+    assert np.allclose(vectorized, naive)
+    print(f"Прогноз прибыли {shops} магазинов на {months} месяцев")
+    print(f"  цикл Python:    {naive_time:8.3f} с")
+    print(f"  project_profit: {vectorized_time:8.3f} с")
+
+
+def bench_reconciliation(events: int, categories: int = 64, skus_per_category: int = 50) -> None:
+    """
+    Сверка журнала за день в одном процессе и в нескольких процессах по категориям.
+    Ускорение не может быть больше числа ядер и числа категорий.
+    :param events: Количество событий
+    :param categories: Количество категорий товаров
+    :param skus_per_category: Количество артикулов в категории
+    """
+    def make_categorized_stock() -> dict:
+        return {f"SKU{category}-{number}": Assortment(f"Категория {category}", f"Товар {number}", 10 ** 9, "шт")
+                for category in range(categories) for number in range(skus_per_category)}
+
+    rng = random.Random(events)
+    skus = [f"SKU{rng.randrange(categories)}-{rng.randrange(skus_per_category)}" for _ in range(events)]
+    quantities = [rng.randint(1, 5) for _ in range(events)]
+    measurements = ["шт"] * events
+    kinds = [rng.choice(("sale", "shipment")) for _ in range(events)]
+
+    print(f"Сверка {events} событий по {categories} категориям, ядер: {os.cpu_count()}")
+    expected = None
+    single_time = None
+    workers = 1
+    while True:
+        stock = make_categorized_stock()
+        start = time.perf_counter()
+        reconcile(stock, skus, quantities, measurements, kinds, workers=workers)
+        elapsed = time.perf_counter() - start
+        result = {sku: item.quantity for sku, item in stock.items()}
+        if expected is None:
+            expected, single_time = result, elapsed
+        assert result == expected
+        print(f"  процессов: {workers:3d}: {elapsed:8.3f} с, ускорение {single_time / elapsed:5.2f}x")
+        if workers >= (os.cpu_count() or 1):
+            break
+        workers = min(workers * 2, os.cpu_count())
+
+
+def bench_stock_tracker(events: int, sku_count: int = 100_000, top: int = 10, resorts: int = 20) -> None:
+    """
+    Сравнивает продажи без трекера и с трекером StockTracker, а также чтение "top товаров,
+    которые заканчиваются" из кучи трекера и пересортировкой всего склада.
+    :param events: Количество продаж
+    :param sku_count: Количество артикулов
+    :param top: Длина списков
+    :param resorts: Количество пересортировок склада для сравнения
+    """
+    rng = random.Random(events)
+    weights = list(accumulate(1 / rank for rank in range(1, sku_count + 1)))
+    skus = [f"SKU{number}" for number in rng.choices(range(sku_count), cum_weights=weights, k=events)]
+    quantities = [rng.randint(1, 5) for _ in range(events)]
+
+    def run(stock: dict) -> float:
+        start = time.perf_counter()
+        for sku, quantity in zip(skus, quantities):
+            stock[sku].sale(quantity, "шт")
+        return time.perf_counter() - start
+
+    plain_time = run(make_stock(sku_count))
+    stock = make_stock(sku_count)
+    tracker = StockTracker(stock)
+    tracked_time = run(stock)
+    start = time.perf_counter()
+    for _ in range(resorts):
+        lowest = tracker.lowest(top)
+        tracker.top_sellers(top)
+    read_time = (time.perf_counter() - start) / resorts
+    start = time.perf_counter()
+    for _ in range(resorts):
+        resorted = sorted(stock.items(), key=lambda pair: pair[1].quantity)[:top]
+    resort_time = (time.perf_counter() - start) / resorts
+    tracker.close()
+    assert [quantity for _, quantity, _ in lowest] == [item.quantity for _, item in resorted]
+
+    print(f"{events} продаж по {sku_count} артикулам, списки по {top}")
+    print(f"  sale без трекера:      {events / plain_time:12.0f} продаж/с")
+    print(f"  sale с трекером:       {events / tracked_time:12.0f} продаж/с")
+    print(f"  чтение двух списков:   {read_time * 1e6:12.1f} мкс")
+    print(f"  пересортировка склада: {resort_time * 1e6:12.1f} мкс")
+
+
+if __name__ == "__main__":
+    # Количество событий можно передать аргументом: python benchmarks.py 10000000
+    event_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    bench_batch_transactions(event_count)
+    bench_concurrent_inventory(event_count // 10)
+    bench_profit_projection()
+    bench_reconciliation(event_count)
+    bench_stock_tracker(event_count)
@@ -0,0 +1,113 @@
+import threading
+from typing import Dict, Iterator, Union
+
+from main import Assortment
+
+
+class ConcurrentInventory:
+    """
+    Потокобезопасный склад товаров Assortment с полосатыми блокировками.
+    Каждый артикул закреплён за одной из stripes блокировок по хешу, поэтому операции
+    над разными артикулами почти никогда не ждут друг друга, а над одним - выполняются по очереди.
+    """
+    def __init__(self, stripes: int = 64):
+        """
+        Создание и подготовка к работе объекта "Потокобезопасный склад"
+        :param stripes: Количество блокировок
+        Примеры:
+        >>> inventory = ConcurrentInventory(16)
+        """
+        if not isinstance(stripes, int):
+            raise TypeError("Количество блокировок должно быть типа int")
+        if stripes <= 0:
+            raise ValueError("Количество блокировок должно быть положительным числом")
+        self._locks = [threading.Lock() for _ in range(stripes)]
+        self._items: Dict[str, Assortment] = {}
+
+    def _lock_for(self, sku: str) -> threading.Lock:
+        return self._locks[hash(sku) % len(self._locks)]
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._items))
+
+    def add_item(self, sku: str, item: Assortment) -> None:
+        """
+        Добавляет товар на склад под указанным артикулом.
+        :param sku: Артикул
+        :param item: Товар
+        Примеры:
+        >>> inventory = ConcurrentInventory()
+        >>> inventory.add_item('A1', Assortment('Крупы', 'Гречка', 10, 'шт'))
+        """
+        if not isinstance(sku, str):
+            raise TypeError("Артикул должен быть типа str")
+        if not isinstance(item, Assortment):
+            raise TypeError("Товар должен быть типа Assortment")
+        with self._lock_for(sku):
+            if sku in self._items:
+                raise ValueError(f"Артикул {sku} уже есть на складе")
+            self._items[sku] = item
+
+    def get_item(self, sku: str) -> Assortment:
+        """
+        Возвращает товар по артикулу.
+        :param sku: Артикул
+        :return: Товар
+        """
+        try:
+            return self._items[sku]
+        except KeyError:
+            raise ValueError(f"Артикула {sku} нет на складе") from None
+
+    def quantity(self, sku: str) -> Union[int, float]:
+        """
+        Возвращает согласованный остаток товара.
+        :param sku: Артикул
+        :return: Количество товара в наличии
+        """
+        item = self.get_item(sku)
+        with self._lock_for(sku):
+            return item.quantity
+
+    def sale(self, sku: str, quantity_of_sales: Union[int, float], sale_measurement: str) -> None:
+        """
+        Атомарно выполняет Assortment.sale для артикула.
+        :param sku: Артикул
+        :param quantity_of_sales: Количество проданного товара
+        :param sale_measurement: Единица измерения количества проданного товара
+        Примеры:
+        >>> inventory = ConcurrentInventory()
+        >>> inventory.add_item('A1', Assortment('Крупы', 'Гречка', 10, 'шт'))
+        >>> inventory.sale('A1', 4, 'шт')
+        >>> inventory.quantity('A1')
+        6
+        """
+        item = self.get_item(sku)
+        with self._lock_for(sku):
+            item.sale(quantity_of_sales, sale_measurement)
+
+    def shipment(self, sku: str, shipment_quantity: Union[int, float], shipment_measurement: str) -> None:
+        """
+        Атомарно выполняет Assortment.shipment для артикула.
+        :param sku: Артикул
+        :param shipment_quantity: Количество закупленного товара
+        :param shipment_measurement: Единица измерения количества закупленного товара
+        Примеры:
+        >>> inventory = ConcurrentInventory()
+        >>> inventory.add_item('A1', Assortment('Крупы', 'Гречка', 10, 'шт'))
+        >>> inventory.shipment('A1', 5, 'шт')
+        >>> inventory.quantity('A1')
+        15
+        """
+        item = self.get_item(sku)
+        with self._lock_for(sku):
+            item.shipment(shipment_quantity, shipment_measurement)
+
+
+if __name__ == "__main__":
+    import doctest
+
+    doctest.testmod()
@@ -0,0 +1,176 @@
+import math
+from collections import deque
+from typing import Dict, Iterable, Tuple, Union
+
+REVENUE = "revenue"
+EXPENSE = "expense"
+
+DAY = 24 * 60 * 60
+# Окна агрегирования по умолчанию, в секундах
+DEFAULT_WINDOWS = {"day": DAY, "week": 7 * DAY, "month": 30 * DAY}
+
+
+class RollingLedger:
+    """
+    Потоковый журнал выручки и расходов.
+    Хранит общие суммы и суммы за скользящие окна (день, неделя, месяц). Каждое окно - очередь
+    событий и текущая сумма: новое событие прибавляется, вышедшие из окна вычитаются,
+    поэтому обновление стоит O(1) амортизированно, а запрос суммы - O(1).
+    Целые суммы считаются точно. Дробные не накапливают ошибку округления: общие суммы
+    складываются с компенсацией (алгоритм Ноймайера), а сумма окна пересчитывается через math.fsum,
+    когда из окна вычтено не меньше событий, чем в нём осталось, и обнуляется, когда окно пустеет.
+    """
+    def __init__(self, windows: Dict[str, Union[int, float]] = None):
+        """
+        Создание и подготовка к работе объекта "Журнал операций"
+        :param windows: Окна агрегирования: название -> длина в секундах
+        Примеры:
+        >>> ledger = RollingLedger({'hour': 3600})
+        """
+        if windows is None:
+            windows = DEFAULT_WINDOWS
+        if not isinstance(windows, dict):
+            raise TypeError("Окна агрегирования должны быть типа dict")
+        for length in windows.values():
+            if not isinstance(length, (int, float)):
+                raise TypeError("Длина окна должна быть типа int или float")
+            if length <= 0:
+                raise ValueError("Длина окна должна быть положительным числом")
+        self.windows = dict(windows)
+        self.now = None
+        self._totals = {REVENUE: 0, EXPENSE: 0}
+        # Поправки Ноймайера к общим суммам: потерянные при сложении младшие разряды
+        self._compensations = {REVENUE: 0, EXPENSE: 0}
+        self._events = {(kind, window): deque() for kind in self._totals for window in self.windows}
+        self._sums = {key: 0 for key in self._events}
+        # Сколько событий вычтено из суммы окна с последнего точного пересчёта
+        self._removed = {key: 0 for key in self._events}
+
+    def _check_event(self, kind: str, amount: Union[int, float]) -> None:
+        if kind not in self._totals:
+            raise ValueError("Вид операции должен быть 'revenue' или 'expense'")
+        if not isinstance(amount, (int, float)):
+            raise TypeError("Сумма операции должна быть типа int или float")
+        if not math.isfinite(amount):
+            raise ValueError("Сумма операции должна быть конечным числом")
+        if amount < 0:
+            raise ValueError("Сумма операции не может быть отрицательной")
+
+    @staticmethod
+    def _check_time(timestamp: Union[int, float], now: Union[int, float, None]) -> None:
+        if not isinstance(timestamp, (int, float)):
+            raise TypeError("Время операции должно быть типа int или float")
+        if not math.isfinite(timestamp):
+            raise ValueError("Время операции должно быть конечным числом")
+        if now is not None and timestamp < now:
+            raise ValueError("Время операций не должно убывать")
+
+    def record(self, kind: str, amount: Union[int, float], timestamp: Union[int, float]) -> None:
+        """
+        Учитывает одну операцию. Время операций не должно убывать.
+        :param kind: Вид операции: 'revenue' или 'expense'
+        :param amount: Сумма операции
+        :param timestamp: Время операции в секундах
+        Примеры:
+        >>> ledger = RollingLedger({'day': 86400})
+        >>> ledger.record('revenue', 1500, 0)
+        >>> ledger.record('expense', 400, 3600)
+        >>> ledger.window_sum('revenue', 'day') - ledger.window_sum('expense', 'day')
+        1100
+        >>> ledger.record('revenue', float('nan'), 7200)
+        Traceback (most recent call last):
+        ...
+        ValueError: Сумма операции должна быть конечным числом
+        """
+        self._check_event(kind, amount)
+        self.advance(timestamp)
+        self._apply(kind, amount, timestamp)
+
+    def _apply(self, kind: str, amount: Union[int, float], timestamp: Union[int, float]) -> None:
+        total = self._totals[kind]
+        updated = total + amount
+        if abs(total) >= abs(amount):
+            self._compensations[kind] += (total - updated) + amount
+        else:
+            self._compensations[kind] += (amount - updated) + total
+        self._totals[kind] = updated
+        for window in self.windows:
+            key = (kind, window)
+            self._events[key].append((timestamp, amount))
+            self._sums[key] += amount
+
+    def record_many(self, events: Iterable[Tuple[str, Union[int, float], Union[int, float]]]) -> None:
+        """
+        Учитывает пакет операций (вид, сумма, время) в порядке следования.
+        Пакет проверяется целиком до первого изменения: при ошибке журнал не меняется.
+        :param events: Операции
+        Примеры:
+        >>> ledger = RollingLedger({'day': 86400})
+        >>> ledger.record_many([('revenue', 100, 0), ('expense', -5, 10)])
+        Traceback (most recent call last):
+        ...
+        ValueError: Сумма операции не может быть отрицательной
+        >>> ledger.total('revenue'), ledger.now
+        (0, None)
+        >>> ledger.record_many([(kind, 0.1, second) for second, kind in enumerate(['revenue'] * 10)])
+        >>> ledger.total('revenue')
+        1.0
+        """
+        events = list(events)
+        now = self.now
+        for kind, amount, timestamp in events:
+            self._check_event(kind, amount)
+            self._check_time(timestamp, now)
+            now = timestamp
+        for kind, amount, timestamp in events:
+            self.advance(timestamp)
+            self._apply(kind, amount, timestamp)
+
+    def advance(self, timestamp: Union[int, float]) -> None:
+        """
+        Сдвигает текущее время журнала и вычитает из окон устаревшие операции.
+        :param timestamp: Новое текущее время в секундах
+        """
+        self._check_time(timestamp, self.now)
+        self.now = timestamp
+        sums, removed = self._sums, self._removed
+        for key, events in self._events.items():
+            border = timestamp - self.windows[key[1]]
+            if not events or events[0][0] > border:
+                continue
+            while events and events[0][0] <= border:
+                sums[key] -= events.popleft()[1]
+                removed[key] += 1
+            if not events:
+                sums[key] = 0
+                removed[key] = 0
+            elif isinstance(sums[key], float) and removed[key] >= len(events):
+                # Точный пересчёт стоит len(events), но оплачен уже вычтенными событиями: O(1) амортизированно
+                sums[key] = math.fsum(amount for _, amount in events)
+                removed[key] = 0
+
+    def total(self, kind: str) -> Union[int, float]:
+        """
+        Возвращает сумму операций вида kind за всё время.
+        :param kind: Вид операции
+        :return: Сумма
+        """
+        return self._totals[kind] + self._compensations[kind]
+
+    def window_sum(self, kind: str, window: str) -> Union[int, float]:
+        """
+        Возвращает сумму операций вида kind за окно, заканчивающееся текущим временем журнала.
+        :param kind: Вид операции
+        :param window: Название окна
+        :return: Сумма
+        """
+        try:
+            return self._sums[(kind, window)]
+        except KeyError:
+            raise ValueError(f"Неизвестный вид операции или окно: {kind}, {window}") from None
+
+
+if __name__ == "__main__":
+    import doctest
+
+    doctest.testmod()
@@ -1,8 +1,18 @@
-import doctest
-from typing import Union
+import inspect
+import weakref
+from typing import Callable, Union
+
+from ledger import EXPENSE, REVENUE, RollingLedger
+from staff_roster import StaffRoster
+from units import TOLERANCE, convert
 
 
 class Assortment:
+    # Слабые ссылки на наблюдателей за изменением остатков (см. stock_tracker.py и subscribe):
+    # наблюдатель вызывается как observer(товар, продано) после каждой продажи и поставки;
+    # продано - в единицах товара, для поставки 0
+    observers = []
+
     def __init__(self, category_name: str, product_name: str,
                  product_quantity: Union[int, float], product_measurement: str):
         """
@@ -33,11 +43,22 @@ class Assortment:
     def sale(self, quantity_of_sales: Union[int, float], sale_measurement: str) -> None:
         """
         Функция, которая вычитает количество проданного товара из количества товара в наличии.
+        Если единицы измерения различаются, количество пересчитывается через реестр units.py.
         :param quantity_of_sales: Количество проданного товара
         :param sale_measurement: Единица измерения количества проданного товара
         Примеры:
         >>> product = Assortment('Крупы', 'Гречка', 1500, 'упаковка 900г')
         >>> product.sale(679, 'упаковка 900г')
+        >>> product.quantity
+        821
+        >>> product = Assortment('Овощи', 'Помидоры', 1.5, 'тонна')
+        >>> product.sale(500, 'кг')
+        >>> product.quantity
+        1.0
+        >>> product = Assortment('Овощи', 'Картофель', 0.7, 'т')
+        >>> product.sale(700, 'кг')
+        >>> product.quantity
+        0.0
         """
         if not isinstance(quantity_of_sales, (int, float)):
             raise TypeError("Количество проданного товара должно быть типа int или float")
@@ -46,17 +67,27 @@ class Assortment:
         if not isinstance(sale_measurement, str):
             raise TypeError("Единица измерения количества проданного товара должна быть типа str")
         if sale_measurement != self.measurement:
-            raise ValueError("Единицы измерения количества проданного товара и количества в наличии должны совпадать")
-        ...
+            quantity_of_sales = convert(quantity_of_sales, sale_measurement, self.measurement)
+            if self.quantity < quantity_of_sales <= self.quantity * (1 + TOLERANCE):
+                # Превышение в пределах погрешности пересчёта: продан весь остаток
+                quantity_of_sales = self.quantity
+        if quantity_of_sales > self.quantity:
+            raise ValueError("Количество проданного товара не может превышать количество товара в наличии")
+        self.quantity -= quantity_of_sales
+        if self.observers:
+            self._notify(quantity_of_sales)
 
     def shipment(self, shipment_quantity: Union[int, float], shipment_measurement: str) -> None:
         """
         Функция, которая прибавляет количество закупленного товара к количеству товара в наличии.
+        Если единицы измерения различаются, количество пересчитывается через реестр units.py.
         :param shipment_quantity: Количество закупленного товара
         :param shipment_measurement: Единица измерения количества закупленного товара
         Примеры:
         >>> product = Assortment('Молочка', 'Кефир', 890, 'упаковка 1л')
         >>> product.shipment(130, 'упаковка 1л')
+        >>> product.quantity
+        1020
         """
         if not isinstance(shipment_quantity, (int, float)):
             raise TypeError("Количество закупленного товара должно быть типа int или float")
@@ -65,8 +96,55 @@ class Assortment:
         if not isinstance(shipment_measurement, str):
             raise TypeError("Единица измерения количества закупленного товара должна быть типа str")
         if shipment_measurement != self.measurement:
-            raise ValueError("Единицы измерения количества закупленного товара и количества в наличии должны совпадать")
-        ...
+            shipment_quantity = convert(shipment_quantity, shipment_measurement, self.measurement)
+        self.quantity += shipment_quantity
+        if self.observers:
+            self._notify(0)
+
+    @classmethod
+    def subscribe(cls, observer: Callable) -> None:
+        """
+        Подписывает наблюдателя на изменения остатков всех товаров. Хранится слабая ссылка:
+        подписка не продлевает жизнь наблюдателю и снимается сама, когда он удалён.
+        :param observer: Функция или метод вида observer(товар, продано)
+        Примеры:
+        >>> class Printer:
+        ...     def show(self, item, sold):
+        ...         print(item.product, item.quantity, sold)
+        >>> printer = Printer()
+        >>> Assortment.subscribe(printer.show)
+        >>> Assortment('Крупы', 'Гречка', 10, 'шт').sale(3, 'шт')
+        Гречка 7 3
+        >>> del printer
+        >>> Assortment.observers
+        []
+        """
+        reference = weakref.WeakMethod if inspect.ismethod(observer) else weakref.ref
+        cls.observers.append(reference(observer, cls._forget))
+
+    @classmethod
+    def unsubscribe(cls, observer: Callable) -> None:
+        """
+        Отписывает наблюдателя от изменений остатков.
+        :param observer: Функция или метод, переданные в subscribe
+        """
+        cls.observers[:] = [reference for reference in cls.observers if reference() not in (None, observer)]
+
+    @classmethod
+    def _forget(cls, reference: weakref.ref) -> None:
+        if reference in cls.observers:
+            cls.observers.remove(reference)
+
+    def _notify(self, sold: Union[int, float]) -> None:
+        """
+        Сообщает наблюдателям о новом остатке товара.
+        :param sold: Сколько товара продано этим изменением, в единицах товара
+        """
+        # Копия списка: наблюдатель может отписаться или быть удалён во время рассылки
+        for reference in tuple(self.observers):
+            observer = reference()
+            if observer is not None:
+                observer(self, sold)
 
 
 class Staff:
@@ -101,24 +179,57 @@ class Staff:
         if not isinstance(employee_education, str):
             raise TypeError("Сведения об образовании должны быть типа str")
         self.education = employee_education
+        self.employee_key = None  # Ключ в списке персонала, пока сотрудник не принят - None
 
-    def recruitment(self) -> None:
+    def recruitment(self, roster: StaffRoster = None) -> None:
         """
         Функция, которая добавляет сотрудника в список персонала(создать заранее)
+        :param roster: Список персонала, по умолчанию общий staff_roster
         Примеры:
         >>> employee = Staff('Электрик', 'Тимофей', 39, 8, 'Среднее специальное')
         >>> employee.recruitment()
         """
-        ...
+        if roster is None:
+            roster = staff_roster
+        if not isinstance(roster, StaffRoster):
+            raise TypeError("Список персонала должен быть типа StaffRoster")
+        if self.employee_key is not None:
+            raise ValueError("Сотрудник уже принят на работу")
+        self.employee_key = roster.hire(self)
 
-    def dismissal(self) -> None:
+    def dismissal(self, roster: StaffRoster = None) -> None:
         """
         Функция, которая удаляет сотрудника из списка персонала
+        :param roster: Список персонала, по умолчанию общий staff_roster
         Примеры:
         >>> employee = Staff('Грузчик', 'Игнат', 20, 2, 'Среднее общее образование')
+        >>> employee.recruitment()
         >>> employee.dismissal()
-        """
+        >>> first, second = StaffRoster(), StaffRoster()
+        >>> cashier = Staff('Кассир', 'Олег', 34, 6, 'Высшее')
+        >>> loader = Staff('Грузчик', 'Игнат', 35, 9, 'Среднее общее образование')
+        >>> cashier.recruitment(first)
+        >>> loader.recruitment(second)
+        >>> cashier.dismissal(second)
+        Traceback (most recent call last):
         ...
+        ValueError: Сотрудника нет в списке персонала
+        >>> len(second), loader.employee_key
+        (1, 1)
+        """
+        if roster is None:
+            roster = staff_roster
+        if not isinstance(roster, StaffRoster):
+            raise TypeError("Список персонала должен быть типа StaffRoster")
+        # Ключи уникальны только внутри одного списка: под тем же ключом в другом списке - другой сотрудник
+        if self.employee_key is None or self.employee_key not in roster or roster.get(self.employee_key) is not self:
+            raise ValueError("Сотрудника нет в списке персонала")
+        roster.fire(self.employee_key)
+        self.employee_key = None
+
+
+# Общий список персонала, в который по умолчанию принимает Staff.recruitment
+staff_roster = StaffRoster()
 
 
 class AccountsDepartment:
@@ -145,27 +256,124 @@ class AccountsDepartment:
         if not isinstance(revenue_growth, (int, float)):
             raise TypeError("Рост выручки в месяц должен быть типа int или float")
         self.growth = revenue_growth
+        self.ledger = None  # Журнал операций, есть только в потоковом режиме
+
+    @classmethod
+    def streaming(cls, revenue_growth: Union[int, float], windows: dict = None) -> "AccountsDepartment":
+        """
+        Создаёт бухгалтерию в потоковом режиме: выручка и расходы за месяц не задаются
+        снимком, а поддерживаются журналом RollingLedger по мере поступления операций.
+        :param revenue_growth: Рост выручки в месяц
+        :param windows: Окна агрегирования журнала, обязательно с окном 'month'
+        :return: Бухгалтерия с журналом операций
+        Примеры:
+        >>> count = AccountsDepartment.streaming(0.05)
+        >>> count.record_revenue(137500, 0)
+        >>> count.record_expenses(120689.8, 60)
+        >>> round(count.shop_profit(), 2)
+        16810.2
+        """
+        department = cls(0, 0, revenue_growth)
+        department.ledger = RollingLedger(windows)
+        if "month" not in department.ledger.windows:
+            raise ValueError("В журнале должно быть окно 'month'")
+        return department
+
+    def _record(self, kind: str, amount: Union[int, float], timestamp: Union[int, float]) -> None:
+        if self.ledger is None:
+            raise ValueError("Операции можно учитывать только в потоковом режиме, см. AccountsDepartment.streaming")
+        self.ledger.record(kind, amount, timestamp)
+        self._sync_month()
+
+    def _sync_month(self) -> None:
+        self.revenue = self.ledger.window_sum(REVENUE, "month")
+        self.expenses = self.ledger.window_sum(EXPENSE, "month")
+
+    def record_revenue(self, amount: Union[int, float], timestamp: Union[int, float]) -> None:
+        """
+        Функция, которая учитывает поступление выручки за O(1)
+        :param amount: Сумма выручки
+        :param timestamp: Время операции в секундах
+        """
+        self._record(REVENUE, amount, timestamp)
+
+    def record_expenses(self, amount: Union[int, float], timestamp: Union[int, float]) -> None:
+        """
+        Функция, которая учитывает расход за O(1)
+        :param amount: Сумма расхода
+        :param timestamp: Время операции в секундах
+        """
+        self._record(EXPENSE, amount, timestamp)
+
+    def record_events(self, events: list) -> None:
+        """
+        Функция, которая учитывает пакет операций (вид 'revenue'/'expense', сумма, время)
+        :param events: Операции в порядке времени
+        """
+        if self.ledger is None:
+            raise ValueError("Операции можно учитывать только в потоковом режиме, см. AccountsDepartment.streaming")
+        self.ledger.record_many(events)
+        self._sync_month()
+
+    def advance(self, timestamp: Union[int, float]) -> None:
+        """
+        Функция, которая сдвигает текущее время журнала без новых операций:
+        выручка и расходы вышедших из месяца операций перестают учитываться
+        :param timestamp: Новое текущее время в секундах
+        Примеры:
+        >>> count = AccountsDepartment.streaming(0.05)
+        >>> count.record_revenue(137500, 0)
+        >>> count.advance(31 * 24 * 60 * 60)
+        >>> count.shop_profit(), count.window_profit('day')
+        (0, 0)
+        """
+        if self.ledger is None:
+            raise ValueError("Время есть только в потоковом режиме, см. AccountsDepartment.streaming")
+        self.ledger.advance(timestamp)
+        self._sync_month()
+
+    def window_profit(self, window: str) -> Union[int, float]:
+        """
+        Функция, которая возвращает прибыль за скользящее окно журнала ('day', 'week', 'month')
+        :param window: Название окна
+        :return: Прибыль за окно
+        Примеры:
+        >>> count = AccountsDepartment.streaming(0.05)
+        >>> count.record_events([('revenue', 900, 0), ('expense', 300, 90000), ('revenue', 500, 100000)])
+        >>> count.window_profit('day'), count.window_profit('week')
+        (200, 1100)
+        """
+        if self.ledger is None:
+            raise ValueError("Окна доступны только в потоковом режиме, см. AccountsDepartment.streaming")
+        return self.ledger.window_sum(REVENUE, window) - self.ledger.window_sum(EXPENSE, window)
 
     def shop_profit(self) -> Union[int, float]:
         """
-        Функция, которая высчитывает прибыль за месяц
+        Функция, которая высчитывает прибыль за месяц.
+        В потоковом режиме выручка и расходы - поддерживаемые журналом суммы за месяц,
+        заканчивающийся последней операцией или временем, переданным в advance.
         :return: Прибыль за месяц
         Примеры:
         >>> count = AccountsDepartment(110568, 136000, 0.15)
         >>> count.shop_profit()
+        -25432
         """
-        ...
+        return self.revenue - self.expenses
 
     def growth_profit(self) -> Union[int, float]:
         """
-        Функция, которая высчитывает рост прибыли в месяц
+        Функция, которая высчитывает рост прибыли в месяц.
+        Расходы считаются постоянными, поэтому прибыль растёт на прирост выручки.
         :return: Рост прибыли в месяц
         Примеры:
         >>> count = AccountsDepartment(125879, 250879, 0.15)
-        >>> count.shop_profit()
+        >>> count.growth_profit()
+        18881.85
         """
-        ...
+        return self.revenue * self.growth
 
 
 if __name__ == "__main__":
+    import doctest
+
     doctest.testmod()
@@ -0,0 +1,61 @@
+from typing import Iterable, Sequence, Union
+
+import numpy as np
+
+from main import AccountsDepartment
+
+
+def project_profit(revenues: Sequence[Union[int, float]], expenses: Sequence[Union[int, float]],
+                   growth: Sequence[Union[int, float]], months: int) -> np.ndarray:
+    """
+    Прогнозирует прибыль множества магазинов на months месяцев вперёд за один вызов.
+    Выручка растёт сложным процентом, расходы постоянны, поэтому прибыль магазина s
+    в месяце m равна revenues[s] * (1 + growth[s]) ** m - expenses[s]. Формула считается
+    трансляцией массивов NumPy без циклов Python.
+    :param revenues: Выручка магазинов за текущий месяц
+    :param expenses: Расходы магазинов за месяц
+    :param growth: Рост выручки в месяц для каждого магазина
+    :param months: Количество месяцев прогноза, месяц 0 - текущий
+    :return: Матрица прибыли размера магазины x месяцы
+    Примеры:
+    >>> project_profit([100, 200], [50, 250], [0.1, 0.0], 3).round(2)
+    array([[ 50.,  60.,  71.],
+           [-50., -50., -50.]])
+    """
+    if not isinstance(months, int):
+        raise TypeError("Количество месяцев должно быть типа int")
+    if months <= 0:
+        raise ValueError("Количество месяцев должно быть положительным числом")
+    revenues = np.asarray(revenues, dtype=float)
+    expenses = np.asarray(expenses, dtype=float)
+    growth = np.asarray(growth, dtype=float)
+    if revenues.ndim != 1 or not revenues.shape == expenses.shape == growth.shape:
+        raise ValueError("Массивы выручки, расходов и роста должны быть одномерными и одинаковой длины")
+    if (revenues < 0).any():
+        raise ValueError("Выручка не может быть отрицательной")
+    if (expenses < 0).any():
+        raise ValueError("Расходы не могут быть отрицательными")
+    compounding = np.power(1 + growth[:, np.newaxis], np.arange(months))
+    return revenues[:, np.newaxis] * compounding - expenses[:, np.newaxis]
+
+
+def project_departments(departments: Iterable[AccountsDepartment], months: int) -> np.ndarray:
+    """
+    Прогнозирует прибыль для списка объектов AccountsDepartment.
+    :param departments: Бухгалтерии магазинов
+    :param months: Количество месяцев прогноза
+    :return: Матрица прибыли размера магазины x месяцы
+    Примеры:
+    >>> project_departments([AccountsDepartment(137500, 120689.8, 0.05)], 2).round(2)
+    array([[16810.2, 23685.2]])
+    """
+    departments = list(departments)
+    return project_profit([department.revenue for department in departments],
+                          [department.expenses for department in departments],
+                          [department.growth for department in departments], months)
+
+
+if __name__ == "__main__":
+    import doctest
+
+    doctest.testmod()
@@ -0,0 +1,157 @@
+import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Sequence, Union
+
+from main import Assortment
+from transactions import SALE, SHIPMENT
+
+
+class SkuDelta(NamedTuple):
+    """Итог сверки одного артикула: изменение остатка, количество отклонённых событий и продано всего."""
+    delta: Union[int, float]
+    rejected: int
+    sold: Union[int, float] = 0
+
+
+class Shard(NamedTuple):
+    """События одной категории в исходном порядке, колонками, и копии её артикулов."""
+    items: Dict[str, Assortment]
+    skus: List[str]
+    quantities: List[Union[int, float]]
+    measurements: List[str]
+    kinds: List[str]
+
+
+def partition_by_category(stock: Dict[str, Assortment], skus: Sequence[str],
+                          quantities: Sequence[Union[int, float]], measurements: Sequence[str],
+                          kinds: Sequence[str]) -> Dict[str, Shard]:
+    """
+    Делит журнал событий на части по категории товара. Порядок событий внутри части сохраняется,
+    а разные категории не делят артикулов, поэтому части можно воспроизводить независимо.
+    :param stock: Склад: артикул -> Assortment
+    :param skus: Артикулы событий
+    :param quantities: Количества товара
+    :param measurements: Единицы измерения количества
+    :param kinds: Виды событий: 'sale' или 'shipment'
+    :return: Категория -> часть журнала
+    """
+    if not len(skus) == len(quantities) == len(measurements) == len(kinds):
+        raise ValueError("Колонки журнала должны быть одинаковой длины")
+    shards = {}
+    # Артикул -> колонки его категории: один поиск в словаре на событие
+    columns_of = {}
+    for sku, item in stock.items():
+        shard = shards.get(item.category)
+        if shard is None:
+            shard = shards[item.category] = Shard({}, [], [], [], [])
+        shard.items[sku] = item
+        columns_of[sku] = shard
+    for sku, quantity, measurement, kind in zip(skus, quantities, measurements, kinds):
+        shard = columns_of.get(sku)
+        if shard is None:
+            raise ValueError(f"Артикула {sku} нет на складе")
+        shard.skus.append(sku)
+        shard.quantities.append(quantity)
+        shard.measurements.append(measurement)
+        shard.kinds.append(kind)
+    return {category: shard for category, shard in shards.items() if shard.skus}
+
+
+def _detach_observers() -> None:
+    # Дочерний процесс наследует наблюдателей родителя при fork; там они не нужны: об итогах
+    # сообщает merge_deltas в родителе
+    Assortment.observers = []
+
+
+def replay_shard(shard: Shard) -> Dict[str, SkuDelta]:
+    """
+    Воспроизводит события части журнала через Assortment.sale и Assortment.shipment
+    с их проверками и пересчётом единиц. Событие, которое не прошло проверку (например,
+    продажа больше остатка на тот момент), пропускается и считается отклонённым.
+    В дочернем процессе товары - копии, поэтому наружу возвращаются только изменения.
+    :param shard: Часть журнала
+    :return: Артикул -> изменение остатка, число отклонённых событий и проданное количество
+    """
+    opening = {sku: item.quantity for sku, item in shard.items.items()}
+    rejected = defaultdict(int)
+    sold = defaultdict(int)
+    items = shard.items
+    for sku, quantity, measurement, kind in zip(shard.skus, shard.quantities, shard.measurements, shard.kinds):
+        item = items[sku]
+        try:
+            if kind == SALE:
+                before = item.quantity
+                item.sale(quantity, measurement)
+                sold[sku] += before - item.quantity
+            elif kind == SHIPMENT:
+                item.shipment(quantity, measurement)
+            else:
+                raise ValueError("Вид операции должен быть 'sale' или 'shipment'")
+        except (TypeError, ValueError):
+            rejected[sku] += 1
+    return {sku: SkuDelta(items[sku].quantity - opening[sku], rejected[sku], sold[sku])
+            for sku in set(shard.skus)}
+
+
+def merge_deltas(stock: Dict[str, Assortment], deltas: Dict[str, SkuDelta]) -> None:
+    """
+    Прибавляет изменения остатков к главному складу и сообщает о них наблюдателям Assortment.
+    :param stock: Склад: артикул -> Assortment
+    :param deltas: Артикул -> изменение остатка
+    """
+    for sku, result in deltas.items():
+        item = stock[sku]
+        item.quantity += result.delta
+        if item.observers:
+            item._notify(result.sold)
+
+
+def reconcile(stock: Dict[str, Assortment], skus: Sequence[str], quantities: Sequence[Union[int, float]],
+              measurements: Sequence[str], kinds: Sequence[str], workers: Optional[int] = None) -> Dict[str, SkuDelta]:
+    """
+    Сверка журнала продаж и поставок за день: журнал делится по категориям, категории
+    воспроизводятся параллельно в процессах, изменения остатков сливаются в склад.
+    Распараллеливание ограничено числом категорий: одна категория обрабатывается одним процессом.
+    :param stock: Склад: артикул -> Assortment
+    :param skus: Артикулы событий
+    :param quantities: Количества товара
+    :param measurements: Единицы измерения количества
+    :param kinds: Виды событий: 'sale' или 'shipment'
+    :param workers: Количество процессов; по умолчанию число ядер, при 1 сверка идёт в текущем процессе
+    :return: Артикул -> изменение остатка, число отклонённых событий и проданное количество
+    Примеры:
+    >>> stock = {'A1': Assortment('Крупы', 'Гречка', 10, 'шт'), 'B2': Assortment('Овощи', 'Помидоры', 1.5, 'тонна')}
+    >>> reconcile(stock, ['A1', 'B2', 'A1', 'A1'], [3, 500, 20, 2], ['шт', 'кг', 'шт', 'шт'],
+    ...           ['sale', 'sale', 'sale', 'shipment'], workers=2)
+    {'A1': SkuDelta(delta=-1, rejected=1, sold=3), 'B2': SkuDelta(delta=-0.5, rejected=0, sold=0.5)}
+    >>> stock['A1'].quantity, stock['B2'].quantity
+    (9, 1.0)
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if not isinstance(workers, int):
+        raise TypeError("Количество процессов должно быть типа int")
+    if workers <= 0:
+        raise ValueError("Количество процессов должно быть положительным числом")
+    shards = list(partition_by_category(stock, skus, quantities, measurements, kinds).values())
+    deltas = {}
+    if workers == 1 or len(shards) <= 1:
+        results = map(replay_shard, shards)
+        # В текущем процессе части меняют товары склада напрямую, поэтому изменения уже применены
+        for result in results:
+            deltas.update(result)
+    else:
+        # Сначала отправляются самые большие части, чтобы последний процесс не остался с крупной категорией
+        shards.sort(key=lambda shard: len(shard.skus), reverse=True)
+        with ProcessPoolExecutor(max_workers=min(workers, len(shards)), initializer=_detach_observers) as executor:
+            for result in executor.map(replay_shard, shards):
+                deltas.update(result)
+        merge_deltas(stock, deltas)
+    return dict(sorted(deltas.items()))
+
+
+if __name__ == "__main__":
+    import doctest
+
+    doctest.testmod()
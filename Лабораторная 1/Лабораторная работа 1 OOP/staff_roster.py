@@ -0,0 +1,138 @@
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, List, Optional, Set
+
+
+class StaffRoster:
+    """
+    Список персонала с индексами для Staff.recruitment и Staff.dismissal.
+    Приём и увольнение обновляют словари за O(1) и отсортированные списки возраста и стажа:
+    место в списке ищется за O(log n), но вставка и удаление сдвигают хвост списка, поэтому
+    в худшем случае это O(n) - быстрое копирование памяти, а не перебор сотрудников в Python.
+    Атрибуты сотрудника, попавшего в список, менять нельзя: индексы перестанут им соответствовать.
+    """
+    def __init__(self):
+        """
+        Создание и подготовка к работе объекта "Список персонала"
+        """
+        self._staff: Dict[int, object] = {}
+        self._next_key = 1
+        self._by_job: Dict[str, Set[int]] = {}
+        self._by_education: Dict[str, Set[int]] = {}
+        self._by_age: List[tuple] = []         # отсортированные пары (возраст, ключ)
+        self._by_experience: List[tuple] = []  # отсортированные пары (стаж, ключ)
+
+    def __len__(self) -> int:
+        return len(self._staff)
+
+    def __contains__(self, employee_key: int) -> bool:
+        return employee_key in self._staff
+
+    def get(self, employee_key: int):
+        """
+        Возвращает сотрудника по ключу.
+        :param employee_key: Ключ сотрудника
+        :return: Сотрудник
+        """
+        try:
+            return self._staff[employee_key]
+        except KeyError:
+            raise ValueError(f"Сотрудника с ключом {employee_key} нет в списке персонала") from None
+
+    def hire(self, employee) -> int:
+        """
+        Добавляет сотрудника в список и во все индексы.
+        :param employee: Сотрудник Staff
+        :return: Ключ сотрудника
+        """
+        employee_key = self._next_key
+        self._next_key += 1
+        self._staff[employee_key] = employee
+        self._by_job.setdefault(employee.job, set()).add(employee_key)
+        self._by_education.setdefault(employee.education, set()).add(employee_key)
+        insort(self._by_age, (employee.age, employee_key))
+        insort(self._by_experience, (employee.work_experience, employee_key))
+        return employee_key
+
+    def fire(self, employee_key: int):
+        """
+        Удаляет сотрудника из списка и из всех индексов.
+        :param employee_key: Ключ сотрудника
+        :return: Уволенный сотрудник
+        """
+        employee = self.get(employee_key)
+        # Позиции находятся и проверяются до изменений: при рассогласовании индексов список не портится
+        age_position = self._position(self._by_age, (employee.age, employee_key))
+        experience_position = self._position(self._by_experience, (employee.work_experience, employee_key))
+        del self._staff[employee_key]
+        self._discard(self._by_job, employee.job, employee_key)
+        self._discard(self._by_education, employee.education, employee_key)
+        del self._by_age[age_position]
+        del self._by_experience[experience_position]
+        return employee
+
+    @staticmethod
+    def _position(index: List[tuple], entry: tuple) -> int:
+        position = bisect_left(index, entry)
+        if position == len(index) or index[position] != entry:
+            raise ValueError("Атрибуты сотрудника изменились после приёма: индексы ему не соответствуют")
+        return position
+
+    @staticmethod
+    def _discard(index: Dict[str, Set[int]], value: str, employee_key: int) -> None:
+        keys = index[value]
+        keys.discard(employee_key)
+        if not keys:
+            del index[value]
+
+    @staticmethod
+    def _keys_in_range(index: List[tuple], low: Optional[int], high: Optional[int]) -> Set[int]:
+        start = 0 if low is None else bisect_left(index, (low,))
+        stop = len(index) if high is None else bisect_right(index, (high, float("inf")))
+        return {employee_key for _, employee_key in index[start:stop]}
+
+    def find(self, job: str = None, education: str = None, min_age: int = None, max_age: int = None,
+             min_experience: int = None, max_experience: int = None) -> list:
+        """
+        Возвращает сотрудников, подходящих под все заданные условия, в порядке приёма.
+        Каждое условие отбирается своим индексом, затем множества ключей пересекаются,
+        начиная с самого маленького.
+        :param job: Профессия
+        :param education: Сведения об образовании
+        :param min_age: Минимальный возраст включительно
+        :param max_age: Максимальный возраст включительно
+        :param min_experience: Минимальный стаж включительно
+        :param max_experience: Максимальный стаж включительно
+        :return: Список сотрудников
+        Примеры:
+        >>> from main import Staff, StaffRoster
+        >>> roster = StaffRoster()
+        >>> Staff('Кассир', 'Галина', 57, 18, 'Среднее специальное').recruitment(roster)
+        >>> Staff('Кассир', 'Олег', 34, 6, 'Высшее').recruitment(roster)
+        >>> Staff('Грузчик', 'Игнат', 35, 9, 'Среднее общее образование').recruitment(roster)
+        >>> [employee.name for employee in roster.find(job='Кассир', min_age=30, max_age=40, min_experience=5)]
+        ['Олег']
+        """
+        candidates = []
+        if job is not None:
+            candidates.append(self._by_job.get(job, set()))
+        if education is not None:
+            candidates.append(self._by_education.get(education, set()))
+        if min_age is not None or max_age is not None:
+            candidates.append(self._keys_in_range(self._by_age, min_age, max_age))
+        if min_experience is not None or max_experience is not None:
+            candidates.append(self._keys_in_range(self._by_experience, min_experience, max_experience))
+        if not candidates:
+            return list(self._staff.values())
+        candidates.sort(key=len)
+        keys = set(candidates[0])
+        for other in candidates[1:]:
+            keys &= other
+            if not keys:
+                break
+        return [self._staff[employee_key] for employee_key in sorted(keys)]
+
+
+if __name__ == "__main__":
+    import doctest
+
+    doctest.testmod()
@@ -0,0 +1,431 @@
+import heapq
+import threading
+import time
+from typing import Callable, Dict, Hashable, Iterator, List, Tuple, Union
+
+from main import Assortment
+from units import resolve_unit
+
+
+class IndexedMinHeap:
+    """
+    Двоичная min-куча с индексом элемент -> позиция: приоритет любого элемента можно
+    уменьшить или увеличить за O(log n), не перестраивая кучу.
+    """
+    def __init__(self):
+        """
+        Создание и подготовка к работе объекта "Индексированная куча"
+        Примеры:
+        >>> heap = IndexedMinHeap()
+        >>> for item, priority in [('a', 5), ('b', 3), ('c', 8), ('d', 1)]:
+        ...     heap.push(item, priority)
+        >>> heap.update('c', 0)
+        >>> heap.update('d', 9)
+        >>> heap.smallest(3)
+        [('c', 0), ('b', 3), ('a', 5)]
+        >>> heap.remove('b')
+        >>> heap.pop(), len(heap)
+        (('c', 0), 2)
+        """
+        self._priorities = []
+        self._items = []
+        self._positions = {}
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, item: Hashable) -> bool:
+        return item in self._positions
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(self._items)
+
+    def priority(self, item: Hashable) -> Union[int, float]:
+        return self._priorities[self._positions[item]]
+
+    # Просеивание переносит "дырку", а не меняет соседей местами: элемент записывается один раз, в конце
+
+    def _sift_up(self, position: int) -> None:
+        priorities, items, positions = self._priorities, self._items, self._positions
+        priority, item = priorities[position], items[position]
+        while position:
+            parent = (position - 1) >> 1
+            if priorities[parent] <= priority:
+                break
+            priorities[position] = priorities[parent]
+            items[position] = items[parent]
+            positions[items[position]] = position
+            position = parent
+        priorities[position] = priority
+        items[position] = item
+        positions[item] = position
+
+    def _sift_down(self, position: int) -> None:
+        priorities, items, positions = self._priorities, self._items, self._positions
+        priority, item = priorities[position], items[position]
+        size = len(priorities)
+        child = 2 * position + 1
+        while child < size:
+            if child + 1 < size and priorities[child + 1] < priorities[child]:
+                child += 1
+            if priority <= priorities[child]:
+                break
+            priorities[position] = priorities[child]
+            items[position] = items[child]
+            positions[items[position]] = position
+            position = child
+            child = 2 * position + 1
+        priorities[position] = priority
+        items[position] = item
+        positions[item] = position
+
+    def push(self, item: Hashable, priority: Union[int, float]) -> None:
+        """
+        Добавляет элемент за O(log n).
+        :param item: Элемент
+        :param priority: Приоритет: чем меньше, тем ближе к вершине
+        """
+        if item in self._positions:
+            raise ValueError(f"Элемент {item} уже есть в куче")
+        self._priorities.append(priority)
+        self._items.append(item)
+        self._positions[item] = len(self._items) - 1
+        self._sift_up(len(self._items) - 1)
+
+    def update(self, item: Hashable, priority: Union[int, float]) -> None:
+        """
+        Меняет приоритет элемента за O(log n): при уменьшении элемент поднимается, при увеличении опускается.
+        :param item: Элемент
+        :param priority: Новый приоритет
+        """
+        position = self._positions[item]
+        previous = self._priorities[position]
+        self._priorities[position] = priority
+        if priority < previous:
+            self._sift_up(position)
+        elif priority > previous:
+            self._sift_down(position)
+
+    def remove(self, item: Hashable) -> None:
+        """
+        Удаляет элемент за O(log n): на его место встаёт последний элемент кучи.
+        :param item: Элемент
+        """
+        position = self._positions.pop(item)
+        priority = self._priorities.pop()
+        last = self._items.pop()
+        if position < len(self._items):
+            self._priorities[position] = priority
+            self._items[position] = last
+            self._positions[last] = position
+            self._sift_up(position)
+            self._sift_down(self._positions[last])
+
+    def peek(self) -> Tuple[Hashable, Union[int, float]]:
+        if not self._items:
+            raise ValueError("Куча пуста")
+        return self._items[0], self._priorities[0]
+
+    def pop(self) -> Tuple[Hashable, Union[int, float]]:
+        """
+        Извлекает элемент с наименьшим приоритетом за O(log n).
+        :return: Элемент и его приоритет
+        """
+        top = self.peek()
+        self.remove(top[0])
+        return top
+
+    def replace_top(self, item: Hashable, priority: Union[int, float]) -> Tuple[Hashable, Union[int, float]]:
+        """
+        Извлекает элемент с наименьшим приоритетом и добавляет новый за одно просеивание.
+        :param item: Новый элемент
+        :param priority: Его приоритет
+        :return: Извлечённый элемент и его приоритет
+        """
+        if item in self._positions:
+            raise ValueError(f"Элемент {item} уже есть в куче")
+        top = self.peek()
+        del self._positions[top[0]]
+        self._priorities[0] = priority
+        self._items[0] = item
+        self._sift_down(0)
+        return top
+
+    def smallest(self, n: int) -> List[Tuple[Hashable, Union[int, float]]]:
+        """
+        Возвращает n элементов с наименьшими приоритетами по возрастанию, не меняя кучу:
+        обходятся только кандидаты - потомки уже выбранных, поэтому это O(n log n) независимо от размера кучи.
+        :param n: Количество элементов
+        :return: Пары (элемент, приоритет)
+        """
+        priorities, items = self._priorities, self._items
+        result = []
+        frontier = [(priorities[0], 0)] if items else []
+        while frontier and len(result) < n:
+            priority, position = heapq.heappop(frontier)
+            result.append((items[position], priority))
+            for child in (2 * position + 1, 2 * position + 2):
+                if child < len(items):
+                    heapq.heappush(frontier, (priorities[child], child))
+        return result
+
+
+def _compensated_add(total: Union[int, float],
+                     weight: Union[int, float]) -> Tuple[Union[int, float], Union[int, float]]:
+    """
+    Шаг суммирования Ноймайера: возвращает новую сумму и потерянные при сложении младшие разряды.
+    Для целых поправка всегда 0.
+    """
+    updated = total + weight
+    if abs(total) >= abs(weight):
+        return updated, (total - updated) + weight
+    return updated, (weight - updated) + total
+
+
+class SpaceSaving:
+    """
+    Приближённый подсчёт самых частых элементов алгоритмом Space-Saving: хранится не больше
+    capacity счётчиков. Новый элемент при заполнении занимает счётчик наименьшего и наследует его
+    значение, которое запоминается как возможная ошибка. Любой элемент с долей больше 1 / capacity
+    от общего веса гарантированно остаётся среди счётчиков. Наименьший счётчик ищется индексированной кучей.
+    Дробные веса складываются с компенсацией (алгоритм Ноймайера), целые - точно.
+    """
+    def __init__(self, capacity: int = 100):
+        """
+        Создание и подготовка к работе объекта "Счётчик частых элементов"
+        :param capacity: Количество счётчиков
+        Примеры:
+        >>> counter = SpaceSaving(capacity=2)
+        >>> for item, weight in [('a', 5), ('b', 1), ('c', 2), ('a', 1)]:
+        ...     counter.add(item, weight)
+        >>> counter.top(2)
+        [('a', 6, 0), ('c', 3, 1)]
+        >>> counter = SpaceSaving()
+        >>> for _ in range(10):
+        ...     counter.add('x', 0.1)
+        >>> counter.top(1)
+        [('x', 1.0, 0)]
+        """
+        if not isinstance(capacity, int):
+            raise TypeError("Количество счётчиков должно быть типа int")
+        if capacity <= 0:
+            raise ValueError("Количество счётчиков должно быть положительным числом")
+        self.capacity = capacity
+        self._counts = IndexedMinHeap()
+        self._errors = {}
+        # Поправки Ноймайера к счётчикам
+        self._compensations = {}
+
+    def add(self, item: Hashable, weight: Union[int, float] = 1) -> None:
+        """
+        Учитывает weight появлений элемента за O(log capacity).
+        :param item: Элемент
+        :param weight: Вес
+        """
+        counts = self._counts
+        if item in counts:
+            updated, lost = _compensated_add(counts.priority(item), weight)
+            counts.update(item, updated)
+            self._compensations[item] += lost
+        elif len(counts) < self.capacity:
+            counts.push(item, weight)
+            self._errors[item] = 0
+            self._compensations[item] = 0
+        else:
+            floor = counts.peek()[1]
+            updated, lost = _compensated_add(floor, weight)
+            evicted, _ = counts.replace_top(item, updated)
+            del self._errors[evicted]
+            inherited = self._compensations.pop(evicted)
+            self._errors[item] = floor + inherited
+            self._compensations[item] = inherited + lost
+
+    def top(self, n: int) -> List[Tuple[Hashable, Union[int, float], Union[int, float]]]:
+        """
+        Возвращает n элементов с наибольшими счётчиками по убыванию.
+        :param n: Количество элементов
+        :return: Тройки (элемент, оценка сверху, возможная ошибка оценки)
+        """
+        priorities, items = self._counts._priorities, self._counts._items
+        compensations = self._compensations
+        # Позиции в куче сравниваются по приоритету встроенным __getitem__, без функции Python на элемент
+        largest = heapq.nlargest(n, range(len(items)), key=priorities.__getitem__)
+        return [(items[position], priorities[position] + compensations[items[position]], self._errors[items[position]])
+                for position in largest]
+
+
+def _in_units(amount: Union[int, float], scale: Union[int, float]) -> Union[int, float]:
+    # Количество в базовых единицах -> в единицах товара; целое остаётся целым, если делится нацело
+    if scale == 1:
+        return amount
+    if isinstance(amount, int) and isinstance(scale, int) and amount % scale == 0:
+        return amount // scale
+    return amount / scale
+
+
+class _Stripe:
+    """Часть артикулов трекера под своей блокировкой: куча остатков и счётчик продаж за окно."""
+    __slots__ = ("lock", "levels", "sellers", "window_start")
+
+    def __init__(self, capacity: int, window_start: float):
+        self.lock = threading.Lock()
+        self.levels = IndexedMinHeap()
+        self.sellers = SpaceSaving(capacity)
+        self.window_start = window_start
+
+
+class StockTracker:
+    """
+    Живые списки "товары, которые заканчиваются" и "лидеры продаж за час" по всем артикулам.
+    Трекер подписывается через Assortment.subscribe и после каждой продажи или поставки
+    (в том числе пакетной через apply_batch и сверки через reconcile) обновляет остаток
+    артикула в индексированной куче за O(log n), а проданное - в счётчике Space-Saving.
+    Остатки и продажи сравниваются в базовых единицах units.py (грамм, миллилитр, штука), поэтому
+    1.3 тонны больше 2 штук, а 500 кг больше 0.4 тонны. Подписка хранит слабую ссылку:
+    трекер, который больше никто не держит, отписывается сам.
+    Как и в ConcurrentInventory, артикулы закреплены за stripes блокировками по хешу: у каждой
+    части свои куча и счётчик, поэтому продажи разных артикулов из разных потоков не ждут друг друга,
+    а списки собираются слиянием частей.
+    """
+    def __init__(self, stock: Dict[str, Assortment] = None, capacity: int = 100, window: float = 3600.0,
+                 clock: Callable[[], float] = time.monotonic, stripes: int = 16):
+        """
+        Создание и подготовка к работе объекта "Трекер остатков"
+        :param stock: Склад: артикул -> Assortment, все артикулы берутся под наблюдение
+        :param capacity: Количество счётчиков лидеров продаж в каждой части; ошибка оценки не больше
+                         продаж за окно / capacity
+        :param window: Длина окна лидеров продаж в секундах; с началом нового окна счётчики обнуляются
+        :param clock: Часы, секунды
+        :param stripes: Количество блокировок
+        Примеры:
+        >>> stock = {'A1': Assortment('Крупы', 'Гречка', 10, 'шт'), 'B2': Assortment('Крупы', 'Рис', 5, 'шт'),
+        ...          'C3': Assortment('Овощи', 'Помидоры', 1.5, 'тонна'), 'D4': Assortment('Овощи', 'Лук', 500, 'кг')}
+        >>> tracker = StockTracker(stock)
+        >>> stock['A1'].sale(8, 'шт')
+        >>> stock['C3'].sale(200, 'кг')
+        >>> stock['B2'].shipment(10, 'шт')
+        >>> tracker.lowest(4)
+        [('A1', 2, 'шт'), ('B2', 15, 'шт'), ('D4', 500, 'кг'), ('C3', 1.3, 'тонна')]
+        >>> stock['C3'].sale(700, 'кг')
+        >>> stock['D4'].sale(10, 'кг')
+        >>> tracker.top_sellers(3)
+        [('C3', 0.9, 'тонна'), ('D4', 10, 'кг'), ('A1', 8, 'шт')]
+        >>> tracker.close()
+        """
+        if not isinstance(window, (int, float)):
+            raise TypeError("Длина окна должна быть типа int или float")
+        if window <= 0:
+            raise ValueError("Длина окна должна быть положительным числом")
+        if not isinstance(stripes, int):
+            raise TypeError("Количество блокировок должно быть типа int")
+        if stripes <= 0:
+            raise ValueError("Количество блокировок должно быть положительным числом")
+        self.capacity = capacity
+        self.window = window
+        self._clock = clock
+        # Все части начинают окно одновременно, поэтому и дальше сменяют окна в одни моменты
+        window_start = clock()
+        self._stripes = [_Stripe(capacity, window_start) for _ in range(stripes)]
+        # Товар -> артикул: наблюдатель получает объект Assortment; и обратно, артикул -> товар
+        self._skus = {}
+        self._items = {}
+        # Артикул -> размер единицы товара в базовых единицах, для сравнения остатков в разных единицах
+        self._scales = {}
+        for sku, item in (stock or {}).items():
+            self.track(sku, item)
+        Assortment.subscribe(self._on_change)
+
+    def close(self) -> None:
+        """
+        Отписывает трекер от изменений Assortment.
+        """
+        Assortment.unsubscribe(self._on_change)
+
+    def _stripe_for(self, sku: str) -> _Stripe:
+        return self._stripes[hash(sku) % len(self._stripes)]
+
+    def track(self, sku: str, item: Assortment) -> None:
+        """
+        Берёт артикул под наблюдение.
+        :param sku: Артикул
+        :param item: Товар
+        """
+        if not isinstance(item, Assortment):
+            raise TypeError("Товар должен быть типа Assortment")
+        scale = resolve_unit(item.measurement)[1]
+        stripe = self._stripe_for(sku)
+        with stripe.lock:
+            if item in self._skus:
+                raise ValueError(f"Товар уже наблюдается под артикулом {self._skus[item]}")
+            stripe.levels.push(sku, item.quantity * scale)
+            self._scales[sku] = scale
+            self._items[sku] = item
+            self._skus[item] = sku
+
+    def untrack(self, sku: str) -> None:
+        """
+        Снимает артикул с наблюдения.
+        :param sku: Артикул
+        """
+        stripe = self._stripe_for(sku)
+        with stripe.lock:
+            stripe.levels.remove(sku)
+            del self._skus[self._items.pop(sku)]
+            del self._scales[sku]
+
+    def _rotate(self, stripe: _Stripe) -> None:
+        now = self._clock()
+        if now - stripe.window_start >= self.window:
+            stripe.sellers = SpaceSaving(self.capacity)
+            stripe.window_start = now - (now - stripe.window_start) % self.window
+
+    def _on_change(self, item: Assortment, sold: Union[int, float]) -> None:
+        sku = self._skus.get(item)
+        scale = self._scales.get(sku)
+        if scale is None:
+            return
+        stripe = self._stripe_for(sku)
+        with stripe.lock:
+            stripe.levels.update(sku, item.quantity * scale)
+            if sold:
+                self._rotate(stripe)
+                stripe.sellers.add(sku, sold * scale)
+
+    def lowest(self, n: int = 10) -> List[Tuple[str, Union[int, float], str]]:
+        """
+        Возвращает n артикулов с наименьшими остатками в базовых единицах по возрастанию,
+        за O(stripes * n log n) при любом числе артикулов.
+        :param n: Количество артикулов
+        :return: Тройки (артикул, остаток в единицах товара, единица товара)
+        """
+        items = self._items
+        candidates = []
+        for stripe in self._stripes:
+            with stripe.lock:
+                candidates += [(level, sku, items[sku].quantity, items[sku].measurement)
+                               for sku, level in stripe.levels.smallest(n)]
+        return [(sku, quantity, measurement)
+                for _, sku, quantity, measurement in heapq.nsmallest(n, candidates, key=lambda entry: entry[0])]
+
+    def top_sellers(self, n: int = 10) -> List[Tuple[str, Union[int, float], str]]:
+        """
+        Возвращает n артикулов, проданных больше всего за текущее окно (в базовых единицах), по убыванию.
+        Оценки могут быть завышены не больше чем на продажи за окно / capacity.
+        :param n: Количество артикулов
+        :return: Тройки (артикул, продано в единицах товара, единица товара)
+        """
+        candidates = []
+        for stripe in self._stripes:
+            with stripe.lock:
+                self._rotate(stripe)
+                # Снятые с наблюдения артикулы остаются в счётчике до конца окна, но в список не попадают
+                candidates += [(sold, sku, self._scales[sku], self._items[sku].measurement)
+                               for sku, sold, _ in stripe.sellers.top(n) if sku in self._items]
+        return [(sku, _in_units(sold, scale), measurement)
+                for sold, sku, scale, measurement in heapq.nlargest(n, candidates, key=lambda entry: entry[0])]
+
+
+if __name__ == "__main__":
+    import doctest
+
+    doctest.testmod()
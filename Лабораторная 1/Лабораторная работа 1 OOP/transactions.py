@@ -0,0 +1,176 @@
+from typing import Dict, Sequence, Union
+
+import numpy as np
+
+from main import Assortment
+from units import TOLERANCE, conversion_ratio
+
+SALE = "sale"
+SHIPMENT = "shipment"
+
+
+def _as_kinds(kinds: Sequence) -> np.ndarray:
+    """
+    Переводит виды операций в булев массив "является продажей".
+    Допускаются строки 'sale'/'shipment' или коды 0 (продажа) и 1 (поставка).
+    """
+    kinds = np.asarray(kinds)
+    if kinds.dtype.kind == "U":
+        is_sale = kinds == SALE
+        if not (is_sale | (kinds == SHIPMENT)).all():
+            raise ValueError("Вид операции должен быть 'sale' или 'shipment'")
+        return is_sale
+    if kinds.dtype.kind in "iu":
+        if not ((kinds == 0) | (kinds == 1)).all():
+            raise ValueError("Код операции должен быть 0 (продажа) или 1 (поставка)")
+        return kinds == 0
+    raise TypeError("Виды операций должны быть строками или целочисленными кодами")
+
+
+def _encode_skus(skus: np.ndarray, catalog: Sequence[str]) -> tuple:
+    """
+    Кодирует артикулы операций номерами от 0 по порядку затронутых артикулов.
+    Целочисленные коды из catalog перекодируются векторно, без обращения к строкам;
+    строки кодируются словарём: один проход по хешам быстрее сортировки строк в np.unique.
+    :return: (коды артикулов по операциям, затронутые артикулы в порядке кодов)
+    """
+    if skus.dtype.kind in "iu":
+        if catalog is None:
+            raise ValueError("Для целочисленных кодов артикулов нужен каталог catalog")
+        if skus.min() < 0 or skus.max() >= len(catalog):
+            raise ValueError("Код артикула вне каталога")
+        used = np.flatnonzero(np.bincount(skus, minlength=len(catalog)))
+        remap = np.zeros(len(catalog), dtype=np.intp)
+        remap[used] = np.arange(len(used))
+        return remap[skus], [catalog[code] for code in used.tolist()]
+    if skus.dtype.kind != "U":
+        raise TypeError("Артикулы должны быть строками или целочисленными кодами")
+    code_of = {}
+    sku_codes = np.fromiter((code_of.setdefault(sku, len(code_of)) for sku in skus.tolist()),
+                            dtype=np.intp, count=len(skus))
+    return sku_codes, list(code_of)
+
+
+def _sum_by_code(codes: np.ndarray, values: np.ndarray, size: int) -> list:
+    """
+    Суммирует значения по кодам артикулов. Дробные суммируются через np.bincount в float64. Целые
+    суммируются точно: через тот же np.bincount, если любая частичная сумма меньше 2 ** 53 и представима
+    в float64 без округления, иначе в int64, а если сумма может не поместиться в 64 бита - целыми Python.
+    :return: Список сумм длины size
+    """
+    if values.dtype.kind == "f":
+        return np.bincount(codes, weights=values, minlength=size).tolist()
+    bound = int(np.abs(values).max(initial=0)) * len(values) if values.dtype.kind != "O" else None
+    if bound is not None and bound < 2 ** 53:
+        return [int(value) for value in np.bincount(codes, weights=values, minlength=size).tolist()]
+    dtype = np.int64 if bound is not None and bound < 2 ** 63 else object
+    sums = np.zeros(size, dtype=dtype)
+    np.add.at(sums, codes, values.astype(dtype))
+    return [int(value) for value in sums.tolist()]
+
+
+def apply_batch(stock: Dict[str, Assortment], skus: Sequence, quantities: Sequence[Union[int, float]],
+                measurements: Sequence[str], kinds: Sequence,
+                catalog: Sequence[str] = None) -> Dict[str, Union[int, float]]:
+    """
+    Применяет пакет продаж и поставок к складу за один проход.
+    Все проверки выполняются векторно над массивами NumPy, затем для каждого артикула
+    считается суммарное изменение остатка: целые количества без пересчёта единиц складываются
+    точно, без округления до float. Если хотя бы один остаток стал бы отрицательным,
+    пакет отклоняется целиком и склад не меняется.
+    :param stock: Склад: артикул -> Assortment
+    :param skus: Артикулы операций или их целочисленные коды - номера артикулов в catalog
+    :param quantities: Количества товара в операциях
+    :param measurements: Единицы измерения количества в операциях, при необходимости пересчитываются
+    :param kinds: Виды операций: 'sale'/'shipment' или коды 0/1
+    :param catalog: Артикулы по кодам, нужен, если skus - коды. Коды кодируются без обращения к строкам,
+        поэтому фиду выгодно присылать пакет уже закодированным
+    :raise ValueError: Если пакет некорректен или уводит остаток в минус
+    :return: Новые остатки затронутых артикулов
+    Примеры:
+    >>> stock = {'A1': Assortment('Крупы', 'Гречка', 10, 'шт'), 'B2': Assortment('Крупы', 'Рис', 5, 'шт')}
+    >>> apply_batch(stock, ['A1', 'B2', 'A1'], [3, 4, 2], ['шт', 'шт', 'шт'], ['sale', 'shipment', 'sale'])
+    {'A1': 5, 'B2': 9}
+    >>> apply_batch(stock, ['A1', 'B2'], [1, 10], ['шт', 'шт'], ['shipment', 'sale'])
+    Traceback (most recent call last):
+    ...
+    ValueError: Пакет уводит остаток в минус для артикулов: B2
+    >>> stock['A1'].quantity, stock['B2'].quantity
+    (5, 9)
+    >>> stock = {'C3': Assortment('Овощи', 'Помидоры', 1.5, 'тонна')}
+    >>> apply_batch(stock, ['C3', 'C3'], [500, 0.2], ['кг', 'тонна'], [0, 1])
+    {'C3': 1.2}
+    >>> apply_batch({'D4': Assortment('Овощи', 'Картофель', 0.7, 'т')}, ['D4'], [700], ['кг'], ['sale'])
+    {'D4': 0.0}
+    >>> stock = {'E5': Assortment('Крупы', 'Гречка', 2 ** 60, 'шт')}
+    >>> apply_batch(stock, ['E5', 'E5'], [1, 2 ** 60], ['шт', 'шт'], ['shipment', 'sale'])
+    {'E5': 1}
+    >>> catalog = ['A1', 'B2', 'C3']
+    >>> stock = {'A1': Assortment('Крупы', 'Гречка', 10, 'шт'), 'B2': Assortment('Крупы', 'Рис', 5, 'шт')}
+    >>> apply_batch(stock, [1, 0, 1], [2, 3, 1], ['шт', 'шт', 'шт'], [0, 0, 1], catalog)
+    {'A1': 7, 'B2': 4}
+    >>> apply_batch(stock, [3], [1], ['шт'], [0], catalog)
+    Traceback (most recent call last):
+    ...
+    ValueError: Код артикула вне каталога
+    """
+    skus = np.asarray(skus)
+    quantities = np.asarray(quantities)
+    measurements = np.asarray(measurements)
+    is_sale = _as_kinds(kinds)
+    if not skus.shape == quantities.shape == measurements.shape == is_sale.shape or skus.ndim != 1:
+        raise ValueError("Массивы пакета должны быть одномерными и одинаковой длины")
+    if len(skus) == 0:
+        return {}
+    if quantities.dtype.kind not in "iuf":
+        raise TypeError("Количество товара должно быть типа int или float")
+    if quantities.dtype.kind == "f" and not np.isfinite(quantities).all():
+        raise ValueError("Количество товара должно быть конечным числом")
+    if (quantities < 0).any():
+        raise ValueError("Количество товара в операции не может быть отрицательным")
+
+    sku_codes, unique_skus = _encode_skus(skus, catalog)
+    items = []
+    for sku in unique_skus:
+        if sku not in stock:
+            raise ValueError(f"Артикула {sku} нет на складе")
+        items.append(stock[sku])
+    expected = np.array([item.measurement for item in items])[sku_codes]
+    mismatch = np.flatnonzero(measurements != expected)
+    if len(mismatch):
+        # Пересчёт только для строк с другой единицей: по одному обращению к кэшу на строку.
+        # Как и units.convert, сначала умножаем на размер исходной единицы, потом делим на размер целевой
+        ratios = np.array([conversion_ratio(source, target) for source, target
+                           in zip(measurements[mismatch].tolist(), expected[mismatch].tolist())],
+                          dtype=float).reshape(-1, 2)
+        quantities = quantities.astype(float)
+        quantities[mismatch] = quantities[mismatch] * ratios[:, 0] / ratios[:, 1]
+
+    if quantities.dtype.kind == "u":
+        # Знак не помещается в беззнаковый тип: переходим к знаковому, а при больших значениях - к целым Python
+        quantities = quantities.astype(np.int64 if quantities.max() < 2 ** 63 else object)
+    signed = np.where(is_sale, -quantities, quantities)
+    deltas = _sum_by_code(sku_codes, signed, len(items))
+    before = [item.quantity for item in items]
+    after = [previous + delta for previous, delta in zip(before, deltas)]
+    if len(mismatch):
+        # Остаток, ушедший в минус в пределах погрешности пересчёта единиц, считается нулевым
+        after = [0.0 if -TOLERANCE * abs(previous) <= value < 0 else value for previous, value in zip(before, after)]
+    negative = [sku for sku, value in zip(unique_skus, after) if value < 0]
+    if negative:
+        raise ValueError("Пакет уводит остаток в минус для артикулов: " + ", ".join(negative))
+
+    # Все проверки пройдены до первого изменения, поэтому откатывать нечего
+    for item, value in zip(items, after):
+        item.quantity = value
+    if Assortment.observers:
+        sold = _sum_by_code(sku_codes, np.where(is_sale, quantities, 0), len(items))
+        for item, amount in zip(items, sold):
+            item._notify(amount)
+    return dict(zip(unique_skus, after))
+
+
+if __name__ == "__main__":
+    import doctest
+
+    doctest.testmod()
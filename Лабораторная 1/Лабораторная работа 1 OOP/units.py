@@ -0,0 +1,142 @@
+import re
+from typing import Dict, Tuple, Union
+
+# Единица измерения -> (величина, сколько базовых единиц в ней).
+# Базовые единицы: грамм для массы, миллилитр для объёма, штука для счёта.
+UNITS: Dict[str, Tuple[str, float]] = {
+    "г": ("масса", 1),
+    "грамм": ("масса", 1),
+    "кг": ("масса", 1000),
+    "килограмм": ("масса", 1000),
+    "ц": ("масса", 100_000),
+    "центнер": ("масса", 100_000),
+    "т": ("масса", 1_000_000),
+    "тонна": ("масса", 1_000_000),
+    "мл": ("объём", 1),
+    "миллилитр": ("объём", 1),
+    "л": ("объём", 1000),
+    "литр": ("объём", 1000),
+    "шт": ("количество", 1),
+    "штука": ("количество", 1),
+}
+
+# Фасовка вида "упаковка 900г", "бутылка 1.5 л": название тары, число и единица
+PACKAGE_PATTERN = re.compile(r"^(?:упаковка|пачка|бутылка|банка|мешок|коробка)\s*(\d+(?:[.,]\d+)?)\s*(\w+)$")
+
+# Кэш пересчёта (из, в) -> (базовых единиц в исходной, базовых единиц в целевой), заполняется при первом
+# обращении. Хранится пара, а не готовый множитель: quantity * from_base / to_base точнее, чем
+# quantity * (from_base / to_base), например 700 кг = 0.7 т ровно, а не 0.7000000000000001
+_RATIOS: Dict[Tuple[str, str], Tuple[float, float]] = {}
+
+# Относительная погрешность, в пределах которой пересчитанное количество считается равным остатку:
+# пересчёт идёт в float и может ошибиться в последних знаках
+TOLERANCE = 1e-12
+
+
+def register_unit(measurement: str, quantity_kind: str, base_units: Union[int, float]) -> None:
+    """
+    Добавляет единицу измерения в реестр и сбрасывает кэш коэффициентов.
+    :param measurement: Название единицы
+    :param quantity_kind: Величина (масса, объём, количество или своя)
+    :param base_units: Сколько базовых единиц величины содержится в одной такой единице
+    Примеры:
+    >>> register_unit('ящик', 'количество', 12)
+    >>> conversion_factor('ящик', 'шт')
+    12.0
+    """
+    if not isinstance(measurement, str) or not isinstance(quantity_kind, str):
+        raise TypeError("Название единицы и величины должны быть типа str")
+    if not isinstance(base_units, (int, float)):
+        raise TypeError("Количество базовых единиц должно быть типа int или float")
+    if base_units <= 0:
+        raise ValueError("Количество базовых единиц должно быть положительным числом")
+    UNITS[measurement] = (quantity_kind, base_units)
+    _RATIOS.clear()
+
+
+def resolve_unit(measurement: str) -> Tuple[str, float]:
+    """
+    Определяет величину и размер единицы в базовых единицах, в том числе для фасовки.
+    :param measurement: Единица измерения
+    :return: Пара (величина, количество базовых единиц)
+    Примеры:
+    >>> resolve_unit('упаковка 900г')
+    ('масса', 900.0)
+    """
+    if measurement in UNITS:
+        return UNITS[measurement]
+    match = PACKAGE_PATTERN.match(measurement.strip())
+    if match is not None and match.group(2) in UNITS:
+        quantity_kind, base_units = UNITS[match.group(2)]
+        return quantity_kind, float(match.group(1).replace(",", ".")) * base_units
+    raise ValueError(f"Неизвестная единица измерения: {measurement}")
+
+
+def conversion_ratio(from_measurement: str, to_measurement: str) -> Tuple[float, float]:
+    """
+    Возвращает размеры единиц в базовых единицах для пересчёта quantity * from_base / to_base.
+    Пара вычисляется один раз на пару единиц и дальше берётся из кэша.
+    :param from_measurement: Исходная единица
+    :param to_measurement: Целевая единица
+    :raise ValueError: Если единицы неизвестны или относятся к разным величинам
+    :return: Пара (from_base, to_base)
+    Примеры:
+    >>> conversion_ratio('кг', 'тонна')
+    (1000, 1000000)
+    >>> conversion_ratio('шт', 'кг')
+    Traceback (most recent call last):
+    ...
+    ValueError: Нельзя пересчитать шт в кг: это разные величины
+    """
+    ratio = _RATIOS.get((from_measurement, to_measurement))
+    if ratio is None:
+        if from_measurement == to_measurement:
+            ratio = (1, 1)
+        else:
+            from_kind, from_base = resolve_unit(from_measurement)
+            to_kind, to_base = resolve_unit(to_measurement)
+            if from_kind != to_kind:
+                raise ValueError(f"Нельзя пересчитать {from_measurement} в {to_measurement}: это разные величины")
+            ratio = (from_base, to_base)
+        _RATIOS[(from_measurement, to_measurement)] = ratio
+    return ratio
+
+
+def conversion_factor(from_measurement: str, to_measurement: str) -> float:
+    """
+    Возвращает множитель пересчёта количества из одной единицы в другую. Для самого пересчёта
+    точнее convert: множитель может быть неточен в последнем знаке.
+    :param from_measurement: Исходная единица
+    :param to_measurement: Целевая единица
+    :return: Множитель пересчёта
+    Примеры:
+    >>> conversion_factor('кг', 'тонна')
+    0.001
+    """
+    from_base, to_base = conversion_ratio(from_measurement, to_measurement)
+    return from_base / to_base
+
+
+def convert(quantity: Union[int, float], from_measurement: str, to_measurement: str) -> Union[int, float]:
+    """
+    Пересчитывает количество в другую единицу измерения.
+    :param quantity: Количество
+    :param from_measurement: Исходная единица
+    :param to_measurement: Целевая единица
+    :return: Количество в целевой единице
+    Примеры:
+    >>> convert(3, 'упаковка 900г', 'кг')
+    2.7
+    >>> convert(700, 'кг', 'т')
+    0.7
+    """
+    if from_measurement == to_measurement:
+        return quantity
+    from_base, to_base = conversion_ratio(from_measurement, to_measurement)
+    return quantity * from_base / to_base
+
+
+if __name__ == "__main__":
+    import doctest
+
+    doctest.testmod()
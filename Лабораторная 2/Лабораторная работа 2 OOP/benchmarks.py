@@ -0,0 +1,471 @@
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from itertools import accumulate
+
+from book_store import BookStore
+from id_allocator import IdAllocator
+from library_indexes import NamePrefixIndex, PagesRangeIndex
+from library_loader import load_library
+from library_search import TrigramIndex, name_similarity
+from library_service import LibraryService, load_test
+from library_snapshot import SnapshotLibrary, save_snapshot
+from library_sqlite import SQLiteLibrary
+from library_versions import VersionedLibrary
+from main_Library import Book, Library
+
+LOOKUPS = 100_000
+
+
+def make_books(count: int) -> list:
+    """
+    Создаёт список книг с идентификаторами от 1 до count.
+    :param count: Количество книг
+    :return: Список книг
+    """
+    return [Book(book_id=book_id, book_name=f"book_{book_id}", book_pages=100 + book_id % 900)
+            for book_id in range(1, count + 1)]
+
+
+def bench_lookup_by_id(sizes: list) -> None:
+    """
+    Замеряет среднее время get_index_by_book_id для библиотек разного размера.
+    Половина книг удаляется, чтобы идентификаторы шли с пропусками.
+    :param sizes: Размеры каталога
+    """
+    print("get_index_by_book_id (ids с пропусками после удаления половины книг)")
+    for size in sizes:
+        library = Library(make_books(size))
+        for book_id in range(2, size + 1, 2):
+            library.remove_book(book_id)
+        ids = random.Random(size).choices(range(1, size + 1, 2), k=LOOKUPS)
+        lookup = library.get_index_by_book_id
+        start = time.perf_counter()
+        for book_id in ids:
+            lookup(book_id)
+        elapsed = time.perf_counter() - start
+        print(f"  {size:>10} книг: {elapsed / LOOKUPS * 1e9:8.1f} нс на поиск")
+
+
+def bench_secondary_indexes(size: int, queries: int = 200) -> None:
+    """
+    Сравнивает запросы по префиксу названия и диапазону страниц с индексами и без них.
+    :param size: Размер каталога
+    :param queries: Количество запросов каждого вида
+    """
+    plain = Library(make_books(size))
+    indexed = Library(make_books(size))
+    indexed.add_index(NamePrefixIndex())
+    indexed.add_index(PagesRangeIndex())
+    rng = random.Random(size)
+    prefixes = [f"book_{rng.randint(1, size)}" for _ in range(queries)]
+    ranges = [(low, low + 5) for low in (rng.randint(100, 990) for _ in range(queries))]
+    print(f"Вторичные индексы, {size} книг")
+    for title, library in (("полный просмотр", plain), ("индексы", indexed)):
+        start = time.perf_counter()
+        for prefix in prefixes:
+            library.find_by_name_prefix(prefix)
+        prefix_time = (time.perf_counter() - start) / queries
+        start = time.perf_counter()
+        for low, high in ranges:
+            library.find_by_pages_range(low, high)
+        range_time = (time.perf_counter() - start) / queries
+        print(f"  {title:>16}: префикс {prefix_time * 1e6:10.1f} мкс, диапазон {range_time * 1e6:10.1f} мкс")
+
+
+def bench_streaming_loader(size: int, chunk_size: int = 50_000) -> None:
+    """
+    Загружает библиотеку из временного файла JSON Lines и печатает статистику каждой порции.
+    :param size: Количество записей в файле
+    :param chunk_size: Размер порции
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "books.jsonl")
+        with open(path, "w", encoding="utf-8") as file:
+            for book_id in range(1, size + 1):
+                file.write(json.dumps({"id": book_id, "name": f"book_{book_id}", "pages": 100 + book_id % 900}) + "\n")
+        print(f"Потоковая загрузка {size} записей порциями по {chunk_size}")
+        load_library(path, chunk_size=chunk_size, report=lambda stats: print(
+            f"  порция {stats.number:>4}: {stats.rows_per_second:10.0f} записей/с, пиковый RSS {stats.peak_rss_kb} КБ"))
+
+
+def bench_memory_layout(size: int) -> None:
+    """
+    Сравнивает память списка объектов Book и колоночного BookStore через tracemalloc.
+    Названия повторяются (как у переизданий), что видно по таблице строк BookStore.
+    :param size: Количество книг
+    """
+    def build_library() -> Library:
+        return Library([Book(book_id, f"title_{book_id % 1000}", 100 + book_id % 900)
+                        for book_id in range(1, size + 1)])
+
+    def build_store() -> BookStore:
+        store = BookStore()
+        for book_id in range(1, size + 1):
+            store.add_book(Book(book_id, f"title_{book_id % 1000}", 100 + book_id % 900))
+        return store
+
+    print(f"Память на {size} книг")
+    for title, build in (("список Book", build_library), ("BookStore", build_store)):
+        tracemalloc.start()
+        library = build()
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"  {title:>12}: {current / size:6.1f} байт на книгу")
+        del library
+
+
+def bench_cold_start(size: int, lookups: int = 1000) -> None:
+    """
+    Сравнивает запуск с пересборкой книг из словарей вида BOOKS_DATABASE и запуск со снимка.
+    В обоих случаях время включает lookups поисков книг по id.
+    :param size: Количество книг
+    :param lookups: Количество поисков после запуска
+    """
+    database = [{"id": book_id, "name": f"book_{book_id}", "pages": 100 + book_id % 900}
+                for book_id in range(1, size + 1)]
+    ids = random.Random(size).choices(range(1, size + 1), k=lookups)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "library.snap")
+        save_snapshot(Library([Book(book["id"], book["name"], book["pages"]) for book in database]), path)
+
+        start = time.perf_counter()
+        library = Library([Book(book_id=book["id"], book_name=book["name"], book_pages=book["pages"])
+                           for book in database])
+        for book_id in ids:
+            library.get_book_by_id(book_id)
+        rebuild_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with SnapshotLibrary(path) as snapshot:
+            for book_id in ids:
+                snapshot.get_book_by_id(book_id)
+            snapshot_time = time.perf_counter() - start
+    print(f"Холодный старт библиотеки на {size} книг и {lookups} поисков")
+    print(f"  пересборка из словарей: {rebuild_time * 1000:10.1f} мс")
+    print(f"  снимок через mmap:      {snapshot_time * 1000:10.1f} мс")
+
+
+def bench_sqlite(size: int, threads: int = 4, lookups: int = 20_000) -> None:
+    """
+    Замеряет запись и чтение SQLiteLibrary: вставку по одной книге и пакетом через executemany,
+    поиск по id без кэша и с кэшем, а также чтение из нескольких потоков через пул соединений.
+    :param size: Количество книг в пакетной вставке
+    :param threads: Количество читающих потоков
+    :param lookups: Количество поисков в каждом замере
+    """
+    books = make_books(size)
+    single = min(size, 10_000)
+    ids = random.Random(size).choices(range(1, size + 1), k=lookups)
+    print(f"SQLiteLibrary, {size} книг")
+    with tempfile.TemporaryDirectory() as directory:
+        library = SQLiteLibrary(os.path.join(directory, "single.db"))
+        start = time.perf_counter()
+        for book in books[:single]:
+            library.add_book(book)
+        elapsed = time.perf_counter() - start
+        library.close()
+        print(f"  вставка по одной:     {single / elapsed:12.0f} книг/с")
+
+        library = SQLiteLibrary(os.path.join(directory, "batch.db"), cache_size=0)
+        start = time.perf_counter()
+        library.add_books(books)
+        elapsed = time.perf_counter() - start
+        print(f"  вставка executemany:  {size / elapsed:12.0f} книг/с")
+
+        start = time.perf_counter()
+        for book_id in ids:
+            library.get_book_by_id(book_id)
+        elapsed = time.perf_counter() - start
+        print(f"  поиск без кэша:       {lookups / elapsed:12.0f} поисков/с")
+        library.close()
+
+        library = SQLiteLibrary(os.path.join(directory, "batch.db"), cache_size=size)
+        for book_id in ids:
+            library.get_book_by_id(book_id)
+        start = time.perf_counter()
+        for book_id in ids:
+            library.get_book_by_id(book_id)
+        elapsed = time.perf_counter() - start
+        print(f"  поиск с кэшем:        {lookups / elapsed:12.0f} поисков/с")
+        library.close()
+
+        library = SQLiteLibrary(os.path.join(directory, "batch.db"), pool_size=threads, cache_size=0)
+
+        def read() -> None:
+            for book_id in ids:
+                library.get_book_by_id(book_id)
+
+        workers = [threading.Thread(target=read) for _ in range(threads)]
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - start
+        library.close()
+        print(f"  поиск в {threads} потоках:    {threads * lookups / elapsed:12.0f} поисков/с")
+
+
+def make_titles(count: int, seed: int = 0) -> list:
+    """
+    Создаёт названия из 2-5 слов словаря, частоты слов распределены по закону Ципфа,
+    как в настоящих каталогах: немногие слова встречаются очень часто.
+    :param count: Количество названий
+    :param seed: Зерно генератора
+    :return: Список названий
+    """
+    rng = random.Random(seed)
+    letters = "абвгдеёжзийклмнопрстуфхцчшщъыьэюя"
+    vocabulary = sorted({"".join(rng.choices(letters, k=rng.randint(3, 10))) for _ in range(50_000)})
+    rng.shuffle(vocabulary)
+    weights = list(accumulate(1 / rank for rank in range(1, len(vocabulary) + 1)))
+    return [" ".join(rng.choices(vocabulary, cum_weights=weights, k=rng.randint(2, 5))) for _ in range(count)]
+
+
+def bench_fuzzy_search(size: int, queries: int = 200, scans: int = 3) -> None:
+    """
+    Замеряет нечёткий поиск по названиям с индексом TrigramIndex: запросы - названия
+    случайных книг с одной опечаткой. Для сравнения несколько запросов выполняются полным просмотром,
+    а часть запросов - тем же индексом без ограничения просмотра списков, то есть точно: по ним
+    считается, какую долю точной выдачи вернул индекс с ограничением.
+    :param size: Количество книг
+    :param queries: Количество запросов с индексом
+    :param scans: Количество запросов полным просмотром
+    """
+    titles = make_titles(size)
+    library = Library([Book(book_id, title, 100 + book_id % 900) for book_id, title in enumerate(titles, 1)])
+    index = TrigramIndex()
+    start = time.perf_counter()
+    library.add_index(index)
+    build_time = time.perf_counter() - start
+    rng = random.Random(size)
+    requests = []
+    for title in rng.sample(titles, queries):
+        letters = list(title)
+        letters[rng.randrange(len(letters))] = "о"
+        requests.append("".join(letters))
+    print(f"Нечёткий поиск по {size} названиям, индекс построен за {build_time:.1f} с")
+    for k in (1, 10):
+        latencies = []
+        for query in requests:
+            start = time.perf_counter()
+            library.find_similar_names(query, k)
+            latencies.append(time.perf_counter() - start)
+        latencies.sort()
+        print(f"  индекс, k={k:>2}: медиана {statistics.median(latencies) * 1000:8.2f} мс, "
+              f"p99 {latencies[int(len(latencies) * 0.99) - 1] * 1000:8.2f} мс")
+    start = time.perf_counter()
+    for query in requests[:scans]:
+        sorted(library.books, key=lambda book: name_similarity(query, book.name), reverse=True)[:10]
+    print(f"  полный просмотр:  {(time.perf_counter() - start) / scans * 1000:8.2f} мс на запрос")
+    # Тот же индекс без ограничения просмотра списков ищет точно: по нему видно, что теряет ограничение
+    checked = requests[:50]
+    limit = index.max_postings
+    for k in (1, 10):
+        returned = [{book_id for book_id, _ in index.search(query, k)} for query in checked]
+        index.max_postings = None
+        start = time.perf_counter()
+        expected = [{book_id for book_id, _ in index.search(query, k)} for query in checked]
+        elapsed = time.perf_counter() - start
+        index.max_postings = limit
+        print(f"  точный поиск, k={k:>2}: {elapsed / len(checked) * 1000:8.2f} мс на запрос; индекс с ограничением "
+              f"нашёл {sum(map(len, map(set.intersection, expected, returned)))} из {sum(map(len, expected))} книг")
+
+def bench_id_allocator(thread_counts: list, allocations: int = 20_000) -> None:
+    """
+    Замеряет выдачу id из многих потоков: с блоком из одного id каждый вызов резервирует блок
+    под общей блокировкой (а с файлом ещё и пишет его), с блоком из 1000 id потоки выдают id
+    из своих блоков без блокировок.
+    Заодно проверяет, что выданные id не повторяются.
+    :param thread_counts: Количества потоков
+    :param allocations: Количество id на поток
+    """
+    print(f"Выдача id, {allocations} на поток")
+    with tempfile.TemporaryDirectory() as directory:
+        variants = (
+            ("память, блок 1", lambda: IdAllocator(block_size=1)),
+            ("память, блок 1000", lambda: IdAllocator(block_size=1000)),
+            ("файл, блок 1000", lambda: IdAllocator(os.path.join(directory, "ids"), block_size=1000)),
+        )
+        for title, make in variants:
+            for count in thread_counts:
+                allocator = make()
+                results = [[] for _ in range(count)]
+
+                def work(result: list) -> None:
+                    allocate = allocator.allocate
+                    for _ in range(allocations):
+                        result.append(allocate())
+
+                workers = [threading.Thread(target=work, args=(result,)) for result in results]
+                start = time.perf_counter()
+                for worker in workers:
+                    worker.start()
+                for worker in workers:
+                    worker.join()
+                elapsed = time.perf_counter() - start
+                issued = [book_id for result in results for book_id in result]
+                if len(set(issued)) != len(issued):
+                    raise AssertionError("Распределитель выдал повторяющиеся id")
+                print(f"  {title:>18}, {count:>2} потоков: {len(issued) / elapsed:12.0f} id/с")
+
+
+def serve_catalog(size: int, port: int, ready, options: dict) -> None:
+    """
+    Строит библиотеку из size книг с индексами и обслуживает её сервисом; запускается в отдельном процессе.
+    """
+    titles = make_titles(size)
+    library = Library([Book(book_id, title, 100 + book_id % 900) for book_id, title in enumerate(titles, 1)])
+    library.add_index(NamePrefixIndex())
+    library.add_index(PagesRangeIndex())
+
+    async def run() -> None:
+        server = await LibraryService(library, **options).start(port=port)
+        ready.set()
+        async with server:
+            await server.serve_forever()
+    asyncio.run(run())
+
+
+def bench_library_service(size: int, connections: int = 10_000, requests_per_connection: int = 10) -> None:
+    """
+    Нагрузочный тест сервиса библиотеки на localhost: сервис работает в отдельном процессе,
+    клиент держит connections соединений. Запросы - в основном поиск по id с распределением
+    Ципфа (популярные книги запрашивают чаще), остальное - префиксы названий и диапазоны страниц.
+    Сравниваются сервис без пакетов (каждый запрос выполняется отдельно) и с окном пакета.
+    :param size: Количество книг
+    :param connections: Количество одновременных соединений
+    :param requests_per_connection: Количество запросов на соединение
+    """
+    try:
+        import resource
+        # Каждое соединение занимает дескриптор файла в клиенте; поднимаем мягкий предел до жёсткого
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    except (ImportError, ValueError):
+        pass
+    rng = random.Random(size)
+    weights = list(accumulate(1 / rank for rank in range(1, size + 1)))
+    requests = [{"id": book_id} for book_id in rng.choices(range(1, size + 1), cum_weights=weights, k=50_000)]
+    requests += [{"name_prefix": title[:-1]} for title in make_titles(2_000, seed=1)]
+    requests += [{"pages_range": [low, low + 2]} for low in rng.choices(range(100, 1000), k=2_000)]
+    rng.shuffle(requests)
+    print(f"Сервис библиотеки из {size} книг, {connections} соединений по {requests_per_connection} запросов")
+    variants = (("без пакетов", {"max_batch": 1}), ("шаг цикла", {"window": 0}), ("окно 0.5 мс", {"window": 0.0005}))
+    for title, options in variants:
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            port = probe.getsockname()[1]
+        ready = multiprocessing.Event()
+        server = multiprocessing.Process(target=serve_catalog, args=(size, port, ready, options), daemon=True)
+        server.start()
+        ready.wait()
+        try:
+            result = asyncio.run(load_test("127.0.0.1", port, requests, connections, requests_per_connection))
+        finally:
+            server.terminate()
+            server.join()
+        print(f"  {title:>12}: {result['rps']:8.0f} запросов/с, p50 {result['p50_ms']:8.2f} мс, "
+              f"p99 {result['p99_ms']:8.2f} мс")
+
+
+def bench_versioned_reads(size: int, readers: int = 4, seconds: float = 2.0, batch: int = 100) -> None:
+    """
+    Замеряет чтение библиотеки, пока писатель непрерывно добавляет и удаляет книги.
+    Library читается и меняется под общей блокировкой (иначе читатель видит список посреди
+    изменения), VersionedLibrary читается из снимков без блокировок. Читатель за раз ищет
+    batch книг по id в одном согласованном состоянии библиотеки.
+    :param size: Количество книг
+    :param readers: Количество потоков-читателей
+    :param seconds: Длительность каждого замера
+    :param batch: Количество поисков на одно согласованное чтение
+    """
+    print(f"Чтение {size} книг в {readers} потоках при одновременной записи, {seconds} с")
+
+    def run(read, write) -> tuple:
+        stop = threading.Event()
+        counts = [0] * readers
+        writes = [0]
+
+        def reader(number: int) -> None:
+            rng = random.Random(number)
+            while not stop.is_set():
+                read([rng.randrange(1, size + 1) for _ in range(batch)])
+                counts[number] += batch
+
+        def writer() -> None:
+            book_id = size
+            while not stop.is_set():
+                book_id += 1
+                write(book_id)
+                writes[0] += 1
+
+        threads = [threading.Thread(target=reader, args=(number,)) for number in range(readers)]
+        threads.append(threading.Thread(target=writer))
+        for thread in threads:
+            thread.start()
+        time.sleep(seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        return sum(counts) / seconds, writes[0] / seconds
+
+    books = [Book(book_id, f"book_{book_id}", 100 + book_id % 900) for book_id in range(1, size + 1)]
+    library = Library(list(books))
+    lock = threading.Lock()
+
+    def locked_read(ids: list) -> None:
+        with lock:
+            for book_id in ids:
+                library.get_book_by_id(book_id)
+
+    def locked_write(book_id: int) -> None:
+        # Добавляется новая книга и удаляется добавленная перед ней: размер библиотеки не растёт
+        with lock:
+            library.add_book(Book(book_id, f"book_{book_id}", 100))
+            if book_id > size + 1:
+                library.remove_book(book_id - 1)
+
+    reads, writes = run(locked_read, locked_write)
+    print(f"  Library под блокировкой:  {reads:12.0f} поисков/с, {writes:9.0f} изменений/с")
+
+    versioned = VersionedLibrary(list(books))
+
+    def snapshot_read(ids: list) -> None:
+        snapshot = versioned.snapshot()
+        for book_id in ids:
+            snapshot.get_book_by_id(book_id)
+
+    def versioned_write(book_id: int) -> None:
+        versioned.add_book(Book(book_id, f"book_{book_id}", 100))
+        if book_id > size + 1:
+            versioned.remove_book(book_id - 1)
+
+    reads, writes = run(snapshot_read, versioned_write)
+    print(f"  VersionedLibrary, снимки: {reads:12.0f} поисков/с, {writes:9.0f} изменений/с, "
+          f"живых версий: {len(versioned.live_versions())}")
+
+
+if __name__ == '__main__':
+    # Размеры можно передать аргументами: python benchmarks.py 1000 1000000 10000000
+    catalog_sizes = [int(arg) for arg in sys.argv[1:]] or [1_000, 10_000, 100_000, 1_000_000]
+    bench_lookup_by_id(catalog_sizes)
+    bench_secondary_indexes(max(catalog_sizes))
+    bench_streaming_loader(max(catalog_sizes))
+    bench_memory_layout(max(catalog_sizes))
+    bench_cold_start(max(catalog_sizes))
+    bench_sqlite(max(catalog_sizes))
+    bench_fuzzy_search(max(catalog_sizes))
+    bench_id_allocator([1, 4, 16, 64])
+    bench_library_service(max(catalog_sizes))
+    bench_versioned_reads(max(catalog_sizes))
@@ -0,0 +1,300 @@
+from array import array
+from collections.abc import Sequence
+from typing import Iterator
+
+from id_allocator import IdAllocator
+from main_Book import Book
+from library_search import TrigramIndex
+
+# Границы значений колонок array('q')
+INT64_MIN = -2 ** 63
+INT64_MAX = 2 ** 63 - 1
+
+
+class BookView:
+    """
+    Лёгкое представление строки BookStore: только слоты, без __dict__.
+    Представления с одинаковыми полями равны и имеют одинаковый хеш, поэтому годятся в множества
+    и ключи словарей. В Library представление добавляется через to_book.
+    Примеры:
+    >>> view = BookView(1, "Мастер и Маргарита", 480)
+    >>> view == BookView(1, "Мастер и Маргарита", 480), len({view, BookView(1, "Мастер и Маргарита", 480)})
+    (True, 1)
+    >>> view.to_book()
+    Book(id_=1, name='Мастер и Маргарита', pages=480)
+    """
+    __slots__ = ("id", "name", "pages")
+
+    def __init__(self, book_id: int, book_name: str, book_pages: int):
+        """
+        Создание и подготовка к работе объекта "Представление книги"
+        :param book_id: Идентификатор книги
+        :param book_name: Название книги
+        :param book_pages: Количество страниц в книге
+        """
+        self.id = book_id
+        self.name = book_name
+        self.pages = book_pages
+
+    def __str__(self) -> str:
+        return f'Книга "{self.name}"'
+
+    def __repr__(self) -> str:
+        return f'Book(id_={self.id!r}, name={self.name!r}, pages={self.pages!r})'
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, BookView):
+            return NotImplemented
+        return (self.id, self.name, self.pages) == (other.id, other.name, other.pages)
+
+    def __hash__(self) -> int:
+        return hash((self.id, self.name, self.pages))
+
+    def to_book(self) -> Book:
+        """
+        Создаёт полноценную книгу с теми же полями, например для Library.add_book.
+        :return: Книга
+        """
+        return Book(self.id, self.name, self.pages)
+
+
+class _BookSequence(Sequence):
+    """Последовательность книг хранилища, выдающая BookView по требованию."""
+    def __init__(self, store: "BookStore"):
+        self._store = store
+
+    def __len__(self) -> int:
+        return len(self._store._ids)
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self._store._view(index) for index in range(*position.indices(len(self)))]
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError("Индекс книги вне диапазона")
+        return self._store._view(position)
+
+    def __iter__(self) -> Iterator[BookView]:
+        view = self._store._view
+        for position in range(len(self)):
+            yield view(position)
+
+
+class BookStore:
+    """
+    Колоночное хранилище книг с тем же публичным API, что и Library.
+    Идентификаторы и страницы лежат в массивах array('q'), названия - в таблице
+    уникальных строк, на которую ссылается массив кодов.
+    """
+    def __init__(self, list_of_books: list = None, allocator: IdAllocator = None):
+        """
+        Создание и подготовка к работе объекта "Колоночное хранилище книг"
+        :param list_of_books: Список книг (любых объектов с атрибутами id, name, pages)
+        :param allocator: Распределитель id для get_next_book_id
+        """
+        if list_of_books is None:
+            list_of_books = []
+        if not isinstance(list_of_books, list):
+            raise TypeError("Список книг должен быть типа list")
+        self._ids = array("q")
+        self._pages = array("q")
+        self._name_codes = array("q")
+        self._names = []       # таблица уникальных названий, код названия - индекс в ней
+        self._name_table = {}  # название -> код
+        self._positions = {}
+        self._indexes = {}
+        self._max_id = 0
+        if allocator is not None and not isinstance(allocator, IdAllocator):
+            raise TypeError("Распределитель id должен быть типа IdAllocator")
+        self.allocator = allocator
+        for book in list_of_books:
+            self.add_book(book)
+        if allocator is not None:
+            allocator.advance_to(self._max_id + 1)
+
+    @property
+    def books(self) -> Sequence:
+        """Возвращает последовательность книг; BookView создаются только при обращении."""
+        return _BookSequence(self)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _view(self, position: int) -> BookView:
+        return BookView(self._ids[position], self._names[self._name_codes[position]], self._pages[position])
+
+    def _name_code(self, name: str) -> int:
+        code = self._name_table.get(name)
+        if code is None:
+            code = len(self._names)
+            self._names.append(name)
+            self._name_table[name] = code
+        return code
+
+    @staticmethod
+    def _check_book(book) -> None:
+        # Все проверки - до изменения колонок: иначе ошибка на середине оставит колонки разной длины
+        if not isinstance(book.id, int):
+            raise TypeError("Идентификатор книги должен быть типа int")
+        if not isinstance(book.name, str):
+            raise TypeError("Название книги должно быть типа str")
+        if not isinstance(book.pages, int):
+            raise TypeError("Количество страниц должно быть типа int")
+        if not INT64_MIN <= book.id <= INT64_MAX:
+            raise ValueError("Идентификатор книги не помещается в 64-битное целое")
+        if not INT64_MIN <= book.pages <= INT64_MAX:
+            raise ValueError("Количество страниц не помещается в 64-битное целое")
+
+    def get_next_book_id(self) -> int:
+        """
+        Возвращает id для новой книги так же, как Library.get_next_book_id.
+        :return: Идентификатор
+        """
+        if self.allocator is not None:
+            return self.allocator.allocate()
+        return self._max_id + 1
+
+    def get_index_by_book_id(self, our_book_id: int) -> int:
+        """
+        Возвращает индекс книги в хранилище за O(1).
+        :param our_book_id: Идентификатор книги
+        :return: Индекс книги
+        """
+        if not isinstance(our_book_id, int):
+            raise TypeError("Id книги должен быть типа int")
+        try:
+            return self._positions[our_book_id]
+        except KeyError:
+            raise ValueError("Книги с запрашиваемым id не существует") from None
+
+    def get_book_by_id(self, our_book_id: int) -> BookView:
+        """
+        Возвращает представление книги по её идентификатору.
+        :param our_book_id: Идентификатор книги
+        :return: Представление книги
+        """
+        return self._view(self.get_index_by_book_id(our_book_id))
+
+    def add_book(self, book) -> int:
+        """
+        Добавляет книгу в конец колонок за O(1) амортизированно.
+        :param book: Книга
+        :return: Индекс добавленной книги
+        Примеры:
+        >>> store = BookStore([BookView(1, 'test_name_1', 200)])
+        >>> store.add_book(BookView(2, 'test_name_2', 2 ** 70))
+        Traceback (most recent call last):
+        ...
+        ValueError: Количество страниц не помещается в 64-битное целое
+        >>> len(store), [book.id for book in store.books]
+        (1, [1])
+        """
+        self._check_book(book)
+        if book.id in self._positions:
+            raise ValueError(f"Книга с id {book.id} уже есть в библиотеке")
+        position = len(self._ids)
+        self._ids.append(book.id)
+        self._pages.append(book.pages)
+        self._name_codes.append(self._name_code(book.name))
+        self._positions[book.id] = position
+        if book.id > self._max_id:
+            self._max_id = book.id
+        if self.allocator is not None:
+            self.allocator.mark_used(book.id)
+        if self._indexes:
+            view = self._view(position)
+            for index in self._indexes.values():
+                index.insert(view)
+        return position
+
+    def remove_book(self, our_book_id: int) -> BookView:
+        """
+        Удаляет книгу за O(1), перенося на её место последнюю строку колонок.
+        Название остаётся в таблице строк для последующих книг.
+        :param our_book_id: Идентификатор книги
+        :return: Представление удалённой книги
+        """
+        position = self.get_index_by_book_id(our_book_id)
+        removed = self._view(position)
+        last = len(self._ids) - 1
+        if position != last:
+            self._ids[position] = self._ids[last]
+            self._pages[position] = self._pages[last]
+            self._name_codes[position] = self._name_codes[last]
+            self._positions[self._ids[position]] = position
+        self._ids.pop()
+        self._pages.pop()
+        self._name_codes.pop()
+        del self._positions[our_book_id]
+        for index in self._indexes.values():
+            index.delete(removed)
+        return removed
+
+    def update_book(self, book) -> BookView:
+        """
+        Заменяет название и количество страниц книги с тем же id, не меняя её позицию.
+        :param book: Новая версия книги
+        :return: Представление прежней версии книги
+        """
+        self._check_book(book)
+        position = self.get_index_by_book_id(book.id)
+        previous = self._view(position)
+        self._pages[position] = book.pages
+        self._name_codes[position] = self._name_code(book.name)
+        if self._indexes:
+            current = self._view(position)
+            for index in self._indexes.values():
+                index.delete(previous)
+                index.insert(current)
+        return previous
+
+    def add_index(self, index) -> None:
+        """
+        Подключает вторичный индекс из library_indexes.py, как Library.add_index.
+        :param index: Индекс с атрибутом kind и методами build, insert, delete
+        """
+        index.build(self.books)
+        self._indexes[index.kind] = index
+
+    def find_by_name_prefix(self, prefix: str) -> list:
+        """
+        Возвращает книги, название которых начинается с prefix.
+        :param prefix: Начало названия
+        :return: Список представлений книг
+        """
+        index = self._indexes.get("name_prefix")
+        if index is None:
+            if not isinstance(prefix, str):
+                raise TypeError("Префикс названия должен быть типа str")
+            codes = {code for code, name in enumerate(self._names) if name.startswith(prefix)}
+            return [self._view(position) for position, code in enumerate(self._name_codes) if code in codes]
+        return [self._view(self._positions[book_id]) for book_id in index.starts_with(prefix)]
+
+    def find_by_pages_range(self, low: int, high: int) -> list:
+        """
+        Возвращает книги, у которых от low до high страниц включительно.
+        :param low: Нижняя граница
+        :param high: Верхняя граница
+        :return: Список представлений книг
+        """
+        index = self._indexes.get("pages_range")
+        if index is None:
+            if not isinstance(low, int) or not isinstance(high, int):
+                raise TypeError("Границы диапазона должны быть типа int")
+            return [self._view(position) for position, pages in enumerate(self._pages) if low <= pages <= high]
+        return [self._view(self._positions[book_id]) for book_id in index.between(low, high)]
+
+    def find_similar_names(self, query: str, k: int = 10) -> list:
+        """
+        Возвращает до k книг с названиями, наиболее похожими на запрос, по убыванию сходства,
+        как Library.find_similar_names: первый вызов без индекса подключает TrigramIndex.
+        :param query: Название или его часть, возможно с опечатками
+        :param k: Количество результатов
+        :return: Список представлений книг
+        """
+        index = self._indexes.get("name_trigram")
+        if index is None:
+            index = TrigramIndex()
+            self.add_index(index)
+        return [self._view(self._positions[book_id]) for book_id, _ in index.search(query, k)]
@@ -0,0 +1,201 @@
+import os
+import threading
+from typing import Callable, Optional
+
+try:
+    import fcntl
+except ImportError:  # fcntl есть только в Unix: без него файл защищён лишь от потоков своего процесса
+    fcntl = None
+
+
+# Сообщение об испорченном файле границы: пустой файл или не число
+CORRUPT_FILE = "Файл границы id {path} повреждён: в нём должно быть одно целое число"
+
+
+class IdAllocator:
+    """
+    Выдаёт уникальные возрастающие id книг блоками. Поток резервирует сразу block_size id
+    и выдаёт их из своего блока без общей блокировки: блок хранится в threading.local,
+    и менять его может только сам поток. Блокировки (и запись файла) нужны только на резервирование.
+    Если задан файл, в нём хранится верхняя граница зарезервированных id: граница записывается
+    до выдачи блока, поэтому после перезапуска id никогда не повторяются (неиспользованный
+    остаток блока просто пропускается). Файл могут разделять несколько процессов: их разделяет
+    flock, потоки этого процесса - отдельная блокировка резервирования, которую allocate
+    из своего блока не берёт.
+    """
+    def __init__(self, path: Optional[str] = None, block_size: int = 1000):
+        """
+        Создание и подготовка к работе объекта "Распределитель id"
+        :param path: Файл для хранения верхней границы; без него граница хранится только в памяти
+        :param block_size: Количество id, резервируемых потоком за раз
+        Примеры:
+        >>> import os, tempfile
+        >>> path = os.path.join(tempfile.mkdtemp(), 'book_ids')
+        >>> allocator = IdAllocator(path, block_size=10)
+        >>> allocator.allocate(), allocator.allocate()
+        (1, 2)
+        >>> restarted = IdAllocator(path, block_size=10)
+        >>> restarted.allocate()
+        11
+        >>> restarted.advance_to(100)
+        >>> restarted.allocate()
+        100
+        >>> restarted.mark_used(102)
+        >>> restarted.allocate(), restarted.allocate()
+        (101, 103)
+        >>> restarted.mark_used(125)
+        >>> restarted.high_water
+        130
+        >>> with open(path, 'w') as file:
+        ...     _ = file.write('')
+        >>> IdAllocator(path)  # doctest: +ELLIPSIS
+        Traceback (most recent call last):
+        ...
+        ValueError: Файл границы id ... повреждён: в нём должно быть одно целое число
+        """
+        if path is not None and not isinstance(path, str):
+            raise TypeError("Путь к файлу должен быть типа str")
+        if not isinstance(block_size, int):
+            raise TypeError("Размер блока должен быть типа int")
+        if block_size <= 0:
+            raise ValueError("Размер блока должен быть положительным числом")
+        self.path = path
+        self.block_size = block_size
+        # Блокировка резервирования: её берут только потоки, которым нужен новый блок, и mark_used
+        self._reserve_lock = threading.Lock()
+        # Блокировка реестра блоков потоков: короткая, без ввода-вывода
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        # Поток -> [следующий id, конец блока, поколение] его текущего блока. Список меняет только
+        # поток-владелец; реестр нужен mark_used, чтобы видеть ещё не выданные id чужих блоков
+        self._blocks = {}
+        # advance_to увеличивает поколение: блоки прежних поколений больше не используются
+        self._generation = 0
+        # Ещё не выданные id внутри блоков потоков, занятые книгами, добавленными вручную (mark_used)
+        self._taken = set()
+        self._high_water = self._read() if path is not None else 1
+
+    @property
+    def high_water(self) -> int:
+        """Наименьший id, который ещё не зарезервирован ни одним блоком (по данным этого процесса)."""
+        return self._high_water
+
+    def _read(self) -> int:
+        try:
+            with open(self.path, encoding="utf-8") as file:
+                text = file.read()
+        except FileNotFoundError:
+            return 1
+        try:
+            return int(text)
+        except ValueError:
+            raise ValueError(CORRUPT_FILE.format(path=self.path)) from None
+
+    def _write(self, high_water: int) -> None:
+        # Новое значение пишется во временный файл и атомарно подменяет старое: после сбоя
+        # в файле остаётся либо прежняя граница, либо новая, но не обрывок записи
+        temporary = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporary, "w", encoding="utf-8") as file:
+            file.write(str(high_water))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, self.path)
+        directory = os.open(os.path.dirname(os.path.abspath(self.path)), os.O_RDONLY)
+        try:
+            os.fsync(directory)
+        finally:
+            os.close(directory)
+
+    def _advance(self, target: Callable[[int], int]) -> int:
+        """
+        Сдвигает верхнюю границу: target получает текущую границу и возвращает новую (не меньше текущей).
+        :return: Граница до сдвига
+        """
+        with self._reserve_lock:
+            if self.path is None:
+                current = self._high_water
+                self._high_water = target(current)
+                return current
+            # Блокировка файла отделяет процессы, self._reserve_lock - потоки этого процесса
+            with open(self.path + ".lock", "a") as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    current = max(self._read(), self._high_water)
+                    high_water = target(current)
+                    if high_water != current:
+                        self._write(high_water)
+                    self._high_water = high_water
+                    return current
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _new_block(self) -> list:
+        generation = self._generation
+        size = self.block_size
+        start = self._advance(lambda current: current + size)
+        block = [start, start + size, generation]
+        self._local.block = block
+        with self._lock:
+            self._blocks[threading.get_ident()] = block
+        return block
+
+    def allocate(self) -> int:
+        """
+        Возвращает новый id. Внутри одного потока id строго возрастают, между потоками не повторяются;
+        id, отмеченные через mark_used, пропускаются. Выдача из своего блока не берёт блокировок.
+        :return: Идентификатор
+        """
+        block = getattr(self._local, "block", None)
+        taken = self._taken
+        while True:
+            if block is None or block[0] >= block[1] or block[2] != self._generation:
+                block = self._new_block()
+            next_id = block[0]
+            block[0] = next_id + 1
+            if not taken or next_id not in taken:
+                return next_id
+            taken.discard(next_id)
+
+    def advance_to(self, minimum: int) -> None:
+        """
+        Гарантирует, что дальше выдаются только id не меньше minimum, например после загрузки
+        книг с уже назначенными id. Текущие блоки потоков больше не используются.
+        :param minimum: Наименьший допустимый id
+        """
+        if not isinstance(minimum, int):
+            raise TypeError("Id должен быть типа int")
+        if minimum > self._high_water:
+            self._advance(lambda current: max(current, minimum))
+        with self._lock:
+            self._generation += 1
+            self._blocks.clear()
+            self._taken.clear()
+
+    def mark_used(self, book_id: int) -> None:
+        """
+        Отмечает id, занятый книгой, добавленной с уже назначенным id: allocate его больше не выдаст.
+        Id за верхней границей сдвигает её шагами по block_size, поэтому подряд идущие id
+        стоят одной записи файла на блок, а не на книгу; ещё не выданный id из блока потока
+        запоминается и пропускается этим потоком. Блоки других процессов этот процесс не видит.
+        :param book_id: Занятый id
+        """
+        if not isinstance(book_id, int):
+            raise TypeError("Id должен быть типа int")
+        if book_id >= self._high_water:
+            size = self.block_size
+            self._advance(lambda current: current if book_id < current
+                          else current + (book_id - current) // size * size + size)
+            return
+        with self._lock:
+            blocks = list(self._blocks.values())
+        generation = self._generation
+        if any(block[0] <= book_id < block[1] and block[2] == generation for block in blocks):
+            self._taken.add(book_id)
+
+
+if __name__ == "__main__":
+    import doctest
+
+    doctest.testmod()
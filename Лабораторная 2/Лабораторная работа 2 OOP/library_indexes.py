@@ -0,0 +1,101 @@
+from abc import ABC, abstractmethod
+from bisect import bisect_left, bisect_right, insort
+from typing import Iterable, List
+
+
+class SortedIndex(ABC):
+    """
+    Абстрактный базовый класс вторичного индекса: отсортированный список пар (ключ, id книги).
+    Наследник задаёт kind и key.
+    Примеры:
+    >>> SortedIndex()  # doctest: +ELLIPSIS
+    Traceback (most recent call last):
+    ...
+    TypeError: Can't instantiate abstract class SortedIndex ...
+    """
+    kind = None
+
+    def __init__(self):
+        """
+        Создание и подготовка к работе пустого индекса.
+        """
+        self._entries = []
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @abstractmethod
+    def key(self, book) -> object:
+        """
+        Возвращает ключ, по которому книга упорядочивается в индексе.
+        :param book: Книга
+        """
+
+    def build(self, books: Iterable) -> None:
+        """
+        Строит индекс заново по списку книг за O(n log n).
+        :param books: Книги библиотеки
+        """
+        self._entries = sorted((self.key(book), book.id) for book in books)
+
+    def insert(self, book) -> None:
+        """
+        Добавляет книгу в индекс: место ищется за O(log n), сдвиг хвоста списка - O(n) копирования памяти.
+        :param book: Книга
+        """
+        insort(self._entries, (self.key(book), book.id))
+
+    def delete(self, book) -> None:
+        """
+        Удаляет книгу из индекса.
+        :param book: Книга
+        """
+        entry = (self.key(book), book.id)
+        position = bisect_left(self._entries, entry)
+        if position == len(self._entries) or self._entries[position] != entry:
+            raise ValueError("Книги нет в индексе")
+        del self._entries[position]
+
+
+class NamePrefixIndex(SortedIndex):
+    """Индекс по названию книги для поиска по префиксу за O(log n + k)."""
+    kind = "name_prefix"
+
+    def key(self, book) -> str:
+        return book.name
+
+    def starts_with(self, prefix: str) -> List[int]:
+        """
+        Возвращает id книг, название которых начинается с prefix, в алфавитном порядке.
+        :param prefix: Начало названия
+        :return: Список id книг
+        """
+        if not isinstance(prefix, str):
+            raise TypeError("Префикс названия должен быть типа str")
+        found = []
+        position = bisect_left(self._entries, (prefix,))
+        while position < len(self._entries) and self._entries[position][0].startswith(prefix):
+            found.append(self._entries[position][1])
+            position += 1
+        return found
+
+
+class PagesRangeIndex(SortedIndex):
+    """Индекс по количеству страниц для запросов по диапазону за O(log n + k)."""
+    kind = "pages_range"
+
+    def key(self, book) -> int:
+        return book.pages
+
+    def between(self, low: int, high: int) -> List[int]:
+        """
+        Возвращает id книг, у которых от low до high страниц включительно, по возрастанию страниц.
+        :param low: Нижняя граница
+        :param high: Верхняя граница
+        :return: Список id книг
+        """
+        if not isinstance(low, int) or not isinstance(high, int):
+            raise TypeError("Границы диапазона должны быть типа int")
+        start = bisect_left(self._entries, (low,))
+        stop = bisect_right(self._entries, (high, float("inf")))
+        return [book_id for _, book_id in self._entries[start:stop]]
@@ -0,0 +1,144 @@
+import csv
+import json
+import sys
+import time
+from itertools import islice
+from typing import Callable, Iterable, Iterator, List, NamedTuple, Optional
+
+from main_Library import Book, Library
+
+try:
+    import resource
+except ImportError:  # resource есть только в Unix
+    resource = None
+
+BOOK_FIELDS = ("id", "name", "pages")
+
+# ru_maxrss в macOS измеряется в байтах, в Linux и BSD - в килобайтах
+RSS_UNITS_PER_KB = 1024 if sys.platform == "darwin" else 1
+
+
+class ChunkStats(NamedTuple):
+    """Статистика загрузки одной порции записей."""
+    number: int
+    rows: int
+    seconds: float
+    rows_per_second: float
+    peak_rss_kb: Optional[int]
+
+
+def iter_records(path: str) -> Iterator[dict]:
+    """
+    Построчно читает записи вида BOOKS_DATABASE из файла JSON Lines (.jsonl) или CSV (.csv).
+    В памяти одновременно находится только одна запись.
+    :param path: Путь к файлу
+    :return: Итератор словарей с ключами id, name, pages
+    """
+    if path.endswith(".jsonl"):
+        with open(path, encoding="utf-8") as file:
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+    elif path.endswith(".csv"):
+        with open(path, encoding="utf-8", newline="") as file:
+            yield from csv.DictReader(file)
+    else:
+        raise ValueError("Поддерживаются только файлы .jsonl и .csv")
+
+
+def iter_chunks(records: Iterable[dict], chunk_size: int) -> Iterator[List[dict]]:
+    """
+    Разбивает поток записей на порции не больше chunk_size.
+    :param records: Поток записей
+    :param chunk_size: Размер порции
+    :return: Итератор порций
+    """
+    if not isinstance(chunk_size, int):
+        raise TypeError("Размер порции должен быть типа int")
+    if chunk_size <= 0:
+        raise ValueError("Размер порции должен быть положительным числом")
+    records = iter(records)
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+        # Генератор не должен держать прошлую порцию, пока собирает следующую
+        del chunk
+
+
+def _to_int(value) -> int:
+    # Из JSON принимаются только целые числа (не float и не bool), из CSV - строки с целым числом
+    if isinstance(value, str):
+        return int(value)
+    if type(value) is not int:
+        raise TypeError("Значение должно быть целым числом")
+    return value
+
+
+def validate_chunk(chunk: List[dict], first_row: int = 1) -> List[Book]:
+    """
+    Проверяет порцию записей и превращает её в книги. Строковые значения из CSV приводятся к int,
+    дробные и логические значения из JSON отклоняются, а не округляются.
+    :param chunk: Порция записей
+    :param first_row: Номер первой записи порции в файле, нужен для сообщения об ошибке
+    :return: Список книг
+    Примеры:
+    >>> validate_chunk([{'id': '1', 'name': 'test_name_1', 'pages': '200'}])
+    [Book(id_=1, name='test_name_1', pages=200)]
+    >>> validate_chunk([{'id': 1.9, 'name': 'test_name_1', 'pages': 200}], first_row=5)
+    Traceback (most recent call last):
+    ...
+    ValueError: Запись 5: id и pages должны быть целыми числами
+    """
+    books = []
+    for row_number, record in enumerate(chunk, start=first_row):
+        missing = [field for field in BOOK_FIELDS if field not in record]
+        if missing:
+            raise ValueError(f"Запись {row_number}: нет полей {', '.join(missing)}")
+        try:
+            book_id = _to_int(record["id"])
+            book_pages = _to_int(record["pages"])
+        except (TypeError, ValueError):
+            raise ValueError(f"Запись {row_number}: id и pages должны быть целыми числами") from None
+        books.append(Book(book_id=book_id, book_name=record["name"], book_pages=book_pages))
+    return books
+
+
+def load_library(path: str, library: Library = None, chunk_size: int = 10_000,
+                 report: Callable[[ChunkStats], None] = None) -> Library:
+    """
+    Потоково загружает книги из файла в библиотеку порциями по chunk_size записей.
+    Одновременно в памяти держится не больше одной порции исходных записей.
+    :param path: Путь к файлу .jsonl или .csv
+    :param library: Библиотека для заполнения, по умолчанию новая пустая
+    :param chunk_size: Размер порции
+    :param report: Функция, получающая ChunkStats после каждой порции
+    :return: Заполненная библиотека
+    """
+    if library is None:
+        library = Library()
+    first_row = 1
+    number = 0
+    chunks = iter_chunks(iter_records(path), chunk_size)
+    while True:
+        # Время порции включает чтение и разбор файла, а не только добавление книг
+        start = time.perf_counter()
+        chunk = next(chunks, None)
+        if chunk is None:
+            break
+        number += 1
+        books = validate_chunk(chunk, first_row)
+        # Записи порции больше не нужны: без этого они жили бы, пока читается следующая порция
+        del chunk
+        for book in books:
+            library.add_book(book)
+        seconds = time.perf_counter() - start
+        rows = len(books)
+        del books
+        if report is not None:
+            peak_rss_kb = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // RSS_UNITS_PER_KB
+                           if resource else None)
+            report(ChunkStats(number, rows, seconds, rows / seconds if seconds else 0.0, peak_rss_kb))
+        first_row += rows
+    return library
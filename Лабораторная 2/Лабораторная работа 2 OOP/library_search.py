@@ -0,0 +1,271 @@
+import heapq
+from collections import Counter
+from itertools import chain
+from math import ceil, floor
+from typing import Dict, FrozenSet, Iterable, List, Set, Tuple
+
+# Пороги сходства, с которых поиск начинает перебор кандидатов, от строгого к мягкому
+LEVELS = (0.8, 0.7, 0.6, 0.45)
+# Сколько id из списков триграмм поиск по умолчанию считает за запрос. Обязательные для первого порога
+# списки считаются всегда, более мягкие пороги и дополнительные списки - только в пределах этого числа
+MAX_POSTINGS = 2_000
+# Ширина группы длин названий (в триграммах): индекс хранит списки триграмм отдельно для каждой группы
+SIZE_BUCKET = 4
+# Сколько кандидатов на один результат полностью проверяет поиск, когда упирается в ограничение просмотра
+CANDIDATES_PER_RESULT = 10
+
+
+def trigrams(text: str) -> FrozenSet[str]:
+    """
+    Возвращает множество триграмм строки без учёта регистра.
+    Каждое слово дополняется двумя пробелами в начале и одним в конце,
+    поэтому совпадение начала слова весит больше, чем совпадение середины.
+    :param text: Строка
+    :return: Множество триграмм
+    Примеры:
+    >>> sorted(trigrams('Кот'))
+    ['  к', ' ко', 'кот', 'от ']
+    """
+    grams = set()
+    for word in text.lower().split():
+        padded = "  " + word + " "
+        grams.update(padded[start:start + 3] for start in range(len(padded) - 2))
+    return frozenset(grams)
+
+
+def name_similarity(query: str, name: str) -> float:
+    """
+    Сходство строк по Жаккару на множествах триграмм: от 0 до 1.
+    :param query: Запрос
+    :param name: Название книги
+    :return: Сходство
+    Примеры:
+    >>> name_similarity('Мастер и Маргарита', 'мастер и маргарита')
+    1.0
+    >>> round(name_similarity('Мастер и Маргорита', 'Мастер и Маргарита'), 2)
+    0.7
+    """
+    query_grams, name_grams = trigrams(query), trigrams(name)
+    if not query_grams or not name_grams:
+        return 0.0
+    common = len(query_grams & name_grams)
+    return common / (len(query_grams) + len(name_grams) - common)
+
+
+class TrigramIndex:
+    """
+    Инвертированный индекс триграмм названий для нечёткого поиска книг.
+    Книги разбиты на группы по длине названия в триграммах (SIZE_BUCKET длин в группе); для каждой группы
+    и триграммы хранится множество id книг, в названии которых она встречается. На каждом пороге сходства
+    поиск смотрит только группы, где порог достижим по длине названия, и перебирает кандидатов из самых
+    редких списков триграмм запроса: книга, сходство которой не ниже порога, обязательно есть хотя бы
+    в одном из них.
+    Просмотр списков ограничен max_postings id за запрос. Первый порог проверяется всегда точно; если
+    обязательные списки более мягкого порога в ограничение не помещаются, поиск считает самые редкие из них
+    и проверяет книги с наибольшим числом совпадений. Выдача ниже первого порога поэтому приближённая:
+    на миллионе названий с опечаткой лучшая книга находится почти всегда, а из точной десятки - около трети
+    (см. bench_fuzzy_search). С max_postings=None поиск точный, но в несколько раз медленнее.
+    """
+    kind = "name_trigram"
+
+    def __init__(self, threshold: float = 0.3, max_postings: int = MAX_POSTINGS):
+        """
+        Создание и подготовка к работе пустого индекса.
+        :param threshold: Минимальное сходство, при котором книга попадает в выдачу
+        :param max_postings: Сколько id из списков триграмм считать за запрос; None - без ограничения
+        Примеры:
+        >>> from main_Library import Book
+        >>> index = TrigramIndex()
+        >>> index.build([Book(1, 'Мастер и Маргарита', 480), Book(2, 'Война и мир', 1300),
+        ...              Book(3, 'Мастер на все руки', 150)])
+        >>> index.search('мастер и маргорита')
+        [(1, 0.7)]
+        >>> index.search('мастер', k=2, threshold=0.1)
+        [(1, 0.41), (3, 0.37)]
+        """
+        if not isinstance(threshold, (int, float)):
+            raise TypeError("Порог сходства должен быть числом")
+        if not 0 < threshold <= 1:
+            raise ValueError("Порог сходства должен быть в диапазоне (0, 1]")
+        if max_postings is not None:
+            if not isinstance(max_postings, int):
+                raise TypeError("Ограничение просмотра списков должно быть типа int")
+            if max_postings <= 0:
+                raise ValueError("Ограничение просмотра списков должно быть положительным числом")
+        self.threshold = threshold
+        self.max_postings = max_postings
+        # Группа длины названия (длина в триграммах // SIZE_BUCKET) -> триграмма -> id книг
+        self._postings: Dict[int, Dict[str, Set[int]]] = {}
+        self._sizes: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._sizes)
+
+    def build(self, books: Iterable) -> None:
+        """
+        Строит индекс заново по списку книг.
+        :param books: Книги библиотеки
+        """
+        self._postings = {}
+        self._sizes = {}
+        for book in books:
+            self.insert(book)
+
+    def insert(self, book) -> None:
+        """
+        Добавляет книгу в индекс за O(количество триграмм названия).
+        :param book: Книга
+        """
+        grams = trigrams(book.name)
+        postings = self._postings.get(len(grams) // SIZE_BUCKET)
+        if postings is None:
+            postings = self._postings[len(grams) // SIZE_BUCKET] = {}
+        for gram in grams:
+            ids = postings.get(gram)
+            if ids is None:
+                ids = postings[gram] = set()
+            ids.add(book.id)
+        self._sizes[book.id] = len(grams)
+
+    def delete(self, book) -> None:
+        """
+        Удаляет книгу из индекса.
+        :param book: Книга
+        """
+        if book.id not in self._sizes:
+            raise ValueError("Книги нет в индексе")
+        bucket = self._sizes.pop(book.id) // SIZE_BUCKET
+        postings = self._postings[bucket]
+        for gram in trigrams(book.name):
+            ids = postings[gram]
+            ids.discard(book.id)
+            if not ids:
+                del postings[gram]
+        if not postings:
+            del self._postings[bucket]
+
+    def search(self, query: str, k: int = 10, threshold: float = None) -> List[Tuple[int, float]]:
+        """
+        Возвращает до k книг, наиболее похожих на запрос, по убыванию сходства.
+        :param query: Название или его часть, возможно с опечатками
+        :param k: Количество результатов
+        :param threshold: Минимальное сходство, по умолчанию порог индекса
+        :return: Список пар (id книги, сходство, округлённое до сотых)
+        """
+        if not isinstance(query, str):
+            raise TypeError("Запрос должен быть типа str")
+        if not isinstance(k, int):
+            raise TypeError("Количество результатов должно быть типа int")
+        if k <= 0:
+            raise ValueError("Количество результатов должно быть положительным числом")
+        threshold = self.threshold if threshold is None else threshold
+        query_grams = trigrams(query)
+        if not query_grams:
+            return []
+        query_size = len(query_grams)
+        sizes = self._sizes
+        max_postings = float("inf") if self.max_postings is None else self.max_postings
+        # Группа длины -> [списки триграмм запроса по возрастанию длины, сколько из них посчитано, Counter].
+        # Триграммы, которых нет у книг группы, не дают списка: они не могут совпасть ни с одной из этих книг
+        partitions = {}
+        scores = {}
+        postings = 0
+        # Сначала ищутся только очень похожие книги: для высокого порога кандидатов дают лишь
+        # самые редкие триграммы. Порог снижается, только если k результатов ещё не набралось
+        levels = [level for level in LEVELS if level > threshold] + [threshold]
+        for level in levels:
+            # Фильтр длины: при сходстве >= level в названии от level * |запроса| до |запроса| / level триграмм.
+            # Названию длины size нужно не меньше level * (|запроса| + size) / (1 + level) общих триграмм,
+            # значит из n непустых списков группы книга есть хотя бы в одном из (n - нужное + 1) самых коротких
+            shortest, longest = ceil(level * query_size - 1e-9), floor(query_size / level + 1e-9)
+            plan = []
+            for bucket in range(shortest // SIZE_BUCKET, longest // SIZE_BUCKET + 1):
+                partition = partitions.get(bucket)
+                if partition is None:
+                    by_gram = self._postings.get(bucket, {})
+                    lists = sorted([by_gram[gram] for gram in query_grams if gram in by_gram], key=len)
+                    partition = partitions[bucket] = [lists, 0, Counter()]
+                # Меньше всего общих триграмм нужно самым коротким названиям группы
+                size = max(shortest, bucket * SIZE_BUCKET)
+                needed = max(1, ceil(level * (query_size + size) / (1 + level) - 1e-9))
+                if needed <= len(partition[0]):
+                    plan.append((bucket, partition, needed))
+            mandatory = sum(sum(map(len, lists[counted:len(lists) - needed + 1]))
+                            for _, (lists, counted, _), needed in plan)
+            if level != levels[0] and postings + mandatory > max_postings:
+                # Обязательные списки порога не помещаются в ограничение: ниже уже найденного поиск неточный
+                self._rank_best(plan, scores, query_size, k, max_postings)
+                found = [(similarity, -book_id) for book_id, similarity in scores.items() if similarity >= threshold]
+                break
+            postings += mandatory
+            for _, partition, needed in plan:
+                lists, counted, counts = partition
+                # Совпадения в коротких списках считает Counter (списки прошлых порогов уже учтены),
+                # в длинных - проверка вхождения. Сходство уже оценённых книг не пересчитывается
+                prefix_size = max(counted, len(lists) - needed + 1)
+                counts.update(chain.from_iterable(lists[counted:prefix_size]))
+                # Следующий список дешевле посчитать, чем проверить по нему всех кандидатов, если он не длиннее
+                # их числа. Из первых prefix_size списков книга есть хотя бы в prefix_size - (n - нужное),
+                # поэтому почти все книги с одной общей редкой триграммой отсеиваются без проверки
+                while prefix_size < len(lists) and len(lists[prefix_size]) <= len(counts) and \
+                        postings + len(lists[prefix_size]) <= max_postings:
+                    postings += len(lists[prefix_size])
+                    counts.update(lists[prefix_size])
+                    prefix_size += 1
+                partition[1] = prefix_size
+                rest = lists[prefix_size:]
+                min_common = prefix_size - (len(lists) - needed)
+                for book_id, common in counts.items():
+                    if common < min_common or book_id in scores or not shortest <= sizes[book_id] <= longest:
+                        continue
+                    # Проверка прекращается, как только нужного числа общих триграмм уже не набрать
+                    misses = common + len(rest) - needed
+                    for ids in rest:
+                        if book_id in ids:
+                            common += 1
+                        else:
+                            misses -= 1
+                            if misses < 0:
+                                break
+                    else:
+                        scores[book_id] = common / (query_size + sizes[book_id] - common)
+            found = [(similarity, -book_id) for book_id, similarity in scores.items() if similarity >= level]
+            if len(found) >= k:
+                break
+        return [(-negative_id, round(similarity, 2)) for similarity, negative_id in heapq.nlargest(k, found)]
+
+    def _rank_best(self, plan: list, scores: Dict[int, float], query_size: int, k: int, budget: float) -> None:
+        # Неточный шаг поиска: считаются ещё не посчитанные списки, начиная с групп, длина названий в которых
+        # ближе всего к длине запроса, и в каждой группе - с самых редких, пока их суммарная длина не больше
+        # budget. Затем полностью проверяются книги с наибольшим числом совпадений: похожая книга делит
+        # с запросом почти все триграммы и оказывается среди них
+        # Уже посчитанные списки считаются заново: Counter считает элементы списков на уровне C,
+        # а сложение Counter'ов идёт циклом Python
+        hits = Counter(chain.from_iterable(ids for _, (lists, counted, _), _ in plan for ids in lists[:counted]))
+        center = query_size // SIZE_BUCKET
+        for _, (lists, counted, _), _ in sorted(plan, key=lambda step: abs(step[0] - center)):
+            for ids in lists[counted:]:
+                if len(ids) > budget:
+                    break
+                budget -= len(ids)
+                hits.update(ids)
+        sizes = self._sizes
+        groups = {bucket: lists for bucket, (lists, _, _), _ in plan}
+        for book_id in scores:
+            hits.pop(book_id, None)
+        chosen = {}
+        for book_id, _ in hits.most_common(k * CANDIDATES_PER_RESULT):
+            chosen.setdefault(sizes[book_id] // SIZE_BUCKET, set()).add(book_id)
+        # Общие триграммы кандидатов группы считаются пересечениями множеств, без цикла по кандидатам
+        for bucket, group in chosen.items():
+            common = Counter()
+            for ids in groups[bucket]:
+                common.update(group & ids)
+            for book_id, shared in common.items():
+                scores[book_id] = shared / (query_size + sizes[book_id] - shared)
+
+
+if __name__ == "__main__":
+    import doctest
+
+    doctest.testmod()
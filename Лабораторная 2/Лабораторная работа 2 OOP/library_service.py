@@ -0,0 +1,373 @@
+import asyncio
+import json
+import statistics
+import time
+from typing import Dict, List, Sequence, Tuple
+
+from main_Library import Book, Library
+
+
+def encode_books(books: List[Book]) -> bytes:
+    """
+    Кодирует ответ со списком книг в строку JSON Lines.
+    :param books: Книги
+    :return: Строка ответа с переводом строки
+    """
+    return json.dumps({"books": [{"id": book.id, "name": book.name, "pages": book.pages} for book in books]},
+                      ensure_ascii=False).encode("utf-8") + b"\n"
+
+
+def encode_error(error: Exception) -> bytes:
+    """
+    Кодирует ответ с ошибкой в строку JSON Lines.
+    :param error: Исключение
+    :return: Строка ответа с переводом строки
+    """
+    return json.dumps({"error": str(error)}, ensure_ascii=False).encode("utf-8") + b"\n"
+
+
+# Ответ на запрос отсутствующего id, одинаковый для всех таких запросов
+MISSING_BOOK = encode_error(ValueError("Книги с запрашиваемым id не существует"))
+
+
+# Ответ на запрос длиннее лимита StreamReader
+TOO_LONG = encode_error(ValueError("Запрос длиннее допустимого"))
+
+
+async def _skip_line(reader: asyncio.StreamReader) -> bool:
+    """
+    Пропускает поток до конца текущей строки, не держа её в памяти целиком.
+    :param reader: Поток
+    :return: True, если перевод строки найден; False, если поток закончился раньше
+    """
+    while True:
+        try:
+            await reader.readuntil(b"\n")
+            return True
+        except asyncio.LimitOverrunError as error:
+            await reader.readexactly(error.consumed)
+        except asyncio.IncompleteReadError:
+            return False
+
+
+def parse_query(request: dict) -> Tuple:
+    """
+    Проверяет запрос и возвращает его ключ: одинаковые запросы дают одинаковые ключи.
+    Запрос - объект JSON с одним из полей: {"id": 42}, {"name_prefix": "Мастер"}, {"pages_range": [100, 200]}.
+    :param request: Запрос
+    :return: Ключ запроса
+    Примеры:
+    >>> parse_query({'pages_range': [100, 200]})
+    ('pages_range', 100, 200)
+    >>> parse_query({'id': '42'})
+    Traceback (most recent call last):
+    ...
+    TypeError: Id книги должен быть типа int
+    """
+    if not isinstance(request, dict) or len(request) != 1:
+        raise TypeError("Запрос должен быть объектом JSON с одним полем: id, name_prefix или pages_range")
+    (kind, value), = request.items()
+    if kind == "id":
+        if not isinstance(value, int) or isinstance(value, bool):
+            raise TypeError("Id книги должен быть типа int")
+        return kind, value
+    if kind == "name_prefix":
+        if not isinstance(value, str):
+            raise TypeError("Префикс названия должен быть типа str")
+        return kind, value
+    if kind == "pages_range":
+        if not isinstance(value, list) or len(value) != 2 or \
+                not all(isinstance(bound, int) and not isinstance(bound, bool) for bound in value):
+            raise TypeError("Диапазон страниц должен быть списком из двух int")
+        return kind, value[0], value[1]
+    raise ValueError(f"Неизвестный вид запроса: {kind}")
+
+
+class LibraryService:
+    """
+    Асинхронный сервис запросов к библиотеке по протоколу JSON Lines: по строке запроса
+    на строку ответа, в порядке запросов соединения. Одновременные одинаковые запросы
+    склеиваются: выполняется один, его закодированный ответ получают все. Разные запросы,
+    пришедшие в течение window секунд, выполняются одним проходом по индексам библиотеки,
+    а не по отдельной задаче на каждый.
+    """
+    def __init__(self, library: Library, window: float = 0, max_batch: int = 1024):
+        """
+        Создание и подготовка к работе объекта "Сервис библиотеки"
+        :param library: Библиотека; сервис только читает её, менять её нужно в том же цикле событий
+        :param window: Сколько секунд копить запросы перед выполнением пакета; 0 - до конца текущего шага цикла
+        :param max_batch: Пакет такого размера выполняется сразу, не дожидаясь конца окна
+        Примеры:
+        >>> async def demo():
+        ...     library = Library([Book(1, 'test_name_1', 200), Book(2, 'test_name_2', 400)])
+        ...     service = LibraryService(library)
+        ...     server = await service.start(port=0)
+        ...     client = await LibraryClient.connect(*server.sockets[0].getsockname()[:2])
+        ...     print(await client.request({'id': 2}))
+        ...     print(await client.request({'pages_range': [100, 300]}))
+        ...     print(await client.request({'id': 3}))
+        ...     await client.close()
+        ...     answers = await asyncio.gather(*(service.query({'name_prefix': 'test'}) for _ in range(3)))
+        ...     print(answers[0] is answers[1] is answers[2])
+        ...     server.close()
+        ...     await server.wait_closed()
+        ...     return service.stats()
+        >>> asyncio.run(demo())
+        {'books': [{'id': 2, 'name': 'test_name_2', 'pages': 400}]}
+        {'books': [{'id': 1, 'name': 'test_name_1', 'pages': 200}]}
+        {'error': 'Книги с запрашиваемым id не существует'}
+        True
+        {'requests': 6, 'coalesced': 2, 'batches': 4}
+        """
+        if not isinstance(library, Library):
+            raise TypeError("Библиотека должна быть типа Library")
+        if not isinstance(window, (int, float)):
+            raise TypeError("Окно пакета должно быть типа int или float")
+        if window < 0:
+            raise ValueError("Окно пакета не может быть отрицательным")
+        if not isinstance(max_batch, int):
+            raise TypeError("Размер пакета должен быть типа int")
+        if max_batch <= 0:
+            raise ValueError("Размер пакета должен быть положительным числом")
+        self.library = library
+        self.window = window
+        self.max_batch = max_batch
+        # Ключ запроса -> будущий ответ; запрос находится здесь, пока его пакет не выполнен
+        self._inflight: Dict[Tuple, asyncio.Future] = {}
+        self._pending: List[Tuple] = []
+        self._timer = None
+        self._requests = 0
+        self._coalesced = 0
+        self._batches = 0
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Возвращает счётчики: всего запросов, склеенных с уже выполняющимися и выполненных пакетов.
+        :return: Словарь счётчиков
+        """
+        return {"requests": self._requests, "coalesced": self._coalesced, "batches": self._batches}
+
+    async def query(self, request: dict) -> bytes:
+        """
+        Выполняет запрос, склеивая его с одинаковым выполняющимся и добавляя в текущий пакет.
+        :param request: Запрос
+        :return: Закодированный ответ
+        """
+        key = parse_query(request)
+        self._requests += 1
+        future = self._inflight.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self._inflight[key] = loop.create_future()
+            self._pending.append(key)
+            if len(self._pending) >= self.max_batch:
+                self._flush()
+            elif self._timer is None:
+                # Без окна пакет собирает запросы, прочитанные за текущий шаг цикла событий
+                if self.window:
+                    self._timer = loop.call_later(self.window, self._flush)
+                else:
+                    self._timer = loop.call_soon(self._flush)
+        else:
+            self._coalesced += 1
+        # Ответ общий для всех склеенных запросов: отмена одного из них не должна отменять остальные
+        return await asyncio.shield(future)
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+        self._batches += 1
+        try:
+            for key, response in self._run_batch(pending).items():
+                self._inflight[key].set_result(response)
+        except Exception as error:
+            # Непредвиденная ошибка пакета достаётся всем его запросам: иначе они ждали бы вечно
+            for key in pending:
+                future = self._inflight.get(key)
+                if future is not None and not future.done():
+                    future.set_exception(error)
+        finally:
+            for key in pending:
+                self._inflight.pop(key, None)
+
+    def _run_batch(self, pending: List[Tuple]) -> Dict[Tuple, bytes]:
+        """
+        Выполняет пакет: все запросы по id - одним вызовом Library.get_books_by_ids,
+        запросы по префиксу и диапазону страниц - каждый своим поиском по индексу.
+        :param pending: Ключи запросов пакета, без повторов
+        :return: Ключ запроса -> закодированный ответ
+        """
+        library = self.library
+        responses = {}
+        ids = [key[1] for key in pending if key[0] == "id"]
+        if ids:
+            for book_id, book in zip(ids, library.get_books_by_ids(ids)):
+                responses[("id", book_id)] = MISSING_BOOK if book is None else encode_books([book])
+        for key in pending:
+            kind = key[0]
+            if kind == "id":
+                continue
+            try:
+                if kind == "name_prefix":
+                    responses[key] = encode_books(library.find_by_name_prefix(key[1]))
+                else:
+                    responses[key] = encode_books(library.find_by_pages_range(key[1], key[2]))
+            except (TypeError, ValueError) as error:
+                responses[key] = encode_error(error)
+        return responses
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    line = await reader.readuntil(b"\n")
+                except asyncio.IncompleteReadError as error:
+                    line = error.partial
+                except asyncio.LimitOverrunError:
+                    # Строка длиннее лимита StreamReader: она пропускается до перевода строки,
+                    # клиент получает ошибку, а соединение продолжает обслуживаться
+                    if not await _skip_line(reader):
+                        break
+                    writer.write(TOO_LONG)
+                    await writer.drain()
+                    continue
+                if not line:
+                    break
+                try:
+                    response = await self.query(json.loads(line))
+                except Exception as error:
+                    response = encode_error(error)
+                writer.write(response)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8765, backlog: int = 4096) -> asyncio.AbstractServer:
+        """
+        Запускает сервер в текущем цикле событий.
+        :param host: Адрес
+        :param port: Порт; 0 - любой свободный
+        :param backlog: Очередь ещё не принятых соединений; при одновременном подключении
+                        тысяч клиентов маленькая очередь заставляет их повторять подключение
+        :return: Сервер asyncio
+        """
+        return await asyncio.start_server(self._handle, host, port, backlog=backlog)
+
+
+async def serve(library: Library, host: str = "127.0.0.1", port: int = 8765, **options) -> None:
+    """
+    Запускает сервис и обслуживает запросы до отмены.
+    :param library: Библиотека
+    :param host: Адрес
+    :param port: Порт
+    :param options: Параметры LibraryService: window, max_batch
+    """
+    server = await LibraryService(library, **options).start(host, port)
+    async with server:
+        await server.serve_forever()
+
+
+class LibraryClient:
+    """
+    Клиент сервиса библиотеки: одно соединение, запросы по одному.
+    """
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._reader = reader
+        self._writer = writer
+
+    @classmethod
+    async def connect(cls, host: str = "127.0.0.1", port: int = 8765) -> "LibraryClient":
+        """
+        Подключается к сервису.
+        :param host: Адрес
+        :param port: Порт
+        :return: Клиент
+        """
+        return cls(*await asyncio.open_connection(host, port))
+
+    async def request_raw(self, request: dict) -> bytes:
+        """
+        Отправляет запрос и возвращает строку ответа без разбора.
+        :param request: Запрос
+        :return: Строка ответа
+        """
+        self._writer.write(json.dumps(request, ensure_ascii=False).encode("utf-8") + b"\n")
+        await self._writer.drain()
+        return await self._reader.readline()
+
+    async def request(self, request: dict) -> dict:
+        """
+        Отправляет запрос и возвращает разобранный ответ.
+        :param request: Запрос
+        :return: Ответ: {"books": [...]} или {"error": "..."}
+        """
+        return json.loads(await self.request_raw(request))
+
+    async def close(self) -> None:
+        self._writer.close()
+        await self._writer.wait_closed()
+
+
+async def load_test(host: str, port: int, requests: Sequence[dict], connections: int = 10_000,
+                    requests_per_connection: int = 10) -> Dict[str, float]:
+    """
+    Нагрузочный тест: открывает connections соединений, дожидается, пока подключатся все,
+    и отправляет по каждому requests_per_connection запросов подряд, выбирая их по кругу из requests.
+    Задержка запроса - от отправки до получения ответа; подключение в неё не входит.
+    :param host: Адрес сервиса
+    :param port: Порт сервиса
+    :param requests: Запросы
+    :param connections: Количество одновременных соединений
+    :param requests_per_connection: Количество запросов на соединение
+    :return: Количество запросов, запросов в секунду, p50 и p99 задержки в миллисекундах и
+             количество соединений, оборвавшихся с ошибкой
+    """
+    ready = 0
+    everyone_connected = asyncio.Event()
+    latencies = []
+
+    async def session(number: int) -> None:
+        nonlocal ready
+        try:
+            client = await LibraryClient.connect(host, port)
+        finally:
+            # Неудачное подключение тоже считается, иначе остальные соединения ждали бы его вечно
+            ready += 1
+            if ready == connections:
+                everyone_connected.set()
+        try:
+            await everyone_connected.wait()
+            clock = time.perf_counter
+            for step in range(requests_per_connection):
+                request = requests[(number * requests_per_connection + step) % len(requests)]
+                start = clock()
+                if not await client.request_raw(request):
+                    raise ConnectionError("Сервис закрыл соединение")
+                latencies.append(clock() - start)
+        finally:
+            await client.close()
+
+    sessions = [asyncio.create_task(session(number)) for number in range(connections)]
+    await everyone_connected.wait()
+    start = time.perf_counter()
+    outcomes = await asyncio.gather(*sessions, return_exceptions=True)
+    elapsed = time.perf_counter() - start
+    if len(latencies) < 2:
+        raise ConnectionError("Нагрузочный тест не получил ответов: "
+                              + next((repr(outcome) for outcome in outcomes if outcome is not None), ""))
+    percentiles = statistics.quantiles(latencies, n=100)
+    return {"requests": len(latencies), "rps": len(latencies) / elapsed,
+            "p50_ms": percentiles[49] * 1000, "p99_ms": percentiles[98] * 1000,
+            "failed_connections": sum(isinstance(outcome, BaseException) for outcome in outcomes)}
+
+
+if __name__ == "__main__":
+    import doctest
+
+    doctest.testmod()
@@ -0,0 +1,225 @@
+import mmap
+import os
+import struct
+import sys
+from collections.abc import Sequence
+from typing import Iterator
+
+from main_Library import Book, Library
+
+# Формат снимка (все числа little-endian):
+#   заголовок: сигнатура b"LIBS", версия, количество книг, длина кучи названий в байтах
+#   записи:    count x (id, pages, смещение названия в куче, длина названия в байтах) по 8 байт
+#   индекс id: count x (id, позиция записи), отсортирован по id для бинарного поиска
+#   куча:      названия в UTF-8 подряд
+# При чтении записи разбираются через memoryview.cast в порядке байт машины,
+# поэтому снимки переносимы между little-endian машинами (x86, ARM).
+MAGIC = b"LIBS"
+VERSION = 2
+HEADER = struct.Struct("<4sIqq")
+RECORD = struct.Struct("<qqqq")
+INDEX_ENTRY = struct.Struct("<qq")
+
+if sys.byteorder != "little":
+    raise ImportError("Снимки библиотеки поддерживаются только на little-endian машинах")
+
+
+def save_snapshot(library: Library, path: str) -> None:
+    """
+    Сохраняет библиотеку в бинарный снимок. Снимок пишется во временный файл в том же каталоге
+    и подменяет старый через os.replace, поэтому читатель видит либо старый, либо новый снимок целиком.
+    :param library: Библиотека
+    :param path: Путь к файлу снимка
+    """
+    if not isinstance(library, Library):
+        raise TypeError("Библиотека должна быть типа Library")
+    heap = bytearray()
+    records = bytearray()
+    for book in library.books:
+        name = book.name.encode("utf-8")
+        records += RECORD.pack(book.id, book.pages, len(heap), len(name))
+        heap += name
+    index = sorted((book.id, position) for position, book in enumerate(library.books))
+    temporary = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temporary, "wb") as file:
+            file.write(HEADER.pack(MAGIC, VERSION, len(library.books), len(heap)))
+            file.write(records)
+            for book_id, position in index:
+                file.write(INDEX_ENTRY.pack(book_id, position))
+            file.write(heap)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, path)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+
+
+class _SnapshotBooks(Sequence):
+    """Последовательность книг снимка, книги декодируются при обращении."""
+    def __init__(self, snapshot: "SnapshotLibrary"):
+        self._snapshot = snapshot
+
+    def __len__(self) -> int:
+        return len(self._snapshot)
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self._snapshot._decode(index) for index in range(*position.indices(len(self)))]
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError("Индекс книги вне диапазона")
+        return self._snapshot._decode(position)
+
+    def __iter__(self) -> Iterator[Book]:
+        for position in range(len(self)):
+            yield self._snapshot._decode(position)
+
+
+class SnapshotLibrary:
+    """
+    Библиотека только для чтения поверх отображённого в память снимка.
+    Открытие файла не читает записи: книги декодируются из memoryview при обращении,
+    а поиск по id - бинарный поиск по индексу в файле.
+    """
+    def __init__(self, path: str):
+        """
+        Создание и подготовка к работе объекта "Снимок библиотеки"
+        :param path: Путь к файлу снимка
+        Примеры:
+        >>> import os, tempfile
+        >>> path = os.path.join(tempfile.mkdtemp(), 'library.snap')
+        >>> save_snapshot(Library([Book(7, 'test_name_7', 200), Book(2, 'Мастер и Маргарита', 480)]), path)
+        >>> with SnapshotLibrary(path) as snapshot:
+        ...     print(len(snapshot), snapshot.get_index_by_book_id(2), snapshot.get_book_by_id(2))
+        ...     print(snapshot.to_library().books)
+        2 1 Книга "Мастер и Маргарита"
+        [Book(id_=7, name='test_name_7', pages=200), Book(id_=2, name='Мастер и Маргарита', pages=480)]
+        >>> size = os.path.getsize(path)
+        >>> with open(path, 'r+b') as file:
+        ...     file.truncate(size - 5)
+        160
+        >>> SnapshotLibrary(path)
+        Traceback (most recent call last):
+        ...
+        ValueError: Файл снимка повреждён
+        >>> with open(path, 'r+b') as file:
+        ...     file.truncate(40)
+        40
+        >>> SnapshotLibrary(path)
+        Traceback (most recent call last):
+        ...
+        ValueError: Файл снимка повреждён
+        """
+        self._map = self._view = self._records = self._index = self._heap = None
+        self._file = open(path, "rb")
+        try:
+            self._map_file()
+        except BaseException:
+            self.close()
+            raise
+
+    def _map_file(self) -> None:
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # пустой файл нельзя отобразить в память
+            raise ValueError("Файл снимка повреждён") from None
+        self._view = memoryview(self._map)
+        if len(self._view) < HEADER.size:
+            raise ValueError("Файл снимка повреждён")
+        magic, version, count, heap_size = HEADER.unpack_from(self._view)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Файл не является снимком библиотеки поддерживаемой версии")
+        records_start = HEADER.size
+        index_start = records_start + count * RECORD.size
+        heap_start = index_start + count * INDEX_ENTRY.size
+        # Размер файла должен точно совпадать с заголовком: обрезанные записи дали бы чужие данные
+        # в cast, а обрезанная куча - молча укороченные названия
+        if count < 0 or heap_size < 0 or heap_start + heap_size != len(self._view):
+            raise ValueError("Файл снимка повреждён")
+        self._count = count
+        self._records = self._view[records_start:index_start].cast("q")
+        self._index = self._view[index_start:heap_start].cast("q")
+        self._heap = self._view[heap_start:]
+
+    def __enter__(self) -> "SnapshotLibrary":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Освобождает отображение файла. Книги, полученные раньше, остаются доступными.
+        """
+        for view in (self._records, self._index, self._heap, self._view):
+            if view is not None:
+                view.release()
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def books(self) -> Sequence:
+        """Возвращает последовательность книг снимка в исходном порядке."""
+        return _SnapshotBooks(self)
+
+    def _decode(self, position: int) -> Book:
+        base = position * 4
+        book_id, pages, offset, length = self._records[base:base + 4]
+        name = str(self._heap[offset:offset + length], "utf-8")
+        return Book(book_id=book_id, book_name=name, book_pages=pages)
+
+    def get_next_book_id(self) -> int:
+        """
+        Возвращает id, следующий после наибольшего id снимка (индекс отсортирован по id).
+        :return: Идентификатор
+        """
+        return self._index[2 * (self._count - 1)] + 1 if self._count else 1
+
+    def get_index_by_book_id(self, our_book_id: int) -> int:
+        """
+        Возвращает индекс книги бинарным поиском по индексу id в файле.
+        :param our_book_id: Идентификатор книги
+        :return: Индекс книги
+        """
+        if not isinstance(our_book_id, int):
+            raise TypeError("Id книги должен быть типа int")
+        index = self._index
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if index[2 * middle] < our_book_id:
+                low = middle + 1
+            else:
+                high = middle
+        if low == self._count or index[2 * low] != our_book_id:
+            raise ValueError("Книги с запрашиваемым id не существует")
+        return index[2 * low + 1]
+
+    def get_book_by_id(self, our_book_id: int) -> Book:
+        """
+        Возвращает книгу по её идентификатору.
+        :param our_book_id: Идентификатор книги
+        :return: Книга
+        """
+        return self._decode(self.get_index_by_book_id(our_book_id))
+
+    def to_library(self) -> Library:
+        """
+        Декодирует все книги в обычную изменяемую библиотеку.
+        :return: Библиотека
+        """
+        return Library(list(self.books))
+
+
+if __name__ == "__main__":
+    import doctest
+
+    doctest.testmod()
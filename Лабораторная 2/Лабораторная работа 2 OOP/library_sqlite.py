@@ -0,0 +1,347 @@
+import queue
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Iterable, Iterator
+
+from main_Library import Book
+
+# Таблица metadata хранит наибольший id, когда-либо добавленный в библиотеку (max_id): после удаления
+# книги с наибольшим id он не уменьшается, поэтому get_next_book_id не выдаёт id повторно.
+# Для базы, созданной до появления metadata, max_id заполняется по таблице books
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS books (
+    position INTEGER PRIMARY KEY,
+    id INTEGER NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    pages INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS metadata (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO metadata (key, value) SELECT 'max_id', COALESCE(MAX(id), 0) FROM books;
+"""
+RAISE_MAX_ID = "UPDATE metadata SET value = MAX(value, ?) WHERE key = 'max_id'"
+
+
+class ConnectionPool:
+    """Пул соединений с одной базой SQLite, общий для потоков."""
+    def __init__(self, path: str, size: int = 8):
+        """
+        Создание и подготовка к работе объекта "Пул соединений"
+        :param path: Путь к файлу базы
+        :param size: Максимальное количество соединений
+        Примеры:
+        >>> import os, tempfile
+        >>> pool = ConnectionPool(os.path.join(tempfile.mkdtemp(), 'library.db'))
+        >>> with pool.connection() as connection:
+        ...     pool.close()
+        ...     connection.execute('SELECT 1').fetchone()
+        (1,)
+        >>> with pool.connection() as connection:
+        ...     pass
+        Traceback (most recent call last):
+        ...
+        ValueError: Пул соединений закрыт
+        """
+        if not isinstance(size, int):
+            raise TypeError("Размер пула должен быть типа int")
+        if size <= 0:
+            raise ValueError("Размер пула должен быть положительным числом")
+        self.path = path
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        # Защищает _closed и _idle: возврат соединения в пул не должен разминуться с close
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _connect(self) -> sqlite3.Connection:
+        # isolation_level=None: транзакции открываются явно через BEGIN IMMEDIATE
+        connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """
+        Выдаёт соединение из пула на время блока with, при необходимости создавая новое.
+        Если все соединения заняты, поток ждёт освобождения. Закрытый пул соединений не выдаёт.
+        """
+        self._slots.acquire()
+        try:
+            with self._lock:
+                if self._closed:
+                    raise ValueError("Пул соединений закрыт")
+                try:
+                    connection = self._idle.get_nowait()
+                except queue.Empty:
+                    connection = None
+            if connection is None:
+                connection = self._connect()
+            try:
+                yield connection
+            finally:
+                with self._lock:
+                    if self._closed:
+                        connection.close()
+                    else:
+                        self._idle.put(connection)
+        finally:
+            self._slots.release()
+
+    def close(self) -> None:
+        """
+        Закрывает пул: свободные соединения закрываются сразу, выданные - когда их вернут.
+        """
+        with self._lock:
+            self._closed = True
+            while True:
+                try:
+                    self._idle.get_nowait().close()
+                except queue.Empty:
+                    break
+
+
+class SQLiteLibrary:
+    """
+    Библиотека, хранящая книги в SQLite. Позиции книг повторяют семантику Library:
+    индекс книги - её позиция в таблице, удаление переносит последнюю книгу на место удалённой.
+    Базу можно открывать из нескольких потоков и процессов. Горячие книги кэшируются в памяти
+    процесса; кэш видит только записи, сделанные через этот объект.
+    """
+    def __init__(self, path: str, pool_size: int = 8, cache_size: int = 10_000):
+        """
+        Создание и подготовка к работе объекта "Библиотека в SQLite"
+        :param path: Путь к файлу базы
+        :param pool_size: Размер пула соединений
+        :param cache_size: Сколько книг держать в кэше чтения
+        Примеры:
+        >>> import os, tempfile
+        >>> library = SQLiteLibrary(os.path.join(tempfile.mkdtemp(), 'library.db'))
+        >>> library.add_books([Book(1, 'test_name_1', 200), Book(2, 'test_name_2', 400)])
+        >>> library.get_next_book_id(), library.get_index_by_book_id(2)
+        (3, 1)
+        >>> library.remove_book(1)
+        Book(id_=1, name='test_name_1', pages=200)
+        >>> library.get_index_by_book_id(2), library.get_book_by_id(2)
+        (0, Book(id_=2, name='test_name_2', pages=400))
+        >>> library.close()
+        """
+        if not isinstance(cache_size, int):
+            raise TypeError("Размер кэша должен быть типа int")
+        if cache_size < 0:
+            raise ValueError("Размер кэша не может быть отрицательным")
+        self.pool = ConnectionPool(path, pool_size)
+        self._cache = OrderedDict()
+        self._cache_size = cache_size
+        self._cache_lock = threading.Lock()
+        # Растёт при каждом сбросе записи кэша: чтение из базы, во время которого была запись,
+        # не кладёт в кэш прочитанную (возможно, уже устаревшую) книгу
+        self._cache_epoch = 0
+        with self.pool.connection() as connection:
+            connection.executescript(SCHEMA)
+
+    def close(self) -> None:
+        """
+        Закрывает соединения с базой.
+        """
+        self.pool.close()
+
+    def _cache_get(self, book_id: int):
+        with self._cache_lock:
+            book = self._cache.get(book_id)
+            if book is not None:
+                self._cache.move_to_end(book_id)
+            return book
+
+    def _cache_put(self, book: Book, epoch: int) -> None:
+        if not self._cache_size:
+            return
+        with self._cache_lock:
+            if epoch != self._cache_epoch:
+                return
+            self._cache[book.id] = book
+            self._cache.move_to_end(book.id)
+            if len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+
+    def _cache_drop(self, book_id: int) -> None:
+        with self._cache_lock:
+            self._cache.pop(book_id, None)
+            self._cache_epoch += 1
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        # BEGIN IMMEDIATE сразу берёт блокировку записи, чтобы подсчёт позиций не гонялся с другими писателями
+        with self.pool.connection() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield connection
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+
+    def __len__(self) -> int:
+        with self.pool.connection() as connection:
+            return connection.execute("SELECT COUNT(*) FROM books").fetchone()[0]
+
+    @property
+    def books(self) -> list:
+        """Возвращает все книги в порядке позиций."""
+        with self.pool.connection() as connection:
+            rows = connection.execute("SELECT id, name, pages FROM books ORDER BY position").fetchall()
+        return [Book(book_id=book_id, book_name=name, book_pages=pages) for book_id, name, pages in rows]
+
+    def get_next_book_id(self) -> int:
+        """
+        Возвращает id, следующий после наибольшего id, когда-либо добавленного в библиотеку,
+        как Library.get_next_book_id без распределителя: после удалений id не повторяются.
+        :return: Идентификатор
+        Примеры:
+        >>> import os, tempfile
+        >>> library = SQLiteLibrary(os.path.join(tempfile.mkdtemp(), 'library.db'))
+        >>> library.add_books([Book(1, 'test_name_1', 200), Book(2, 'test_name_2', 400)])
+        >>> library.remove_book(2)
+        Book(id_=2, name='test_name_2', pages=400)
+        >>> library.get_next_book_id()
+        3
+        >>> library.close()
+        >>> len(library)
+        Traceback (most recent call last):
+        ...
+        ValueError: Пул соединений закрыт
+        """
+        with self.pool.connection() as connection:
+            return connection.execute("SELECT value + 1 FROM metadata WHERE key = 'max_id'").fetchone()[0]
+
+    def get_index_by_book_id(self, our_book_id: int) -> int:
+        """
+        Возвращает индекс (позицию) книги по её идентификатору.
+        :param our_book_id: Идентификатор книги
+        :return: Индекс книги
+        """
+        if not isinstance(our_book_id, int):
+            raise TypeError("Id книги должен быть типа int")
+        with self.pool.connection() as connection:
+            row = connection.execute("SELECT position FROM books WHERE id = ?", (our_book_id,)).fetchone()
+        if row is None:
+            raise ValueError("Книги с запрашиваемым id не существует")
+        return row[0]
+
+    def get_book_by_id(self, our_book_id: int) -> Book:
+        """
+        Возвращает книгу по идентификатору, сначала из кэша, затем из базы.
+        :param our_book_id: Идентификатор книги
+        :return: Книга
+        """
+        if not isinstance(our_book_id, int):
+            raise TypeError("Id книги должен быть типа int")
+        book = self._cache_get(our_book_id)
+        if book is not None:
+            return book
+        epoch = self._cache_epoch
+        with self.pool.connection() as connection:
+            row = connection.execute("SELECT name, pages FROM books WHERE id = ?", (our_book_id,)).fetchone()
+        if row is None:
+            raise ValueError("Книги с запрашиваемым id не существует")
+        book = Book(book_id=our_book_id, book_name=row[0], book_pages=row[1])
+        self._cache_put(book, epoch)
+        return book
+
+    def add_book(self, book: Book) -> int:
+        """
+        Добавляет книгу в конец библиотеки.
+        :param book: Книга
+        :return: Индекс добавленной книги
+        """
+        if not isinstance(book, Book):
+            raise TypeError("Книга должна быть типа Book")
+        with self._transaction() as connection:
+            position = connection.execute("SELECT COUNT(*) FROM books").fetchone()[0]
+            try:
+                connection.execute("INSERT INTO books (position, id, name, pages) VALUES (?, ?, ?, ?)",
+                                   (position, book.id, book.name, book.pages))
+            except sqlite3.IntegrityError:
+                raise ValueError(f"Книга с id {book.id} уже есть в библиотеке") from None
+            connection.execute(RAISE_MAX_ID, (book.id,))
+        return position
+
+    def add_books(self, books: Iterable[Book]) -> None:
+        """
+        Добавляет пакет книг одной транзакцией через executemany.
+        Если хотя бы одна книга некорректна или её id занят, не добавляется ни одна.
+        :param books: Книги
+        """
+        books = list(books)
+        for book in books:
+            if not isinstance(book, Book):
+                raise TypeError("Книга должна быть типа Book")
+        with self._transaction() as connection:
+            start = connection.execute("SELECT COUNT(*) FROM books").fetchone()[0]
+            try:
+                connection.executemany("INSERT INTO books (position, id, name, pages) VALUES (?, ?, ?, ?)",
+                                       ((start + offset, book.id, book.name, book.pages)
+                                        for offset, book in enumerate(books)))
+            except sqlite3.IntegrityError:
+                raise ValueError("В пакете есть книга с id, который уже есть в библиотеке") from None
+            if books:
+                connection.execute(RAISE_MAX_ID, (max(book.id for book in books),))
+
+    def remove_book(self, our_book_id: int) -> Book:
+        """
+        Удаляет книгу, перенося на её место последнюю, как Library.remove_book.
+        :param our_book_id: Идентификатор книги
+        :return: Удалённая книга
+        """
+        if not isinstance(our_book_id, int):
+            raise TypeError("Id книги должен быть типа int")
+        with self._transaction() as connection:
+            row = connection.execute("SELECT position, name, pages FROM books WHERE id = ?",
+                                     (our_book_id,)).fetchone()
+            if row is None:
+                raise ValueError("Книги с запрашиваемым id не существует")
+            position, name, pages = row
+            last = connection.execute("SELECT MAX(position) FROM books").fetchone()[0]
+            connection.execute("DELETE FROM books WHERE id = ?", (our_book_id,))
+            if position != last:
+                connection.execute("UPDATE books SET position = ? WHERE position = ?", (position, last))
+        self._cache_drop(our_book_id)
+        return Book(book_id=our_book_id, book_name=name, book_pages=pages)
+
+    def update_book(self, book: Book) -> Book:
+        """
+        Заменяет название и количество страниц книги с тем же id.
+        :param book: Новая версия книги
+        :return: Прежняя версия книги
+        Примеры:
+        >>> import os, tempfile
+        >>> library = SQLiteLibrary(os.path.join(tempfile.mkdtemp(), 'library.db'))
+        >>> library.add_book(Book(1, 'test_name_1', 200))
+        0
+        >>> library.get_book_by_id(1)
+        Book(id_=1, name='test_name_1', pages=200)
+        >>> library.update_book(Book(1, 'test_name_1', 250))
+        Book(id_=1, name='test_name_1', pages=200)
+        >>> library.get_book_by_id(1)
+        Book(id_=1, name='test_name_1', pages=250)
+        >>> library.close()
+        """
+        if not isinstance(book, Book):
+            raise TypeError("Книга должна быть типа Book")
+        with self._transaction() as connection:
+            row = connection.execute("SELECT name, pages FROM books WHERE id = ?", (book.id,)).fetchone()
+            if row is None:
+                raise ValueError("Книги с запрашиваемым id не существует")
+            connection.execute("UPDATE books SET name = ?, pages = ? WHERE id = ?", (book.name, book.pages, book.id))
+        self._cache_drop(book.id)
+        return Book(book_id=book.id, book_name=row[0], book_pages=row[1])
+
+
+if __name__ == "__main__":
+    import doctest
+
+    doctest.testmod()
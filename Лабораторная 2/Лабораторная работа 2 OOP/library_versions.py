@@ -0,0 +1,419 @@
+import threading
+import weakref
+from typing import Iterator, List, Tuple
+
+from main_Book import Book
+
+# Узел HAMT разбирает хэш по BITS бит за уровень, поэтому у узла до 2 ** BITS потомков
+BITS = 5
+MASK = (1 << BITS) - 1
+HASH_MASK = (1 << 64) - 1
+_MISSING = object()
+
+
+def _hash(key) -> int:
+    return hash(key) & HASH_MASK
+
+
+try:
+    _popcount = int.bit_count
+except AttributeError:  # int.bit_count появился в Python 3.10
+    def _popcount(value: int) -> int:
+        return bin(value).count("1")
+
+
+class _Node:
+    """
+    Узел HAMT: bitmap отмечает занятые позиции, entries хранит их по порядку. Элемент - лист
+    (ключ, значение), вложенный узел или узел коллизий. Узлы не меняются после создания.
+    """
+    __slots__ = ("bitmap", "entries")
+
+    def __init__(self, bitmap: int, entries: tuple):
+        self.bitmap = bitmap
+        self.entries = entries
+
+
+class _Collision:
+    """Листья с одинаковым полным хэшем."""
+    __slots__ = ("hash", "entries")
+
+    def __init__(self, key_hash: int, entries: tuple):
+        self.hash = key_hash
+        self.entries = entries
+
+
+_EMPTY = _Node(0, ())
+
+
+def _entry_hash(entry) -> int:
+    return entry.hash if type(entry) is _Collision else _hash(entry[0])
+
+
+def _pair(shift: int, first_hash: int, first, second_hash: int, second):
+    """Поддерево из двух элементов с разными ключами, начиная с уровня shift."""
+    if first_hash == second_hash:
+        return _Collision(first_hash, (first, second))
+    first_slot = (first_hash >> shift) & MASK
+    second_slot = (second_hash >> shift) & MASK
+    if first_slot == second_slot:
+        return _Node(1 << first_slot, (_pair(shift + BITS, first_hash, first, second_hash, second),))
+    entries = (first, second) if first_slot < second_slot else (second, first)
+    return _Node((1 << first_slot) | (1 << second_slot), entries)
+
+
+def _get(node: _Node, key_hash: int, key, default):
+    shift = 0
+    while True:
+        bit = 1 << ((key_hash >> shift) & MASK)
+        if not node.bitmap & bit:
+            return default
+        entry = node.entries[_popcount(node.bitmap & (bit - 1))]
+        kind = type(entry)
+        if kind is tuple:
+            return entry[1] if entry[0] == key else default
+        if kind is _Collision:
+            for leaf in entry.entries:
+                if leaf[0] == key:
+                    return leaf[1]
+            return default
+        node = entry
+        shift += BITS
+
+
+def _set(node: _Node, shift: int, key_hash: int, leaf: tuple) -> Tuple[_Node, bool]:
+    """Возвращает копию пути с новым листом и признак того, что ключ добавлен, а не заменён."""
+    bit = 1 << ((key_hash >> shift) & MASK)
+    position = _popcount(node.bitmap & (bit - 1))
+    entries = node.entries
+    if not node.bitmap & bit:
+        return _Node(node.bitmap | bit, entries[:position] + (leaf,) + entries[position:]), True
+    entry = entries[position]
+    kind = type(entry)
+    added = False
+    if kind is tuple:
+        if entry[0] == leaf[0]:
+            child = leaf
+        else:
+            child = _pair(shift + BITS, _hash(entry[0]), entry, key_hash, leaf)
+            added = True
+    elif kind is _Collision:
+        if entry.hash != key_hash:
+            child = _pair(shift + BITS, entry.hash, entry, key_hash, leaf)
+            added = True
+        else:
+            kept = tuple(other for other in entry.entries if other[0] != leaf[0])
+            added = len(kept) == len(entry.entries)
+            child = _Collision(key_hash, kept + (leaf,))
+    else:
+        child, added = _set(entry, shift + BITS, key_hash, leaf)
+    return _Node(node.bitmap, entries[:position] + (child,) + entries[position + 1:]), added
+
+
+def _delete(node: _Node, shift: int, key_hash: int, key):
+    """
+    Возвращает поддерево без ключа: узел, единственный оставшийся лист (его поднимает родитель)
+    или None, если поддерево опустело. Если ключа нет, возвращается тот же узел.
+    """
+    bit = 1 << ((key_hash >> shift) & MASK)
+    if not node.bitmap & bit:
+        return node
+    position = _popcount(node.bitmap & (bit - 1))
+    entries = node.entries
+    entry = entries[position]
+    kind = type(entry)
+    if kind is tuple:
+        if entry[0] != key:
+            return node
+        child = None
+    elif kind is _Collision:
+        kept = tuple(leaf for leaf in entry.entries if leaf[0] != key)
+        if len(kept) == len(entry.entries):
+            return node
+        child = kept[0] if len(kept) == 1 else _Collision(entry.hash, kept)
+    else:
+        child = _delete(entry, shift + BITS, key_hash, key)
+        if child is entry:
+            return node
+    if child is None:
+        if len(entries) == 1:
+            return None
+        if len(entries) == 2 and type(entries[1 - position]) is not _Node:
+            return entries[1 - position]
+        return _Node(node.bitmap & ~bit, entries[:position] + entries[position + 1:])
+    if len(entries) == 1 and type(child) is not _Node:
+        return child
+    return _Node(node.bitmap, entries[:position] + (child,) + entries[position + 1:])
+
+
+def _build(leaves: List[Tuple[int, tuple]], shift: int):
+    """Строит поддерево сразу из многих листей (хэш, лист) без промежуточных копий."""
+    if len(leaves) == 1:
+        return leaves[0][1]
+    if shift >= 64:
+        return _Collision(leaves[0][0], tuple(leaf for _, leaf in leaves))
+    slots = {}
+    for item in leaves:
+        slots.setdefault((item[0] >> shift) & MASK, []).append(item)
+    bitmap = 0
+    for slot in slots:
+        bitmap |= 1 << slot
+    return _Node(bitmap, tuple(_build(slots[slot], shift + BITS) for slot in sorted(slots)))
+
+
+def _walk(node) -> Iterator[tuple]:
+    for entry in node.entries:
+        if type(entry) is tuple:
+            yield entry
+        else:
+            yield from _walk(entry)
+
+
+class PersistentMap:
+    """
+    Неизменяемый словарь на HAMT (hash array mapped trie). set и delete возвращают новый
+    словарь за O(log32 n): копируется только путь от корня до листа, остальные узлы
+    общие со старой версией, поэтому старая версия остаётся целой и доступной.
+    """
+    __slots__ = ("_root", "_count")
+
+    def __init__(self, items=()):
+        """
+        Создание и подготовка к работе объекта "Неизменяемый словарь"
+        :param items: Пары (ключ, значение); при повторах ключа остаётся последнее значение
+        Примеры:
+        >>> first = PersistentMap([(1, 'a'), (2, 'b')])
+        >>> second = first.set(3, 'c').delete(1)
+        >>> len(first), first.get(1), 3 in first
+        (2, 'a', False)
+        >>> len(second), second.get(1), sorted(second.items())
+        (2, None, [(2, 'b'), (3, 'c')])
+        >>> colliding = PersistentMap([(-1, 'x'), (-2, 'y')])  # hash(-1) == hash(-2)
+        >>> colliding.get(-1), colliding.delete(-2).get(-1), len(colliding.delete(-2))
+        ('x', 'x', 1)
+        """
+        latest = {}
+        for key, value in items:
+            latest[key] = value
+        self._root = _build([(_hash(key), (key, value)) for key, value in latest.items()], 0) if latest else _EMPTY
+        if type(self._root) is not _Node:
+            self._root = _Node(1 << (_entry_hash(self._root) & MASK), (self._root,))
+        self._count = len(latest)
+
+    @classmethod
+    def _make(cls, root, count: int) -> "PersistentMap":
+        if root is None:
+            root = _EMPTY
+        elif type(root) is not _Node:
+            root = _Node(1 << (_entry_hash(root) & MASK), (root,))
+        result = cls.__new__(cls)
+        result._root = root
+        result._count = count
+        return result
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, key) -> bool:
+        return _get(self._root, _hash(key), key, _MISSING) is not _MISSING
+
+    def __iter__(self) -> Iterator:
+        return (key for key, _ in _walk(self._root))
+
+    def get(self, key, default=None):
+        return _get(self._root, _hash(key), key, default)
+
+    def items(self) -> Iterator[tuple]:
+        return _walk(self._root)
+
+    def values(self) -> Iterator:
+        return (value for _, value in _walk(self._root))
+
+    def set(self, key, value) -> "PersistentMap":
+        """
+        Возвращает новый словарь, в котором key соответствует value.
+        :param key: Ключ
+        :param value: Значение
+        :return: Новый словарь
+        """
+        root, added = _set(self._root, 0, _hash(key), (key, value))
+        return self._make(root, self._count + added)
+
+    def delete(self, key) -> "PersistentMap":
+        """
+        Возвращает новый словарь без key.
+        :param key: Ключ
+        :return: Новый словарь
+        """
+        root = _delete(self._root, 0, _hash(key), key)
+        if root is self._root:
+            raise KeyError(key)
+        return self._make(root, self._count - 1)
+
+
+class LibraryVersion:
+    """
+    Неизменяемая версия библиотеки. Читатель держит версию и читает её без блокировок:
+    писатели создают новые версии и эту не меняют. Версия освобождается, как только
+    на неё не остаётся ссылок (подсчётом ссылок), вместе с узлами, которых нет в новых версиях.
+    """
+    __slots__ = ("number", "_books", "__weakref__")
+
+    def __init__(self, number: int, books: PersistentMap):
+        self.number = number
+        self._books = books
+
+    def __len__(self) -> int:
+        return len(self._books)
+
+    def __iter__(self) -> Iterator[Book]:
+        return self._books.values()
+
+    @property
+    def books(self) -> List[Book]:
+        return list(self._books.values())
+
+    def get_book_by_id(self, our_book_id: int) -> Book:
+        """
+        Возвращает книгу этой версии по её идентификатору.
+        :param our_book_id: Идентификатор книги
+        :return: Книга
+        """
+        if not isinstance(our_book_id, int):
+            raise TypeError("Id книги должен быть типа int")
+        book = self._books.get(our_book_id)
+        if book is None:
+            raise ValueError("Книги с запрашиваемым id не существует")
+        return book
+
+
+class VersionedLibrary:
+    """
+    Библиотека с версиями (MVCC). Каждое изменение публикует новую версию, построенную
+    из предыдущей со структурным разделением через PersistentMap по id книги. Писатели
+    упорядочены блокировкой, читатели берут snapshot() и читают его без блокировок:
+    список книг снимка не меняется, даже если писатель в это время добавляет и удаляет книги.
+    Порядок книг в снимке - порядок HAMT, а не порядок добавления.
+    """
+    def __init__(self, list_of_books: list = None):
+        """
+        Создание и подготовка к работе объекта "Библиотека с версиями"
+        :param list_of_books: Список книг
+        Примеры:
+        >>> library = VersionedLibrary([Book(1, 'test_name_1', 200), Book(2, 'test_name_2', 400)])
+        >>> before = library.snapshot()
+        >>> library.add_book(Book(3, 'test_name_3', 100)).number
+        1
+        >>> library.remove_book(1)
+        Book(id_=1, name='test_name_1', pages=200)
+        >>> len(before), len(library.snapshot()), before.get_book_by_id(1).name
+        (2, 2, 'test_name_1')
+        >>> library.live_versions()
+        [0, 2]
+        >>> del before
+        >>> library.live_versions()
+        [2]
+        >>> library.get_next_book_id()
+        4
+        """
+        if list_of_books is None:
+            list_of_books = []
+        if not isinstance(list_of_books, list):
+            raise TypeError("Список книг должен быть типа list")
+        for book in list_of_books:
+            if not isinstance(book, Book):
+                raise TypeError("Книга должна быть типа Book")
+        books = PersistentMap((book.id, book) for book in list_of_books)
+        if len(books) != len(list_of_books):
+            raise ValueError("В списке книг повторяются id")
+        self._write_lock = threading.Lock()
+        # Номер версии -> версия, пока на неё есть ссылки: по этому словарю видно, какие версии ещё живы
+        self._versions = weakref.WeakValueDictionary()
+        self._max_id = max(books, default=0)
+        self._publish(LibraryVersion(0, books))
+
+    def _publish(self, version: LibraryVersion) -> LibraryVersion:
+        self._versions[version.number] = version
+        # Присваивание атрибута атомарно: читатель видит либо старую, либо новую версию целиком
+        self._current = version
+        return version
+
+    def snapshot(self) -> LibraryVersion:
+        """
+        Возвращает текущую версию библиотеки для чтения без блокировок.
+        :return: Версия
+        """
+        return self._current
+
+    @property
+    def books(self) -> List[Book]:
+        return self._current.books
+
+    def live_versions(self) -> List[int]:
+        """
+        Возвращает номера версий, которые ещё не освобождены: текущей и тех, что держат читатели.
+        :return: Номера версий по возрастанию
+        """
+        return sorted(self._versions.keys())
+
+    def get_next_book_id(self) -> int:
+        """
+        Возвращает id для новой книги: следующий после наибольшего id, когда-либо бывшего в библиотеке.
+        :return: Идентификатор
+        """
+        return self._max_id + 1
+
+    def get_book_by_id(self, our_book_id: int) -> Book:
+        """
+        Возвращает книгу текущей версии по её идентификатору.
+        :param our_book_id: Идентификатор книги
+        :return: Книга
+        """
+        return self._current.get_book_by_id(our_book_id)
+
+    def add_book(self, book: Book) -> LibraryVersion:
+        """
+        Добавляет книгу за O(log32 n) и публикует новую версию.
+        :param book: Книга
+        :return: Новая версия
+        """
+        if not isinstance(book, Book):
+            raise TypeError("Книга должна быть типа Book")
+        with self._write_lock:
+            current = self._current
+            if book.id in current._books:
+                raise ValueError(f"Книга с id {book.id} уже есть в библиотеке")
+            self._max_id = max(self._max_id, book.id)
+            return self._publish(LibraryVersion(current.number + 1, current._books.set(book.id, book)))
+
+    def remove_book(self, our_book_id: int) -> Book:
+        """
+        Удаляет книгу за O(log32 n) и публикует новую версию.
+        :param our_book_id: Идентификатор книги
+        :return: Удалённая книга
+        """
+        with self._write_lock:
+            current = self._current
+            removed = current.get_book_by_id(our_book_id)
+            self._publish(LibraryVersion(current.number + 1, current._books.delete(our_book_id)))
+            return removed
+
+    def update_book(self, book: Book) -> Book:
+        """
+        Заменяет книгу с тем же id на переданную и публикует новую версию.
+        :param book: Новая версия книги
+        :return: Прежняя версия книги
+        """
+        if not isinstance(book, Book):
+            raise TypeError("Книга должна быть типа Book")
+        with self._write_lock:
+            current = self._current
+            previous = current.get_book_by_id(book.id)
+            self._publish(LibraryVersion(current.number + 1, current._books.set(book.id, book)))
+            return previous
+
+
+if __name__ == "__main__":
+    import doctest
+
+    doctest.testmod()
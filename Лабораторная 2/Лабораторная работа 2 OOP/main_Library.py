@@ -1,64 +1,201 @@
-BOOKS_DATABASE = [
-    {
-        "id": 1,
-        "name": "test_name_1",
-        "pages": 200,
-    },
-    {
-        "id": 2,
-        "name": "test_name_2",
-        "pages": 400,
-    }
-]
-
-
-class Book:
-    def __init__(self, book_id: int = None, book_name: str = None, book_pages: int = None):
-        """
-        Создание и подготовка к работе объекта "Книга"
-        :param book_id: Идентификатор книги
-        :param book_name: Название книги
-        :param book_pages: Количество страниц в книге
-        """
-        if not isinstance(book_id, int):
-            raise TypeError("Идентификатор книги должен быть типа int")
-        self.id = book_id
-        if not isinstance(book_name, str):
-            raise TypeError("Название книги должно быть типа str")
-        self.name = book_name
-        if not isinstance(book_pages, int):
-            raise TypeError("Количество страниц должно быть типа int")
-        self.pages = book_pages
-
-    def __str__(self) -> str:
-        return f'Книга "{self.name}"'
-
-    def __repr__(self) -> str:
-        return f'Book(id_={self.id!r}, name={self.name!r}, pages={self.pages!r})'
+from id_allocator import IdAllocator
+from library_search import TrigramIndex
+from main_Book import BOOKS_DATABASE, Book
 
 
 class Library:
-    def __init__(self, list_of_books: list = []):
+    def __init__(self, list_of_books: list = None, allocator: IdAllocator = None):
         """
         Создание и подготовка к работе объекта "Библиотека"
         :param list_of_books: Список книг
+        :param allocator: Распределитель id для get_next_book_id, общий для потоков и процессов
         """
+        if list_of_books is None:
+            list_of_books = []
         if not isinstance(list_of_books, list):
             raise TypeError("Список книг должен быть типа list")
         self.books = list_of_books
+        # Индекс id -> позиция книги в self.books, поддерживается методами add/remove/update
+        self._positions = {}
+        for position, book in enumerate(self.books):
+            if book.id in self._positions:
+                raise ValueError(f"Книга с id {book.id} уже есть в библиотеке")
+            self._positions[book.id] = position
+        # Необязательные вторичные индексы (см. library_indexes.py), ключ - вид индекса
+        self._indexes = {}
+        # Наибольший id, когда-либо бывший в библиотеке: после удаления книги её id не выдаётся снова
+        self._max_id = max(self._positions, default=0)
+        if allocator is not None and not isinstance(allocator, IdAllocator):
+            raise TypeError("Распределитель id должен быть типа IdAllocator")
+        self.allocator = allocator
+        if allocator is not None:
+            allocator.advance_to(self._max_id + 1)
 
     def get_next_book_id(self) -> int:
-        if self.books == ():
-            return 1
-        else:
-            return len(self.books) + 1
+        """
+        Возвращает id для новой книги. С распределителем каждый вызов выдаёт новый id, который не
+        получит ни другой поток, ни другой процесс; без него - следующий после наибольшего
+        id библиотеки, поэтому id не повторяются после удалений, но не защищены от гонок.
+        :return: Идентификатор
+        """
+        if self.allocator is not None:
+            return self.allocator.allocate()
+        return self._max_id + 1
 
     def get_index_by_book_id(self, our_book_id: int) -> int:
+        """
+        Возвращает индекс книги в списке self.books за O(1) по индексу id -> позиция.
+        :param our_book_id: Идентификатор книги
+        :return: Индекс книги в списке
+        """
         if not isinstance(our_book_id, int):
             raise TypeError("Id книги должен быть типа int")
-        if self.books[our_book_id - 1] is None:
-            raise ValueError("Книги с запрашиваемым id не существует")
-        return our_book_id - 1
+        try:
+            return self._positions[our_book_id]
+        except KeyError:
+            raise ValueError("Книги с запрашиваемым id не существует") from None
+
+    def get_book_by_id(self, our_book_id: int) -> Book:
+        """
+        Возвращает книгу по её идентификатору.
+        :param our_book_id: Идентификатор книги
+        :return: Книга
+        """
+        return self.books[self.get_index_by_book_id(our_book_id)]
+
+    def get_books_by_ids(self, ids: list) -> list:
+        """
+        Возвращает книги для списка идентификаторов за один вызов по индексу id -> позиция.
+        :param ids: Идентификаторы книг
+        :return: Список книг в порядке ids; на месте отсутствующего id - None
+        Примеры:
+        >>> library = Library([Book(1, 'test_name_1', 200), Book(2, 'test_name_2', 400)])
+        >>> library.get_books_by_ids([2, 3])
+        [Book(id_=2, name='test_name_2', pages=400), None]
+        """
+        positions = self._positions
+        books = self.books
+        found = []
+        for book_id in ids:
+            position = positions.get(book_id)
+            found.append(None if position is None else books[position])
+        return found
+
+    def add_book(self, book: Book) -> int:
+        """
+        Добавляет книгу в конец списка за O(1) амортизированно.
+        :param book: Книга
+        :return: Индекс добавленной книги в списке
+        """
+        if not isinstance(book, Book):
+            raise TypeError("Книга должна быть типа Book")
+        if book.id in self._positions:
+            raise ValueError(f"Книга с id {book.id} уже есть в библиотеке")
+        position = len(self.books)
+        self.books.append(book)
+        self._positions[book.id] = position
+        if book.id > self._max_id:
+            self._max_id = book.id
+        if self.allocator is not None:
+            self.allocator.mark_used(book.id)
+        for index in self._indexes.values():
+            index.insert(book)
+        return position
+
+    def remove_book(self, our_book_id: int) -> Book:
+        """
+        Удаляет книгу за O(1): на её место переносится последняя книга списка,
+        поэтому порядок книг после удаления не сохраняется.
+        :param our_book_id: Идентификатор книги
+        :return: Удалённая книга
+        """
+        position = self.get_index_by_book_id(our_book_id)
+        removed = self.books[position]
+        last = self.books.pop()
+        del self._positions[our_book_id]
+        if last is not removed:
+            self.books[position] = last
+            self._positions[last.id] = position
+        for index in self._indexes.values():
+            index.delete(removed)
+        return removed
+
+    def update_book(self, book: Book) -> Book:
+        """
+        Заменяет книгу с тем же id на переданную, не меняя её позицию.
+        :param book: Новая версия книги
+        :return: Прежняя версия книги
+        """
+        if not isinstance(book, Book):
+            raise TypeError("Книга должна быть типа Book")
+        position = self.get_index_by_book_id(book.id)
+        previous = self.books[position]
+        self.books[position] = book
+        for index in self._indexes.values():
+            index.delete(previous)
+            index.insert(book)
+        return previous
+
+    def add_index(self, index) -> None:
+        """
+        Подключает вторичный индекс: строит его по текущим книгам и далее
+        поддерживает при каждом добавлении, удалении и замене книги.
+        :param index: Индекс с атрибутом kind и методами build, insert, delete
+        """
+        index.build(self.books)
+        self._indexes[index.kind] = index
+
+    def find_by_name_prefix(self, prefix: str) -> list:
+        """
+        Возвращает книги, название которых начинается с prefix.
+        С индексом NamePrefixIndex запрос стоит O(log n + k), без него - полный просмотр.
+        :param prefix: Начало названия
+        :return: Список книг
+        """
+        index = self._indexes.get("name_prefix")
+        if index is None:
+            if not isinstance(prefix, str):
+                raise TypeError("Префикс названия должен быть типа str")
+            return [book for book in self.books if book.name.startswith(prefix)]
+        return [self.books[self._positions[book_id]] for book_id in index.starts_with(prefix)]
+
+    def find_by_pages_range(self, low: int, high: int) -> list:
+        """
+        Возвращает книги, у которых от low до high страниц включительно.
+        С индексом PagesRangeIndex запрос стоит O(log n + k), без него - полный просмотр.
+        :param low: Нижняя граница
+        :param high: Верхняя граница
+        :return: Список книг
+        """
+        index = self._indexes.get("pages_range")
+        if index is None:
+            if not isinstance(low, int) or not isinstance(high, int):
+                raise TypeError("Границы диапазона должны быть типа int")
+            return [book for book in self.books if low <= book.pages <= high]
+        return [self.books[self._positions[book_id]] for book_id in index.between(low, high)]
+
+    def find_similar_names(self, query: str, k: int = 10) -> list:
+        """
+        Возвращает до k книг с названиями, наиболее похожими на запрос (по триграммам), по убыванию сходства.
+        Поиск идёт по индексу TrigramIndex; если индекс не подключён, первый вызов подключает его,
+        и дальше библиотека поддерживает его при изменениях, как любой вторичный индекс.
+        :param query: Название или его часть, возможно с опечатками
+        :param k: Количество результатов
+        :return: Список книг
+        Примеры:
+        >>> library = Library([Book(1, 'Мастер и Маргарита', 480), Book(2, 'Война и мир', 1300)])
+        >>> library.find_similar_names('мастер и маргорита')
+        [Book(id_=1, name='Мастер и Маргарита', pages=480)]
+        >>> library.add_book(Book(3, 'Мастер и Маргарита. Черновики', 200))
+        2
+        >>> [book.id for book in library.find_similar_names('мастер и маргорита')]
+        [1, 3]
+        """
+        index = self._indexes.get("name_trigram")
+        if index is None:
+            index = TrigramIndex()
+            self.add_index(index)
+        return [self.books[self._positions[book_id]] for book_id, _ in index.search(query, k)]
 
 
 if __name__ == '__main__':
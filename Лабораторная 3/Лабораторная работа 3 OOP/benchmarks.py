@@ -0,0 +1,81 @@
+import sys
+import time
+
+from main import AudioBook, PaperBook
+
+
+class PropertyBook:
+    """Книга на свойствах @property, как до перехода на TypedField. Нужна только для сравнения."""
+    def __init__(self, name: str, author: str):
+        self.name = name
+        self.author = author
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @name.setter
+    def name(self, new_name: str) -> None:
+        if not isinstance(new_name, str):
+            raise TypeError("Название книги должно быть типа str")
+        self._name = new_name
+
+    @property
+    def author(self) -> str:
+        return self._author
+
+    @author.setter
+    def author(self, new_author: str) -> None:
+        if not isinstance(new_author, str):
+            raise TypeError("Имя автора книги должно быть типа str")
+        self._author = new_author
+
+
+class PropertyPaperBook(PropertyBook):
+    """Бумажная книга на свойствах @property, как до перехода на TypedField."""
+    def __init__(self, name: str, author: str, pages: int):
+        super().__init__(name, author)
+        self.pages = pages
+
+    @property
+    def pages(self) -> int:
+        return self._pages
+
+    @pages.setter
+    def pages(self, new_pages: int) -> None:
+        if not isinstance(new_pages, int):
+            raise TypeError("Количество страниц в книге должно быть типа int.")
+        if new_pages <= 0:
+            raise ValueError("Количество страниц в книге должно быть строго положительным числом.")
+        self._pages = new_pages
+
+
+def bench_construction(size: int) -> None:
+    """
+    Сравнивает скорость создания книг через свойства, через TypedField и через from_columns.
+    :param size: Количество книг
+    """
+    names = [f"Книга {number}" for number in range(size)]
+    authors = [f"Автор {number % 1000}" for number in range(size)]
+    pages = [100 + number % 900 for number in range(size)]
+    durations = [60.0 + number % 600 for number in range(size)]
+
+    variants = (
+        ("PaperBook на @property", lambda: [PropertyPaperBook(*row) for row in zip(names, authors, pages)]),
+        ("PaperBook на TypedField", lambda: [PaperBook(*row) for row in zip(names, authors, pages)]),
+        ("PaperBook.from_columns", lambda: PaperBook.from_columns(name=names, author=authors, pages=pages)),
+        ("AudioBook на TypedField", lambda: [AudioBook(*row) for row in zip(names, authors, durations)]),
+        ("AudioBook.from_columns", lambda: AudioBook.from_columns(name=names, author=authors, duration=durations)),
+    )
+    print(f"Создание {size} книг")
+    for title, build in variants:
+        start = time.perf_counter()
+        build()
+        elapsed = time.perf_counter() - start
+        print(f"  {title:>24}: {size / elapsed:12.0f} книг/с")
+
+
+if __name__ == "__main__":
+    # Количество книг можно передать аргументом: python benchmarks.py 1000000
+    book_count = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    bench_construction(book_count)
@@ -0,0 +1,210 @@
+import math
+from bisect import bisect_left, insort
+from typing import Dict, Iterator, NamedTuple, Optional, Tuple, Union
+
+from main import AudioBook, Book, PaperBook
+
+# Формат книги -> атрибут, по которому считаются агрегаты
+FORMAT_FIELDS = {PaperBook: "pages", AudioBook: "duration"}
+
+
+class AggregateStats(NamedTuple):
+    """Агрегаты группы книг."""
+    count: int
+    total: Union[int, float]
+    minimum: Optional[Union[int, float]]
+    maximum: Optional[Union[int, float]]
+
+
+def _add_exact(partials: list, value: float) -> None:
+    """
+    Прибавляет value к сумме, хранящейся списком неперекрывающихся частичных сумм (алгоритм Шевчука,
+    как в math.fsum): сумма хранится точно, поэтому ошибка округления не копится при добавлениях и удалениях.
+    :param partials: Частичные суммы, меняются на месте
+    :param value: Слагаемое
+    """
+    index = 0
+    for partial in partials:
+        if abs(value) < abs(partial):
+            value, partial = partial, value
+        high = value + partial
+        low = partial - (high - value)
+        if low:
+            partials[index] = low
+            index += 1
+        value = high
+    partials[index:] = [value]
+
+
+class Aggregate:
+    """
+    Агрегаты одной группы: количество, сумма и отсортированный список значений,
+    из которого минимум и максимум берутся за O(1) даже после удалений.
+    Целые складываются точно как int, дробные - в частичные суммы _add_exact.
+    Примеры:
+    >>> group = Aggregate()
+    >>> for value in (0.1, 0.2, 0.3):
+    ...     group.add(value)
+    >>> group.remove(0.1)
+    >>> group.remove(0.2)
+    >>> group.total
+    0.3
+    """
+    __slots__ = ("count", "_integer", "_partials", "values")
+
+    def __init__(self):
+        self.count = 0
+        self._integer = 0
+        self._partials = []
+        self.values = []
+
+    @property
+    def total(self) -> Union[int, float]:
+        """Сумма значений группы; для дробных - точная сумма, округлённая один раз."""
+        if self._partials:
+            return self._integer + math.fsum(self._partials)
+        return self._integer
+
+    def add(self, value: Union[int, float]) -> None:
+        self.count += 1
+        if isinstance(value, int):
+            self._integer += value
+        else:
+            _add_exact(self._partials, value)
+        insort(self.values, value)
+
+    def remove(self, value: Union[int, float]) -> None:
+        self.count -= 1
+        if isinstance(value, int):
+            self._integer -= value
+        else:
+            _add_exact(self._partials, -value)
+        del self.values[bisect_left(self.values, value)]
+
+    def stats(self) -> AggregateStats:
+        if not self.values:
+            return AggregateStats(0, 0, None, None)
+        return AggregateStats(self.count, self.total, self.values[0], self.values[-1])
+
+
+class BookCatalog:
+    """
+    Каталог бумажных и аудиокниг с агрегатами по автору и по формату.
+    Каталог становится наблюдателем добавленной книги: изменение её автора, страниц или
+    длительности сразу переносится в агрегаты, поэтому запросы агрегатов стоят O(1).
+    """
+    def __init__(self):
+        """
+        Создание и подготовка к работе объекта "Каталог книг"
+        Примеры:
+        >>> catalog = BookCatalog()
+        >>> paper = PaperBook('Книга о вкусной и здоровой пище', 'Н.П. Могильный', 440)
+        >>> catalog.insert(paper)
+        >>> catalog.insert(AudioBook('Книга о вкусной и здоровой пище', 'Н.П. Могильный', 253.44))
+        >>> catalog.insert(PaperBook('Кулинария', 'Н.П. Могильный', 120))
+        >>> catalog.total_pages('Н.П. Могильный'), catalog.total_duration('Н.П. Могильный')
+        (560, 253.44)
+        >>> paper.pages = 400
+        >>> catalog.stats(PaperBook, 'Н.П. Могильный')
+        AggregateStats(count=2, total=520, minimum=120, maximum=400)
+        """
+        self._books: Dict[int, Book] = {}
+        self._groups: Dict[Tuple[type, Optional[str]], Aggregate] = {}
+
+    def __len__(self) -> int:
+        return len(self._books)
+
+    def __iter__(self) -> Iterator[Book]:
+        return iter(list(self._books.values()))
+
+    def __contains__(self, book: Book) -> bool:
+        return id(book) in self._books
+
+    @staticmethod
+    def _format_of(book: Book) -> type:
+        for book_format in FORMAT_FIELDS:
+            if isinstance(book, book_format):
+                return book_format
+        raise TypeError("В каталог можно добавить только PaperBook или AudioBook")
+
+    def _account(self, book: Book, sign: int) -> None:
+        book_format = self._format_of(book)
+        value = getattr(book, FORMAT_FIELDS[book_format])
+        for key in ((book_format, book.author), (book_format, None)):
+            group = self._groups.get(key)
+            if group is None:
+                group = self._groups[key] = Aggregate()
+            if sign > 0:
+                group.add(value)
+            else:
+                group.remove(value)
+                if not group.count:
+                    del self._groups[key]
+
+    def insert(self, book: Book) -> None:
+        """
+        Добавляет книгу в каталог и в агрегаты.
+        :param book: Бумажная или аудиокнига
+        """
+        self._format_of(book)
+        if book._observer is not None:
+            raise ValueError("Книга уже добавлена в каталог")
+        self._account(book, +1)
+        self._books[id(book)] = book
+        book._observer = self
+
+    def delete(self, book: Book) -> None:
+        """
+        Удаляет книгу из каталога и из агрегатов.
+        :param book: Книга каталога
+        """
+        if book._observer is not self:
+            raise ValueError("Книги нет в каталоге")
+        self._account(book, -1)
+        del self._books[id(book)]
+        book._observer = None
+
+    def before_change(self, book: Book) -> None:
+        """Вычитает книгу из агрегатов перед изменением отслеживаемого атрибута."""
+        self._account(book, -1)
+
+    def after_change(self, book: Book) -> None:
+        """Возвращает книгу в агрегаты после изменения отслеживаемого атрибута."""
+        self._account(book, +1)
+
+    def stats(self, book_format: type, author: str = None) -> AggregateStats:
+        """
+        Возвращает агрегаты формата по автору или по всему каталогу за O(1).
+        :param book_format: PaperBook или AudioBook
+        :param author: Автор, по умолчанию все авторы
+        :return: Количество, сумма, минимум и максимум страниц или длительности
+        """
+        if book_format not in FORMAT_FIELDS:
+            raise ValueError("Формат книги должен быть PaperBook или AudioBook")
+        group = self._groups.get((book_format, author))
+        return group.stats() if group is not None else AggregateStats(0, 0, None, None)
+
+    def total_pages(self, author: str = None) -> int:
+        """
+        Возвращает сумму страниц бумажных книг автора (или всех авторов).
+        :param author: Автор
+        :return: Сумма страниц
+        """
+        return self.stats(PaperBook, author).total
+
+    def total_duration(self, author: str = None) -> float:
+        """
+        Возвращает суммарную длительность аудиокниг автора (или всех авторов) в минутах.
+        :param author: Автор
+        :return: Сумма длительностей; 0.0, если аудиокниг нет
+        Примеры:
+        >>> BookCatalog().total_duration('Н.П. Могильный')
+        0.0
+        """
+        return float(self.stats(AudioBook, author).total)
+
+
+if __name__ == "__main__":
+    import doctest
+
+    doctest.testmod()
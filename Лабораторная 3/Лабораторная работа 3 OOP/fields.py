@@ -0,0 +1,144 @@
+from collections import deque
+from itertools import repeat
+from typing import Dict, List, Sequence, Tuple, Union
+
+
+class TypedField:
+    """
+    Дескриптор атрибута с проверкой типа и, при необходимости, положительности значения.
+    Значение хранится в слоте '_<имя атрибута>', который класс объявляет в __slots__,
+    поэтому у экземпляров нет __dict__.
+    Наблюдаемый атрибут (observed=True) сообщает об изменении объекту в слоте _observer
+    экземпляра, если он задан: before_change(instance) до записи и after_change(instance) после.
+    """
+    def __init__(self, types: Union[type, Tuple[type, ...]], type_message: str, positive_message: str = None,
+                 observed: bool = False, doc: str = None):
+        """
+        Создание и подготовка к работе объекта "Типизированный атрибут"
+        :param types: Допустимый тип или кортеж типов
+        :param type_message: Сообщение TypeError при неверном типе
+        :param positive_message: Сообщение ValueError, если значение должно быть строго положительным
+        :param observed: Сообщать ли наблюдателю экземпляра об изменении значения
+        :param doc: Описание атрибута для help()
+        Примеры:
+        >>> class Point:
+        ...     __slots__ = ('_x',)
+        ...     x = TypedField(int, 'x должен быть типа int', 'x должен быть положительным', doc='Координата x.')
+        >>> point = Point()
+        >>> point.x = 3
+        >>> point.x, Point.x.__doc__
+        (3, 'Координата x.')
+        >>> point.x = 0
+        Traceback (most recent call last):
+        ...
+        ValueError: x должен быть положительным
+        """
+        self.types = types
+        self.type_message = type_message
+        self.positive_message = positive_message
+        self.observed = observed
+        self.__doc__ = doc
+        self.name = None
+        self.slot = None
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        slot_name = "_" + name
+        try:
+            slot = owner.__dict__[slot_name]
+        except KeyError:
+            raise TypeError(f"Класс {owner.__name__} должен объявить слот {slot_name} для атрибута {name}") from None
+        self.name = name
+        self.slot = slot
+        self._load = slot.__get__
+        self._store = slot.__set__
+
+    def __get__(self, instance, owner: type = None):
+        if instance is None:
+            return self
+        return self._load(instance, owner)
+
+    def __set__(self, instance, value) -> None:
+        if not isinstance(value, self.types):
+            raise TypeError(self.type_message)
+        if self.positive_message is not None and value <= 0:
+            raise ValueError(self.positive_message)
+        if self.observed:
+            observer = instance._observer
+            if observer is not None:
+                observer.before_change(instance)
+                self._store(instance, value)
+                observer.after_change(instance)
+                return
+        self._store(instance, value)
+
+    def validate_column(self, values: Sequence) -> None:
+        """
+        Проверяет сразу всю колонку значений: сначала типы, затем положительность.
+        :param values: Значения атрибута для всех создаваемых экземпляров
+        """
+        types = self.types
+        if not all(isinstance(value, types) for value in values):
+            raise TypeError(self.type_message)
+        if self.positive_message is not None and not all(value > 0 for value in values):
+            raise ValueError(self.positive_message)
+
+
+def typed_fields(cls: type) -> Dict[str, TypedField]:
+    """
+    Возвращает типизированные атрибуты класса с учётом наследования, от базового класса к дочернему.
+    :param cls: Класс
+    :return: Имя атрибута -> дескриптор
+    """
+    fields = {}
+    for klass in reversed(cls.__mro__):
+        for name, attribute in vars(klass).items():
+            if isinstance(attribute, TypedField):
+                fields[name] = attribute
+    return fields
+
+
+def bulk_create(cls: type, columns: Dict[str, Sequence]) -> List:
+    """
+    Создаёт экземпляры класса по колонкам значений. Каждая колонка проверяется один раз целиком,
+    после чего значения записываются прямо в слоты, минуя __init__ и функции проверки.
+    Остальные слоты класса (например, _observer) заполняются None.
+    :param cls: Класс с атрибутами TypedField
+    :param columns: Имя атрибута -> значения для всех экземпляров
+    :return: Список экземпляров
+    Примеры:
+    >>> class Point:
+    ...     __slots__ = ('_x',)
+    ...     x = TypedField(int, 'x должен быть типа int')
+    >>> [point.x for point in bulk_create(Point, {'x': [1, 2, 3]})]
+    [1, 2, 3]
+    >>> bulk_create(Point, {'x': [1, 'два']})
+    Traceback (most recent call last):
+    ...
+    TypeError: x должен быть типа int
+    """
+    fields = typed_fields(cls)
+    if set(columns) != set(fields):
+        raise ValueError(f"Нужны колонки {', '.join(fields)}")
+    lengths = {len(values) for values in columns.values()}
+    if len(lengths) > 1:
+        raise ValueError("Колонки должны быть одинаковой длины")
+    for name, field in fields.items():
+        field.validate_column(columns[name])
+    count = lengths.pop() if lengths else 0
+    # Экземпляры создаются и заполняются циклами map на уровне C, по одному проходу на колонку
+    instances = list(map(object.__new__, repeat(cls, count)))
+    for name, field in fields.items():
+        deque(map(field.slot.__set__, instances, columns[name]), maxlen=0)
+    field_slots = {field.slot for field in fields.values()}
+    for klass in cls.__mro__:
+        for slot_name in getattr(klass, "__slots__", ()):
+            slot = klass.__dict__[slot_name]
+            if slot not in field_slots:
+                deque(map(slot.__set__, instances, repeat(None, count)), maxlen=0)
+    return instances
+
+
+if __name__ == "__main__":
+    import doctest
+
+    doctest.testmod()
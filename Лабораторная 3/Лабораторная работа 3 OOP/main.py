@@ -1,6 +1,19 @@
+from typing import Sequence
+
+from fields import TypedField, bulk_create
+
+
 class Book:
     """ Базовый класс книги. """
+    __slots__ = ("_name", "_author", "_observer")
+
+    # Атрибуты с проверкой типа при присвоении, значения хранятся в слотах _name и _author.
+    # Изменения автора, страниц и длительности видит каталог книги (слот _observer), см. catalog.py
+    name = TypedField(str, "Название книги должно быть типа str", doc="Возвращает название книги.")
+    author = TypedField(str, "Имя автора книги должно быть типа str", observed=True, doc="Возвращает имя автора книги.")
+
     def __init__(self, name: str, author: str):
+        self._observer = None
         self.name = name
         self.author = author
 
@@ -10,32 +23,24 @@ class Book:
     def __repr__(self):
         return f"{self.__class__.__name__}(name={self.name!r}, author={self.author!r})"
 
-    @property
-    def name(self) -> str:
-        """Возвращает название книги."""
-        return self._name
-
-    @name.setter
-    def name(self, new_name: str) -> None:
-        """Устанавливает название книги."""
-        if not isinstance(new_name, str):
-            raise TypeError("Название книги должно быть типа str")
-        self._name = new_name
+    @classmethod
+    def from_columns(cls, **columns: Sequence) -> list:
+        """
+        Создаёт книги по колонкам значений: каждая колонка проверяется один раз,
+        затем экземпляры собираются без вызова сеттеров для каждого атрибута.
+        :param columns: Имя атрибута -> значения для всех книг
+        :return: Список книг
+        """
+        return bulk_create(cls, columns)
 
-    @property
-    def author(self) -> str:
-        """Возвращает имя автора книги."""
-        return self._author
 
-    @author.setter
-    def author(self, new_author: str) -> None:
-        """Устанавливает имя автора книги."""
-        if not isinstance(new_author, str):
-            raise TypeError("Имя автора книги должно быть типа str")
-        self._author = new_author
+class PaperBook(Book):
+    __slots__ = ("_pages",)
 
+    pages = TypedField(int, "Количество страниц в книге должно быть типа int.",
+                       "Количество страниц в книге должно быть строго положительным числом.", observed=True,
+                       doc="Возвращает количество страниц в книге.")
 
-class PaperBook(Book):
     def __init__(self, name: str, author: str, pages: int):
         super().__init__(name, author)
         self.pages = pages
@@ -43,22 +48,14 @@ class PaperBook(Book):
     def __repr__(self):
         return f"{self.__class__.__name__}(name={self.name!r}, author={self.author!r}, pages={self.pages!r})"
 
-    @property
-    def pages(self) -> int:
-        """Возвращает количество страниц в книге."""
-        return self._pages
 
-    @pages.setter
-    def pages(self, new_pages: int) -> None:
-        """Устанавливает количество страниц в книге."""
-        if not isinstance(new_pages, int):
-            raise TypeError("Количество страниц в книге должно быть типа int.")
-        if new_pages <= 0:
-            raise ValueError("Количество страниц в книге должно быть строго положительным числом.")
-        self._pages = new_pages
+class AudioBook(Book):
+    __slots__ = ("_duration",)
 
+    duration = TypedField(float, "Продолжительность книги должна быть типа float.",
+                          "Продолжительность книги должна быть строго положительным числом.", observed=True,
+                          doc="Возвращает длительность книги в минутах.")
 
-class AudioBook(Book):
     def __init__(self, name: str, author: str, duration: float):
         super().__init__(name, author)
         self.duration = duration
@@ -66,24 +63,11 @@ class AudioBook(Book):
     def __repr__(self):
         return f"{self.__class__.__name__}(name={self.name!r}, author={self.author!r}, duration={self.duration!r})"
 
-    @property
-    def duration(self) -> float:
-        """Возвращает длительность книги в минутах."""
-        return self._duration
-
-    @duration.setter
-    def duration(self, new_duration: float) -> None:
-        """Устанавливает длительность книги в минутах."""
-        if not isinstance(new_duration, float):
-            raise TypeError("Продолжительность книги должна быть типа float.")
-        if new_duration <= 0:
-            raise ValueError("Продолжительность книги должна быть строго положительным числом.")
-        self._duration = new_duration
-
-
-book1 = PaperBook('Книга о вкусной и здоровой пище', "Н.П. Могильный", 440)
-book2 = AudioBook('Книга о вкусной и здоровой пище', "Н.П. Могильный", 253.44)
-print(book1)
-print(repr(book1))
-print(book2)
-print(repr(book2))
+
+if __name__ == "__main__":
+    book1 = PaperBook('Книга о вкусной и здоровой пище', "Н.П. Могильный", 440)
+    book2 = AudioBook('Книга о вкусной и здоровой пище', "Н.П. Могильный", 253.44)
+    print(book1)
+    print(repr(book1))
+    print(book2)
+    print(repr(book2))
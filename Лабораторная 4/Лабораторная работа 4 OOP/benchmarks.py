@@ -0,0 +1,89 @@
+import random
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from census import SPECIES, body_index_batch
+from population import SPECIES_TABLE, PinnipedPopulation
+
+
+def make_census(size: int) -> tuple:
+    """
+    Создаёт выборку переписи: длины, массы и коды видов, часть строк вне границ вида.
+    :param size: Количество животных
+    :return: Списки длин, масс и кодов видов
+    """
+    rng = random.Random(size)
+    lengths, weights, codes = [], [], []
+    for _ in range(size):
+        code = rng.randrange(len(SPECIES))
+        species = SPECIES[code]
+        lengths.append(rng.uniform(species.MIN_LENGTH * 0.9, species.MAX_LENGTH * 1.1))
+        weights.append(rng.uniform(species.MIN_WEIGHT * 0.9, species.MAX_WEIGHT * 1.1))
+        codes.append(code)
+    return lengths, weights, codes
+
+
+def bench_body_index(size: int) -> None:
+    """
+    Сравнивает body_index по одному животному с векторным body_index_batch.
+    :param size: Количество животных
+    """
+    lengths, weights, codes = make_census(size)
+    animals = [SPECIES[code]("Ластоногое", 20, "короткая", "густая", length, weight, 10)
+               for length, weight, code in zip(lengths, weights, codes)]
+
+    start = time.perf_counter()
+    scalar = []
+    for animal in animals:
+        try:
+            scalar.append(animal.body_index())
+        except ValueError:
+            scalar.append(float("nan"))
+    scalar_time = time.perf_counter() - start
+
+    arrays = np.array(lengths), np.array(weights), np.array(codes)
+    start = time.perf_counter()
+    indices, _ = body_index_batch(*arrays)
+    batch_time = time.perf_counter() - start
+    assert np.allclose(indices, scalar, equal_nan=True)
+
+    print(f"Индекс массы тела для {size} животных")
+    print(f"  body_index по одному: {size / scalar_time:14.0f} животных/с")
+    print(f"  body_index_batch:     {size / batch_time:14.0f} животных/с")
+
+
+def bench_population_memory(size: int) -> None:
+    """
+    Сравнивает память списка экземпляров видов и колоночной PinnipedPopulation через tracemalloc.
+    :param size: Количество животных
+    """
+    lengths, weights, codes = make_census(size)
+
+    def build_instances() -> list:
+        return [SPECIES[code]("Ластоногое", 20, SPECIES_TABLE[code].wool_length, SPECIES_TABLE[code].wool_density,
+                              length, weight, 10) for length, weight, code in zip(lengths, weights, codes)]
+
+    def build_population() -> PinnipedPopulation:
+        population = PinnipedPopulation()
+        for length, weight, code in zip(lengths, weights, codes):
+            population.add(SPECIES[code], "Ластоногое", 20, length, weight, 10)
+        return population
+
+    print(f"Память на {size} животных")
+    for title, build in (("экземпляры классов", build_instances), ("PinnipedPopulation", build_population)):
+        tracemalloc.start()
+        animals = build()
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"  {title:>18}: {current / size:6.1f} байт на животное")
+        del animals
+
+
+if __name__ == "__main__":
+    # Размер выборки можно передать аргументом: python benchmarks.py 10000000
+    census_size = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    bench_body_index(census_size)
+    bench_population_memory(census_size)
@@ -0,0 +1,71 @@
+from typing import Sequence, Tuple, Union
+
+import numpy as np
+
+from main import NavySeals, Pinnipeds, SeaElephants, Walruses
+
+# Коды видов в данных переписи: код - индекс класса в этом кортеже
+SPECIES = (NavySeals, SeaElephants, Walruses)
+
+# Границы видов в виде таблиц, индексируемых кодом вида
+MIN_LENGTH = np.array([species.MIN_LENGTH for species in SPECIES], dtype=float)
+MAX_LENGTH = np.array([species.MAX_LENGTH for species in SPECIES], dtype=float)
+MIN_WEIGHT = np.array([species.MIN_WEIGHT for species in SPECIES], dtype=float)
+MAX_WEIGHT = np.array([species.MAX_WEIGHT for species in SPECIES], dtype=float)
+
+
+def species_code(species: type) -> int:
+    """
+    Возвращает код вида для класса ластоногих.
+    :param species: Класс NavySeals, SeaElephants или Walruses
+    :return: Код вида
+    Примеры:
+    >>> species_code(Walruses)
+    2
+    """
+    if not isinstance(species, type) or not issubclass(species, Pinnipeds):
+        raise TypeError("Вид должен быть классом ластоногих")
+    try:
+        return SPECIES.index(species)
+    except ValueError:
+        raise ValueError(f"Для вида {species.__name__} нет кода переписи") from None
+
+
+def body_index_batch(lengths: Sequence[Union[int, float]], weights: Sequence[Union[int, float]],
+                     species: Sequence[int]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Высчитывает индекс массы тела для всей выборки переписи за один проход.
+    Границы длины и массы каждого вида берутся из таблиц по коду вида и применяются
+    векторными масками вместо проверок в body_index каждого животного.
+    :param lengths: Длины тела в метрах
+    :param weights: Массы тела в килограммах
+    :param species: Коды видов (индексы в SPECIES)
+    :return: Индексы массы тела (NaN для некорректных строк) и маска корректных строк
+    Примеры:
+    >>> indices, valid = body_index_batch([1.5, 3.8, 9.0], [95, 2500, 1000], [0, 1, 2])
+    >>> indices.round(2)
+    array([ 42.22, 173.13,    nan])
+    >>> valid
+    array([ True,  True, False])
+    """
+    lengths = np.asarray(lengths, dtype=float)
+    weights = np.asarray(weights, dtype=float)
+    species = np.asarray(species)
+    if species.dtype.kind not in "iu":
+        raise TypeError("Коды видов должны быть целыми числами")
+    if lengths.ndim != 1 or not lengths.shape == weights.shape == species.shape:
+        raise ValueError("Массивы длин, масс и видов должны быть одномерными и одинаковой длины")
+    known = (species >= 0) & (species < len(SPECIES))
+    codes = np.where(known, species, 0)
+    valid = (known
+             & (MIN_LENGTH[codes] <= lengths) & (lengths <= MAX_LENGTH[codes])
+             & (MIN_WEIGHT[codes] <= weights) & (weights <= MAX_WEIGHT[codes]))
+    indices = np.full(lengths.shape, np.nan)
+    np.divide(weights, lengths * lengths, out=indices, where=valid)
+    return indices, valid
+
+
+if __name__ == "__main__":
+    import doctest
+
+    doctest.testmod()
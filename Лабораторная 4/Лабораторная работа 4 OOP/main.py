@@ -82,7 +82,8 @@ class NavySeals(Pinnipeds):
     def body_index(self) -> Union[int, float]:
         if not isinstance(self.body_length, (int, float)) or not isinstance(self.body_weight, (int, float)):
             raise TypeError("Длина и масса тела должны быть типа int или float.")
-        if self.MAX_LENGTH < self.body_length < self.MIN_LENGTH or self.MAX_WEIGHT < self.body_weight < self.MIN_WEIGHT:
+        if not self.MIN_LENGTH <= self.body_length <= self.MAX_LENGTH or \
+                not self.MIN_WEIGHT <= self.body_weight <= self.MAX_WEIGHT:
             raise ValueError("Длина морского котика варьируется от 0.6 до 2.2 м, а масса от 5 до 320 кг.")
         return self.body_weight/self.body_length**2
 
@@ -113,7 +114,8 @@ class SeaElephants(Pinnipeds):
     def body_index(self) -> Union[int, float]:
         if not isinstance(self.body_length, (int, float)) or not isinstance(self.body_weight, (int, float)):
             raise TypeError("Длина и масса тела должны быть типа int или float.")
-        if self.MAX_LENGTH < self.body_length < self.MIN_LENGTH or self.MAX_WEIGHT < self.body_weight < self.MIN_WEIGHT:
+        if not self.MIN_LENGTH <= self.body_length <= self.MAX_LENGTH or \
+                not self.MIN_WEIGHT <= self.body_weight <= self.MAX_WEIGHT:
             raise ValueError("Длина морского слона варьируется от 1.25 до 6.5 м, а масса от 50 до 5000 кг.")
         return self.body_weight/self.body_length**2
 
@@ -144,7 +146,8 @@ class Walruses(Pinnipeds):
     def body_index(self) -> Union[int, float]:
         if not isinstance(self.body_length, (int, float)) or not isinstance(self.body_weight, (int, float)):
             raise TypeError("Длина и масса тела должны быть типа int или float.")
-        if self.MAX_LENGTH < self.body_length < self.MIN_LENGTH or self.MAX_WEIGHT < self.body_weight < self.MIN_WEIGHT:
+        if not self.MIN_LENGTH <= self.body_length <= self.MAX_LENGTH or \
+                not self.MIN_WEIGHT <= self.body_weight <= self.MAX_WEIGHT:
             raise ValueError("Длина моржа варьируется от 1.2 до 4.5 м, а масса от 70 до 2000 кг.")
         return self.body_weight/self.body_length**2
 
@@ -0,0 +1,229 @@
+from array import array
+from typing import Iterator, NamedTuple, Tuple, Union
+
+import numpy as np
+
+from census import SPECIES, body_index_batch
+from main import NavySeals, Pinnipeds, SeaElephants, Walruses
+
+
+class SpeciesTraits(NamedTuple):
+    """Постоянные для вида характеристики, которые хранятся один раз на вид, а не в каждом животном."""
+    species: type
+    trait_name: str      # название видового числового признака
+    wool_length: str
+    wool_density: str
+
+
+# Таблица видов, индексируемая тем же кодом, что и census.SPECIES
+SPECIES_TABLE = (
+    SpeciesTraits(NavySeals, "diameter_auricle", "длинная", "густая"),
+    SpeciesTraits(SeaElephants, "trunk_length", "короткая", "густая"),
+    SpeciesTraits(Walruses, "tusks_length", "короткая", "редкая"),
+)
+if tuple(traits.species for traits in SPECIES_TABLE) != SPECIES:
+    raise ImportError("Порядок видов SPECIES_TABLE должен совпадать с census.SPECIES")
+
+
+class PinnipedView:
+    """
+    Представление одного животного из PinnipedPopulation. Хранит только ссылку на популяцию
+    и номер строки, значения читаются из колонок при обращении. Методы вида (body_index,
+    __str__) берутся из таблицы видов и вызываются для представления как для экземпляра.
+    """
+    __slots__ = ("_population", "_row")
+
+    def __init__(self, population: "PinnipedPopulation", row: int):
+        """
+        Создание и подготовка к работе объекта "Представление ластоногого"
+        :param population: Популяция
+        :param row: Номер строки в популяции
+        """
+        self._population = population
+        self._row = row
+
+    @property
+    def traits(self) -> SpeciesTraits:
+        """Возвращает видовые характеристики животного."""
+        return SPECIES_TABLE[self._population._species[self._row]]
+
+    @property
+    def name(self) -> str:
+        return self._population._names[self._population._name_codes[self._row]]
+
+    @property
+    def mustache_length(self) -> float:
+        return self._population._mustache_length[self._row]
+
+    @property
+    def body_length(self) -> float:
+        return self._population._body_length[self._row]
+
+    @property
+    def body_weight(self) -> float:
+        return self._population._body_weight[self._row]
+
+    @property
+    def wool_length(self) -> str:
+        return self.traits.wool_length
+
+    @property
+    def wool_density(self) -> str:
+        return self.traits.wool_density
+
+    def __getattr__(self, attribute: str):
+        # Видовой признак (diameter_auricle, trunk_length, tusks_length) и константы вида (MIN_LENGTH и т.д.)
+        traits = self.traits
+        if attribute == traits.trait_name:
+            return self._population._trait[self._row]
+        return getattr(traits.species, attribute)
+
+    def body_index(self) -> Union[int, float]:
+        """Высчитывает индекс массы тела методом своего вида."""
+        return self.traits.species.body_index(self)
+
+    def materialize(self) -> Pinnipeds:
+        """
+        Создаёт полноценный экземпляр класса вида с теми же данными.
+        :return: Экземпляр NavySeals, SeaElephants или Walruses
+        """
+        traits = self.traits
+        return traits.species(self.name, self.mustache_length, traits.wool_length, traits.wool_density,
+                              self.body_length, self.body_weight, getattr(self, traits.trait_name))
+
+    def __str__(self) -> str:
+        return self.traits.species.__str__(self)
+
+    def __repr__(self) -> str:
+        return repr(self.materialize())
+
+
+class PinnipedPopulation:
+    """
+    Колоночное хранилище популяции ластоногих. Числовые признаки лежат в массивах array('d'),
+    коды видов - в array('b'), названия - в таблице уникальных строк, а длина и густота шерсти
+    хранятся один раз на вид в SPECIES_TABLE.
+    """
+    def __init__(self):
+        """
+        Создание и подготовка к работе объекта "Популяция ластоногих"
+        Примеры:
+        >>> population = PinnipedPopulation()
+        >>> population.add(Walruses, 'Морж', 25, 2.6, 1000, 56)
+        0
+        >>> print(population[0])
+        Ластоногое вида Морж, длина тела которого 2.6 м, а его масса 1000.0 кг
+        >>> population[0].tusks_length, population[0].wool_density
+        (56.0, 'редкая')
+        """
+        self._species = array("b")
+        self._name_codes = array("q")
+        self._mustache_length = array("d")
+        self._body_length = array("d")
+        self._body_weight = array("d")
+        self._trait = array("d")
+        self._names = []
+        self._name_table = {}
+
+    def __len__(self) -> int:
+        return len(self._species)
+
+    def __getitem__(self, row: int) -> PinnipedView:
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError("Номер животного вне диапазона")
+        return PinnipedView(self, row)
+
+    def __iter__(self) -> Iterator[PinnipedView]:
+        for row in range(len(self)):
+            yield PinnipedView(self, row)
+
+    def add(self, species: type, name: str, mustache_length: Union[int, float], body_length: Union[int, float],
+            body_weight: Union[int, float], trait: Union[int, float]) -> int:
+        """
+        Добавляет животное в популяцию.
+        :param species: Класс вида
+        :param name: Название вида
+        :param mustache_length: Длина усов в сантиметрах
+        :param body_length: Длина тела в метрах
+        :param body_weight: Масса тела в килограммах
+        :param trait: Видовой признак (диаметр ушной раковины, длина хобота или бивней) в сантиметрах
+        :return: Номер строки животного
+        Примеры:
+        >>> population = PinnipedPopulation()
+        >>> population.add(Walruses, 'Морж', 10, 3.0, 10 ** 400, 50)
+        Traceback (most recent call last):
+        ...
+        ValueError: Числовые признаки должны помещаться в float
+        >>> population.add(Walruses, 'Морж', 10, 3.0, 1000, 50), len(population.body_index_batch()[0])
+        (0, 1)
+        """
+        if not isinstance(name, str):
+            raise TypeError("Название вида должно быть типа str")
+        for value in (mustache_length, body_length, body_weight, trait):
+            if not isinstance(value, (int, float)):
+                raise TypeError("Числовые признаки должны быть типа int или float")
+        if species not in SPECIES:
+            raise ValueError("Вид должен быть одним из NavySeals, SeaElephants, Walruses")
+        # Все значения переводятся до первой записи в колонки: иначе ошибка на середине оставит колонки разной длины
+        try:
+            mustache_length, body_length, body_weight, trait = map(float, (mustache_length, body_length,
+                                                                           body_weight, trait))
+        except OverflowError:
+            raise ValueError("Числовые признаки должны помещаться в float") from None
+        code = SPECIES.index(species)
+        name_code = self._name_table.get(name)
+        if name_code is None:
+            name_code = self._name_table[name] = len(self._names)
+            self._names.append(name)
+        self._species.append(code)
+        self._name_codes.append(name_code)
+        self._mustache_length.append(mustache_length)
+        self._body_length.append(body_length)
+        self._body_weight.append(body_weight)
+        self._trait.append(trait)
+        return len(self._species) - 1
+
+    def add_animal(self, animal: Pinnipeds) -> int:
+        """
+        Переносит в популяцию существующий экземпляр вида.
+        Шерсть должна совпадать с видовой, иначе её пришлось бы хранить отдельно.
+        :param animal: Экземпляр NavySeals, SeaElephants или Walruses
+        :return: Номер строки животного
+        """
+        if type(animal) not in SPECIES:
+            raise TypeError("Животное должно быть экземпляром NavySeals, SeaElephants или Walruses")
+        traits = SPECIES_TABLE[SPECIES.index(type(animal))]
+        if (animal.wool_length, animal.wool_density) != (traits.wool_length, traits.wool_density):
+            raise ValueError("Длина и густота шерсти должны совпадать с видовыми")
+        return self.add(type(animal), animal.name, animal.mustache_length, animal.body_length,
+                        animal.body_weight, getattr(animal, traits.trait_name))
+
+    def body_index_batch(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Высчитывает индексы массы тела всей популяции через census.body_index_batch.
+        Колонки передаются в NumPy без копирования.
+        :return: Индексы массы тела и маска корректных строк
+        """
+        return body_index_batch(np.frombuffer(self._body_length, dtype=float),
+                                np.frombuffer(self._body_weight, dtype=float),
+                                np.frombuffer(self._species, dtype=np.int8))
+
+    def column_bytes_per_animal(self) -> int:
+        """
+        Возвращает, сколько байт занимают колонки в расчёте на одно животное (без таблицы названий).
+        :return: Байт на животное
+        Примеры:
+        >>> PinnipedPopulation().column_bytes_per_animal()
+        41
+        """
+        columns = (self._species, self._name_codes, self._mustache_length,
+                   self._body_length, self._body_weight, self._trait)
+        return sum(column.itemsize for column in columns)
+
+
+if __name__ == "__main__":
+    import doctest
+
+    doctest.testmod()